@@ -0,0 +1,137 @@
+"""Compares benchmark results against a baseline, failing on regressions.
+
+The current results are either read from a file produced by ``run.py`` or
+measured on the spot, with the baseline scale and the median of
+``--repeat`` runs to smooth out noise::
+
+    python benchmarks/run.py --repeat 5 --output baseline.json
+    ...
+    python benchmarks/compare.py baseline.json
+    python benchmarks/compare.py baseline.json current.json --threshold 0.2
+
+Exits with status 1 when the throughput of a workload drops, or its peak
+memory grows, by more than the configured threshold, and with status 2 when
+both runs do not share the same scale.
+"""
+import argparse
+import json
+import sys
+
+from run import log, run
+
+
+#: Metrics compared, with whether a higher value is better.
+METRICS = (
+    ('mb_per_s', True),
+    ('parts_per_s', True),
+    ('peak_memory', False),
+)
+
+
+def compare(baseline, current, threshold=0.1, memory_threshold=0.1,
+            memory_slack=64 * 1024):
+    """Compares two results documents.
+
+    :param float threshold: Tolerated relative throughput loss
+    :param float memory_threshold: Tolerated relative peak memory growth
+    :param int memory_slack: Peak memory growth in bytes always tolerated,
+                             so that tiny peaks do not trip the gate
+
+    :returns: rows of ``(workload, metric, baseline, current, change,
+              regressed)``, where change is relative to the baseline, or
+              absolute when the baseline is 0
+    :rtype: list
+    :raises ValueError: if both documents were measured at different scales
+    """
+    scales = (baseline['meta'].get('scale', 1.0),
+              current['meta'].get('scale', 1.0))
+    if scales[0] != scales[1]:
+        raise ValueError('baseline scale {} differs from current scale {}'
+                         .format(*scales))
+    rows = []
+    for name, expected in sorted(baseline['results'].items()):
+        actual = current['results'].get(name)
+        if actual is None:
+            rows.append((name, 'missing', None, None, None, True))
+            continue
+        for metric, higher_is_better in METRICS:
+            before, after = expected.get(metric), actual.get(metric)
+            if before is None or after is None:
+                continue
+            if before:
+                change = (after - before) / float(before)
+            else:
+                change = after - before
+            if higher_is_better:
+                regressed = bool(before) and change < -threshold
+            else:
+                regressed = (after - before > memory_slack and
+                             (not before or change > memory_threshold))
+            rows.append((name, metric, before, after, change, regressed))
+    return rows
+
+
+def format_rows(rows):
+    lines = ['{:<16} {:<12} {:>14} {:>14} {:>9}'.format(
+        'workload', 'metric', 'baseline', 'current', 'change')]
+    for name, metric, before, after, change, regressed in rows:
+        if change is None:
+            lines.append('{:<16} {:<12} {:>14} {:>14} {:>9}  REGRESSION'
+                         .format(name, metric, '-', '-', '-'))
+            continue
+        if before:
+            change = '{:>+8.1%}'.format(change)
+        else:
+            change = '{:>+9.0f}'.format(change)
+        lines.append('{:<16} {:<12} {:>14.1f} {:>14.1f} {}{}'.format(
+            name, metric, before, after, change,
+            '  REGRESSION' if regressed else ''))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('baseline', help='baseline JSON results')
+    parser.add_argument('current', nargs='?',
+                        help='current JSON results, measured if missed')
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+                        help='tolerated relative throughput loss')
+    parser.add_argument('-m', '--memory-threshold', type=float, default=0.1,
+                        help='tolerated relative peak memory growth')
+    parser.add_argument('--memory-slack', type=int, default=64 * 1024,
+                        help='peak memory growth in bytes always tolerated')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='timed runs per workload when measuring')
+    parser.add_argument('-o', '--output', help='JSON file to store the '
+                        'current results when measuring')
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    if args.current:
+        with open(args.current) as fp:
+            current = json.load(fp)
+    else:
+        current = run(sorted(baseline['results']),
+                      baseline['meta'].get('scale', 1.0),
+                      repeat=args.repeat, log=log)
+        if args.output:
+            with open(args.output, 'w') as fp:
+                json.dump(current, fp, indent=2, sort_keys=True)
+
+    try:
+        rows = compare(baseline, current, args.threshold,
+                       args.memory_threshold, args.memory_slack)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(format_rows(rows))
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print('\n{} regression(s) past the threshold'.format(
+            len(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Microbenchmark for :func:`~multipart_reader.multipart.\
+parse_content_disposition`.
+
+Runs the parser over well-formed and malformed header values, with the
+result cache disabled then enabled, and prints the time per call::
+
+    python benchmarks/content_disposition.py
+"""
+import timeit
+import warnings
+
+from multipart_reader import multipart
+
+
+VALID = [
+    'form-data; name="file"',
+    'form-data; name="file"; filename="python-save-the-world.txt"',
+    'attachment; filename=foo.html',
+    'attachment; filename="\\"quoting\\" tested.html"',
+    'attachment; foo="bar"; filename="foo.html"',
+    "attachment; filename*=UTF-8''foo-%c3%a4-%e2%82%ac.html",
+    'attachment; filename*0="foo."; filename*1="html"',
+    'attachment; filename="Here\'s a semicolon;.html"',
+    'inline; filename="0000000000111111111122222222223333333333.html"',
+]
+
+MALFORMED = [
+    'attachment; filename=foo bar.html',
+    '"attachment"',
+    'attachment; ;filename=foo',
+]
+
+
+def run(number=2000, repeat=5):
+    cache = getattr(multipart, '_parse_content_disposition', None)
+    parse = multipart.parse_content_disposition
+    results = {}
+    for label, maxsize in (('uncached', 0), ('cached', 256)):
+        if cache is not None:
+            cache.set_maxsize(maxsize)
+            cache.cache_clear()
+        elif maxsize:
+            continue
+        for kind, headers in (('valid', VALID), ('malformed', MALFORMED)):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                timings = timeit.repeat(
+                    lambda: [parse(header) for header in headers],
+                    number=number, repeat=repeat)
+            results[label, kind] = min(timings) / number / len(headers)
+    if cache is not None:
+        cache.set_maxsize(256)
+    return results
+
+
+def main():
+    for (label, kind), seconds in sorted(run().items()):
+        print('{:<10} {:<10} {:8.2f} us/call'.format(
+            label, kind, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Runs the multipart reader benchmark suite.
+
+Every workload is timed ``--repeat`` times with nothing else going on, the
+median run being reported, then run once more under :mod:`tracemalloc` to
+record its peak memory. Results are printed and optionally stored as JSON::
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --scale 0.1 --workload form_fields gzip
+"""
+import argparse
+import datetime
+import gc
+import json
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+from workloads import MAX_INLINE_SIZE, WORKLOADS
+
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.
+
+
+def measure(workload, memory=True, max_inline_size=MAX_INLINE_SIZE,
+            repeat=1):
+    """Runs a workload, returns its results as a dict."""
+    runs = []
+    for _ in range(repeat):
+        headers, stream, size = workload.build(max_inline_size)
+        gc.collect()
+        start = timer()
+        parts = workload.run(headers, stream)
+        runs.append(timer() - start)
+    seconds = median(runs)
+
+    result = {
+        'bytes': size,
+        'parts': parts,
+        'runs': runs,
+        'seconds': seconds,
+        'mb_per_s': size / seconds / 1024 / 1024 if seconds else None,
+        'parts_per_s': parts / seconds if seconds else None,
+        'peak_memory': None,
+    }
+
+    if memory and tracemalloc is not None:
+        headers, stream, size = workload.build(max_inline_size)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            workload.run(headers, stream)
+            result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run(names=None, scale=1.0, memory=True, max_inline_size=MAX_INLINE_SIZE,
+        repeat=1, log=None):
+    """Runs the selected workloads, returns the results document."""
+    results = {}
+    for cls in WORKLOADS:
+        if names and cls.name not in names:
+            continue
+        results[cls.name] = measure(cls(scale), memory, max_inline_size,
+                                    repeat)
+        if log is not None:
+            log(format_result(cls.name, results[cls.name]))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.utcnow().isoformat(),
+            'scale': scale,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def format_result(name, result):
+    peak = result['peak_memory']
+    return '{:<16} {:>10.1f} MB/s {:>12.1f} parts/s {:>10} peak'.format(
+        name, result['mb_per_s'] or 0, result['parts_per_s'] or 0,
+        '{:.1f} MB'.format(peak / 1024. / 1024) if peak is not None else '-')
+
+
+def log(line):
+    sys.stderr.write(line + '\n')
+
+
+def main(argv=None):
+    names = [cls.name for cls in WORKLOADS]
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-o', '--output', help='JSON file to store results')
+    parser.add_argument('-w', '--workload', nargs='+', choices=names,
+                        help='workloads to run, all by default')
+    parser.add_argument('-s', '--scale', type=float, default=1.0,
+                        help='multiplies the size of every workload')
+    parser.add_argument('-r', '--repeat', type=int, default=1,
+                        help='timed runs per workload, the median is kept')
+    parser.add_argument('--no-memory', action='store_false', dest='memory',
+                        help='skip the peak memory measurement')
+    args = parser.parse_args(argv)
+
+    document = run(args.workload, args.scale, args.memory,
+                   repeat=args.repeat, log=log)
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(document, fp, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""Synthetic multipart workloads for the benchmark suite.
+
+Each workload builds a multipart body as an iterable of byte chunks, so
+bodies larger than memory can be streamed to the reader, and knows how to
+consume the resulting :class:`~multipart_reader.MultipartReader`.
+"""
+import base64
+import binascii
+import io
+import random
+import zlib
+
+from multipart_reader import MultipartReader
+from multipart_reader.multipart import match_names
+from multipart_reader.multipart import ChunkStream
+
+
+MB = 1024 * 1024
+
+#: Bodies up to this size are built in memory before the timer starts, so
+#: that the C implementation of ``io.BytesIO`` feeds the reader.
+MAX_INLINE_SIZE = 256 * MB
+
+
+def random_block(size, seed=0):
+    rnd = random.Random(seed)
+    return bytes(bytearray(rnd.getrandbits(8) for _ in range(size)))
+
+
+def text_block(size, seed=0):
+    rnd = random.Random(seed)
+    words = [b'multipart', b'reader', b'python', b'stream', b'boundary',
+             b'part', b'header', b'body', b'content', b'type']
+    out = []
+    length = 0
+    while length < size:
+        word = rnd.choice(words)
+        out.append(word)
+        length += len(word) + 1
+    return b' '.join(out)[:size]
+
+
+def part(headers, body):
+    """Returns a body part as ``(headers, chunks)``."""
+    return headers, body
+
+
+def part_head(boundary, headers):
+    """Returns the delimiter line and headers block opening a body part."""
+    head = [b'--' + boundary]
+    for name, value in headers:
+        head.append('{}: {}'.format(name, value).encode('latin1'))
+    head.append(b'')
+    return b'\r\n'.join(head) + b'\r\n'
+
+
+def multipart_body(boundary, parts, closing_crlf=True):
+    """Yields the chunks of a multipart body made of ``parts``.
+
+    :param bytes boundary: Boundary, without the leading dashes
+    :param parts: Iterable of ``(headers, chunks)`` pairs, where headers is
+                  a list of ``(name, value)`` pairs of native strings
+    :param bool closing_crlf: Ends the body with CRLF; nested bodies must not
+                              as it belongs to the enclosing delimiter
+    """
+    for headers, body in parts:
+        yield part_head(boundary, headers)
+        for chunk in body:
+            yield chunk
+        yield b'\r\n'
+    yield b'--' + boundary + b'--' + (b'\r\n' if closing_crlf else b'')
+
+
+def content_type(boundary, subtype='mixed'):
+    return 'multipart/{}; boundary="{}"'.format(subtype, boundary.decode())
+
+
+class Workload(object):
+    """Benchmark workload.
+
+    :param str name: Unique workload name
+    :param str description: What is measured
+    """
+
+    name = None
+    description = None
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+
+    def scaled(self, value, minimum=1):
+        return max(minimum, int(value * self.scale))
+
+    def headers(self):
+        """Returns the outer headers of the body."""
+        raise NotImplementedError
+
+    def chunks(self):
+        """Yields the body as byte chunks."""
+        raise NotImplementedError
+
+    def consume(self, reader):
+        """Reads the body, returns the number of leaf parts seen."""
+        raise NotImplementedError
+
+    def build(self, max_inline_size=MAX_INLINE_SIZE):
+        """Returns a ``(headers, stream, size)`` ready to be measured."""
+        size = self.size()
+        if size <= max_inline_size:
+            stream = io.BytesIO(b''.join(self.chunks()))
+        else:
+            stream = ChunkStream(self.chunks())
+        return self.headers(), stream, size
+
+    def size(self):
+        """Returns the body size in bytes."""
+        return sum(len(chunk) for chunk in self.chunks())
+
+    def run(self, headers, stream):
+        return self.consume(MultipartReader(headers, stream))
+
+
+class FormFields(Workload):
+
+    name = 'form_fields'
+    description = '10k tiny form-data fields read as text'
+    boundary = b'----------FormFieldsBoundary7MA4YWxkTrZu0gW'
+
+    def headers(self):
+        return {'Content-Type': content_type(self.boundary, 'form-data')}
+
+    def chunks(self):
+        parts = (
+            part([('Content-Disposition',
+                   'form-data; name="field{}"'.format(i))],
+                 [b'value-' + str(i).encode()])
+            for i in range(self.scaled(10000)))
+        return multipart_body(self.boundary, parts)
+
+    def consume(self, reader):
+        count = 0
+        for field in reader:
+            field.meta.name
+            field.text()
+            count += 1
+        return count
+
+
+class BinaryParts(Workload):
+
+    name = 'binary_large'
+    description = '3 parts of 1 GiB with Content-Length, read by chunks'
+    boundary = b'BinaryPartsBoundaryq1w2e3r4t5y6'
+    part_count = 3
+    part_size = 1024 * MB
+    block_size = 64 * 1024
+
+    def headers(self):
+        return {'Content-Type': content_type(self.boundary)}
+
+    def _part_headers(self):
+        part_size = self.scaled(self.part_size, self.block_size)
+        return [('Content-Type', 'application/octet-stream'),
+                ('Content-Length', str(part_size))]
+
+    def chunks(self):
+        block = random_block(self.block_size)
+        headers = self._part_headers()
+        part_size = int(headers[-1][1])
+
+        def body():
+            full, rest = divmod(part_size, len(block))
+            for _ in range(full):
+                yield block
+            yield block[:rest]
+
+        parts = (part(headers, body()) for _ in range(self.part_count))
+        return multipart_body(self.boundary, parts)
+
+    def size(self):
+        headers = self._part_headers()
+        head = len(part_head(self.boundary, headers))
+        closing = len(self.boundary) + 6
+        return self.part_count * (head + int(headers[-1][1]) + 2) + closing
+
+    def consume(self, reader):
+        count = 0
+        for body in reader:
+            while not body.at_eof():
+                body.read_chunk(body.chunk_size)
+            count += 1
+        return count
+
+
+class ReleasedParts(Workload):
+
+    name = 'binary_release'
+    description = '3 parts of 64 MiB without Content-Length, released unread'
+    boundary = b'ReleasedPartsBoundaryz9x8c7v6b5'
+    part_count = 3
+    part_size = 64 * MB
+
+    def headers(self):
+        return {'Content-Type': content_type(self.boundary)}
+
+    def chunks(self):
+        block = random_block(64 * 1024, seed=1)
+        part_size = self.scaled(self.part_size, len(block))
+
+        def body():
+            full, rest = divmod(part_size, len(block))
+            for _ in range(full):
+                yield block
+            yield block[:rest]
+
+        parts = (part([('Content-Type', 'application/octet-stream')], body())
+                 for _ in range(self.part_count))
+        return multipart_body(self.boundary, parts)
+
+    def consume(self, reader):
+        count = 0
+        for body in reader:
+            body.release()
+            count += 1
+        return count
+
+
+class InMemoryParts(ReleasedParts):
+
+    name = 'in_memory'
+    description = ('3 parts of 64 MiB without Content-Length held in '
+                   'memory, read with MultipartReader.from_bytes')
+
+    def build(self, max_inline_size=MAX_INLINE_SIZE):
+        data = b''.join(self.chunks())
+        return self.headers(), data, len(data)
+
+    def run(self, headers, data):
+        return self.consume(MultipartReader.from_bytes(headers, data))
+
+    def consume(self, reader):
+        count = 0
+        for body in reader:
+            body.read()
+            count += 1
+        return count
+
+
+class SelectedFields(Workload):
+
+    name = 'select_fields'
+    description = '2 fields picked after a 1 GiB file part, skipped unread'
+    boundary = b'----------SelectedFieldsBoundary1x2c3v4b'
+    part_size = 1024 * MB
+
+    def headers(self):
+        return {'Content-Type': content_type(self.boundary, 'form-data')}
+
+    def _part_size(self):
+        return self.scaled(self.part_size, 64 * 1024)
+
+    def _parts(self, upload):
+        return [
+            part([('Content-Disposition',
+                   'form-data; name="upload"; filename="upload.bin"'),
+                  ('Content-Type', 'application/octet-stream')], upload),
+            part([('Content-Disposition', 'form-data; name="title"')],
+                 [b'a title']),
+            part([('Content-Disposition', 'form-data; name="tags"')],
+                 [b'a, few, tags']),
+        ]
+
+    def chunks(self):
+        block = random_block(64 * 1024, seed=5)
+        part_size = self._part_size()
+
+        def upload():
+            full, rest = divmod(part_size, len(block))
+            for _ in range(full):
+                yield block
+            yield block[:rest]
+
+        return multipart_body(self.boundary, self._parts(upload()))
+
+    def size(self):
+        envelope = multipart_body(self.boundary, self._parts([]))
+        return self._part_size() + sum(len(chunk) for chunk in envelope)
+
+    def consume(self, reader):
+        count = 0
+        for field in reader.iter_parts(match_names('title', 'tags')):
+            field.text()
+            count += 1
+        return count
+
+
+class NestedMixed(Workload):
+
+    name = 'nested_mixed'
+    description = '100 trees of multipart/mixed nested 100 levels deep'
+    depth = 100
+    trees = 100
+
+    def headers(self):
+        return {'Content-Type': content_type(self._boundary(0))}
+
+    def _boundary(self, level):
+        return 'NestedBoundaryLevel{:04d}'.format(level).encode()
+
+    def _tree(self, level, closing_crlf):
+        leaf = part([('Content-Type', 'text/plain')],
+                    [b'leaf at level ' + str(level).encode()])
+        parts = [leaf]
+        if level < self.depth:
+            inner = self._boundary(level + 1)
+            parts.append(part([('Content-Type', content_type(inner))],
+                              self._tree(level + 1, False)))
+        return multipart_body(self._boundary(level), parts, closing_crlf)
+
+    def chunks(self):
+        inner = self._boundary(1)
+        parts = (part([('Content-Type', content_type(inner))],
+                      self._tree(1, False))
+                 for _ in range(self.scaled(self.trees)))
+        return multipart_body(self._boundary(0), parts)
+
+    def consume(self, reader):
+        count = 0
+        for _, _, item in reader.walk():
+            item.read()
+            count += 1
+        return count
+
+
+class Base64Email(Workload):
+
+    name = 'email_base64'
+    description = '200 base64 encoded parts of 256 KiB, decoded'
+    boundary = b'===============Base64EmailBoundary=='
+    part_count = 200
+    part_size = 256 * 1024
+
+    def headers(self):
+        return {'Content-Type': content_type(self.boundary)}
+
+    def chunks(self):
+        data = base64.encodebytes(random_block(self.part_size, seed=2)) \
+            if hasattr(base64, 'encodebytes') \
+            else base64.encodestring(random_block(self.part_size, seed=2))
+        data = data.replace(b'\n', b'\r\n').rstrip()
+        parts = (part([('Content-Type', 'application/octet-stream'),
+                       ('Content-Transfer-Encoding', 'base64')], [data])
+                 for _ in range(self.scaled(self.part_count)))
+        return multipart_body(self.boundary, parts)
+
+    def consume(self, reader):
+        count = 0
+        for body in reader:
+            body.read(decode=True)
+            count += 1
+        return count
+
+
+class QuotedPrintableEmail(Base64Email):
+
+    name = 'email_qp'
+    description = '200 quoted-printable parts of 64 KiB of text, decoded'
+    boundary = b'===============QuotedPrintableBoundary=='
+    part_size = 64 * 1024
+
+    def chunks(self):
+        text = text_block(self.part_size, seed=3).replace(b'e', b'\xe9')
+        data = binascii.b2a_qp(text).replace(b'\n', b'\r\n')
+        parts = (part([('Content-Type', 'text/plain; charset=latin1'),
+                       ('Content-Transfer-Encoding', 'quoted-printable')],
+                      [data])
+                 for _ in range(self.scaled(self.part_count)))
+        return multipart_body(self.boundary, parts)
+
+
+class GzipParts(Base64Email):
+
+    name = 'gzip'
+    description = '100 gzip encoded parts of 1 MiB of text, decoded'
+    boundary = b'GzipPartsBoundaryp0o9i8u7y6'
+    part_count = 100
+    part_size = MB
+
+    def chunks(self):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        data = compressor.compress(text_block(self.part_size, seed=4))
+        data += compressor.flush()
+        parts = (part([('Content-Type', 'text/plain'),
+                       ('Content-Encoding', 'gzip')], [data])
+                 for _ in range(self.scaled(self.part_count)))
+        return multipart_body(self.boundary, parts)
+
+
+WORKLOADS = [FormFields, BinaryParts, ReleasedParts, InMemoryParts,
+             SelectedFields, NestedMixed, Base64Email, QuotedPrintableEmail,
+             GzipParts]
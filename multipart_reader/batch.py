@@ -0,0 +1,203 @@
+"""Reader of batch bodies, as OData ``$batch`` or Google batch requests and
+responses: ``multipart/mixed`` bodies whose parts are ``application/http``
+messages, parsed in the same streaming pass."""
+import json
+import re
+
+from . import errors
+from . import hdrs
+from .helpers import parse_mimetype
+from .multipart import BodyPartReader, MultipartReader
+from .protocol import HttpParser
+
+
+__all__ = ('BatchReader', 'BatchRequest', 'BatchResponse', 'HttpPart')
+
+_STATUS_RE = re.compile(r'HTTP/(\d+)\.(\d+)\s+(\d{3})(?:\s+(.*))?\Z')
+_REQUEST_RE = re.compile(r'([!#$%&\'*+.^_`|~0-9A-Za-z-]+)\s+(\S+)'
+                         r'(?:\s+HTTP/(\d+)\.(\d+))?\Z')
+
+
+class _Message(object):
+
+    __slots__ = ('version', 'headers', 'body', 'content_id')
+
+    def text(self, encoding=None):
+        """Returns the body decoded with ``encoding`` or the charset of its
+        ``Content-Type``, UTF-8 by default."""
+        if encoding is None:
+            params = parse_mimetype(self.headers.get(hdrs.CONTENT_TYPE))[3]
+            encoding = params.get('charset') or 'utf-8'
+        return self.body.decode(encoding)
+
+    def json(self, encoding=None):
+        """Like :meth:`text`, but returns the loaded JSON document."""
+        return json.loads(self.text(encoding))
+
+
+class BatchRequest(_Message):
+    """Request of a batch body.
+
+    :ivar str method: Request method
+    :ivar str path: Request target
+    :ivar tuple version: HTTP version, e.g. ``(1, 1)``
+    :ivar headers: Request headers
+    :ivar bytes body: Request body, as sent
+    :ivar str content_id: ``Content-ID`` of the enclosing part, if any
+    """
+
+    __slots__ = ('method', 'path')
+
+    def __init__(self, method, path, version, headers, body,
+                 content_id=None):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.content_id = content_id
+
+    def __repr__(self):
+        return '<BatchRequest {} {}>'.format(self.method, self.path)
+
+
+class BatchResponse(_Message):
+    """Response of a batch body.
+
+    :ivar tuple version: HTTP version, e.g. ``(1, 1)``
+    :ivar int status: Status code
+    :ivar str reason: Reason phrase
+    :ivar headers: Response headers
+    :ivar bytes body: Response body, as sent
+    :ivar str content_id: ``Content-ID`` of the enclosing part, if any
+    """
+
+    __slots__ = ('status', 'reason')
+
+    def __init__(self, version, status, reason, headers, body,
+                 content_id=None):
+        self.version = version
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.content_id = content_id
+
+    def __repr__(self):
+        return '<BatchResponse {} {}>'.format(self.status, self.reason)
+
+
+class HttpPart(BodyPartReader):
+    """Body part holding an ``application/http`` message."""
+
+    def message(self, read_body=True):
+        """Parses the HTTP message of the body part, its headers first.
+
+        The body of the message is bounded by its ``Content-Length``, or
+        spans the rest of the body part. It is returned as sent, with no
+        ``Content-Encoding`` decoding.
+
+        :param bool read_body: Whether to read the body of the message.
+                               If not, its ``body`` is ``None`` and the body
+                               part is left at the start of the body, to be
+                               streamed with :meth:`readline`
+        :returns: :class:`BatchRequest` or :class:`BatchResponse`
+        :raises: :exc:`~multipart_reader.errors.BadStatusLine` if the first
+                 line is neither a request nor a status line
+        """
+        line = self._head_line()
+        while line in (b'\r\n', b'\n'):
+            line = self._head_line()
+        lines = ['']
+        while line.rstrip(b'\r\n'):
+            # latin-1, as HTTP header bytes are not all UTF-8
+            lines.append(line.rstrip(b'\r\n').decode('latin-1'))
+            line = self._head_line()
+        lines.append('')
+        if len(lines) < 3:
+            raise errors.BadStatusLine('')
+        start_line = lines.pop(1).strip()
+        max_headers = self.limits.max_headers
+        parser = HttpParser(max_headers=max_headers) \
+            if max_headers is not None else HttpParser()
+        headers, _, _ = parser.parse_headers(lines)
+        body = None
+        if read_body:
+            length = headers.get(hdrs.CONTENT_LENGTH)
+            body = self._read_body(int(length) if length is not None
+                                   else None)
+        content_id = self.meta.content_id
+        match = _STATUS_RE.match(start_line)
+        if match is not None:
+            major, minor, status, reason = match.groups()
+            return BatchResponse((int(major), int(minor)), int(status),
+                                 reason or '', headers, body, content_id)
+        match = _REQUEST_RE.match(start_line)
+        if match is not None:
+            method, path, major, minor = match.groups()
+            version = (int(major), int(minor)) if major else (1, 1)
+            return BatchRequest(method.upper(), path, version, headers,
+                                body, content_id)
+        raise errors.BadStatusLine(start_line)
+
+    def _head_line(self):
+        # whole line, while readline() splits the ones past chunk_size
+        max_line_size = MultipartReader.max_line_size
+        line = b''
+        while not line.endswith(b'\n'):
+            piece = self.readline()
+            if not piece:
+                break
+            line += bytes(piece)
+            if len(line) > max_line_size:
+                raise errors.LineTooLong('batch message headers',
+                                         max_line_size)
+        return line
+
+    def _read_body(self, length):
+        # by lines, as a Content-Length bounded part is read by readline()
+        # once its head is; data past length is dropped
+        body = bytearray()
+        while not self.at_eof():
+            line = self.readline()
+            if line and (length is None or len(body) < length):
+                body.extend(line)
+        if length is not None:
+            if len(body) < length:
+                raise errors.BadHttpMessage(
+                    'batch message body of {} bytes, expected {}'
+                    ''.format(len(body), length))
+            del body[length:]
+        return bytes(body)
+
+
+class BatchReader(MultipartReader):
+    """Reader of batch bodies.
+
+    Iterating over it yields :class:`HttpPart` and nested readers, as
+    :class:`MultipartReader` does; :meth:`messages` yields the parsed
+    messages instead.
+    """
+
+    part_reader_cls = HttpPart
+
+    def _read_boundary(self):
+        while self._peekline() in (b'\r\n', b'\n'):
+            # epilogue of a nested body, as OData servers send after a
+            # change set
+            self._readline()
+        super(BatchReader, self)._read_boundary()
+
+    def messages(self):
+        """Iterates over the HTTP messages of the body, the ones of nested
+        bodies included, e.g. of OData change sets.
+
+        Body parts other than ``application/http`` are released unread.
+
+        :returns: iterator of :class:`BatchRequest` or :class:`BatchResponse`
+        """
+        for _, _, part in self.walk():
+            if part.meta.mimetype == 'application/http':
+                yield part.message()
+            else:
+                part.release()
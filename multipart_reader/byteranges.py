@@ -0,0 +1,226 @@
+"""Reader of ``multipart/byteranges`` bodies (RFC 7233), as sent in HTTP
+206 responses, writing each range at its offset of a target file."""
+import os
+import re
+import threading
+
+from collections import deque, namedtuple
+
+from . import hdrs
+from .helpers import reify
+from .multipart import BodyPartReader, MultipartReader
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # Python 2 without the futures backport
+    ThreadPoolExecutor = None
+
+
+__all__ = ('ByteRangesReader', 'ByteRangePart', 'ContentRange',
+           'parse_content_range')
+
+_CONTENT_RANGE_RE = re.compile(
+    r'\s*([A-Za-z]+)\s+(?:(\d+)-(\d+)|\*)/(?:(\d+)|\*)\s*\Z')
+
+
+class ContentRange(namedtuple('ContentRange', 'unit start end total')):
+    """Parsed ``Content-Range`` header.
+
+    :param str unit: Range unit, e.g. ``bytes``
+    :param int start: First byte position, ``None`` for unsatisfied ranges
+    :param int end: Last byte position, inclusive
+    :param int total: Complete length, ``None`` if unknown
+    """
+
+    __slots__ = ()
+
+    @property
+    def length(self):
+        """Number of bytes of the range."""
+        if self.start is None:
+            return 0
+        return self.end - self.start + 1
+
+
+def parse_content_range(header):
+    """Parses ``Content-Range`` header value.
+
+    :param str header: Header value, e.g. ``bytes 0-499/1234``
+    :returns: :class:`ContentRange` or ``None`` if the header is missed or
+              malformed
+    """
+    if not header:
+        return None
+    match = _CONTENT_RANGE_RE.match(header)
+    if match is None:
+        return None
+    unit, start, end, total = match.groups()
+    if start is None:
+        if total is None:
+            return None
+        return ContentRange(unit.lower(), None, None, int(total))
+    start, end = int(start), int(end)
+    total = int(total) if total is not None else None
+    if end < start or (total is not None and end >= total):
+        return None
+    return ContentRange(unit.lower(), start, end, total)
+
+
+if hasattr(os, 'pwrite'):
+    def _pwrite(fd, data, offset, lock=None):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+else:  # Windows and Python 2
+    def _pwrite(fd, data, offset, lock):
+        with lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+
+
+class _Writer(object):
+    """Positional writes of a file, spread over a thread pool with at most
+    ``max_pending`` writes waiting at once."""
+
+    def __init__(self, fd, workers, max_pending):
+        self.fd = fd
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._max_pending = max_pending
+        if workers > 1 and ThreadPoolExecutor is not None:
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            self._executor = None
+
+    def write(self, data, offset):
+        if self._executor is None:
+            _pwrite(self.fd, data, offset, self._lock)
+            return
+        while len(self._pending) >= self._max_pending:
+            self._pending.popleft().result()
+        self._pending.append(self._executor.submit(
+            _pwrite, self.fd, data, offset, self._lock))
+
+    def close(self):
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+
+
+class ByteRangePart(BodyPartReader):
+    """Body part of a ``multipart/byteranges`` body."""
+
+    @reify
+    def content_range(self):
+        """Parsed ``Content-Range`` header, see :class:`ContentRange`, or
+        ``None`` if missed or malformed."""
+        return parse_content_range(self.headers.get(hdrs.CONTENT_RANGE))
+
+    @property
+    def start(self):
+        """First byte position of the range."""
+        return self._range.start
+
+    @property
+    def end(self):
+        """Last byte position of the range, inclusive."""
+        return self._range.end
+
+    @property
+    def total(self):
+        """Complete length of the resource, ``None`` if unknown."""
+        return self._range.total
+
+    @property
+    def _range(self):
+        content_range = self.content_range
+        if content_range is None:
+            raise ValueError('invalid Content-Range: %r'
+                             % self.headers.get(hdrs.CONTENT_RANGE))
+        if content_range.unit != 'bytes':
+            raise ValueError('unsupported range unit: %r'
+                             % content_range.unit)
+        return content_range
+
+    def _write_into(self, writer, buffer_size):
+        if self.start is None:
+            self.release()
+            return 0
+        offset = self.start
+        length = self._range.length
+        buf = bytearray()
+        for chunk in self.iter_chunks(self.chunk_size):
+            buf.extend(chunk)
+            if offset + len(buf) - self.start > length:
+                # nothing past the range may reach the file, it would
+                # overwrite the next range
+                raise ValueError('range %d-%d got more than %d bytes'
+                                 % (self.start, self.end, length))
+            if len(buf) >= buffer_size:
+                writer.write(buf, offset)
+                offset += len(buf)
+                buf = bytearray()
+        if buf:
+            writer.write(buf, offset)
+            offset += len(buf)
+        written = offset - self.start
+        if written != length:
+            raise ValueError('range %d-%d got %d bytes'
+                             % (self.start, self.end, written))
+        return written
+
+
+class ByteRangesReader(MultipartReader):
+    """Reader of ``multipart/byteranges`` bodies.
+
+    Iterating over it yields :class:`ByteRangePart`, with ``start``,
+    ``end`` and ``total`` of their ``Content-Range``. :meth:`write_into`
+    reassembles every range into a file.
+    """
+
+    part_reader_cls = ByteRangePart
+
+    def write_into(self, target, workers=4, buffer_size=1024 * 1024,
+                   max_pending=8):
+        """Writes every range of the body at its offset of ``target``.
+
+        The body is read sequentially while ranges are written, in blocks
+        of ``buffer_size`` bytes, by a pool of ``workers`` threads using
+        ``os.pwrite``. Memory is bounded by ``max_pending`` blocks waiting
+        to be written.
+
+        :param target: Path of the file to write, created if missed, or a
+                       file descriptor opened for writing
+        :param int workers: Writing threads, 1 to write synchronously
+        :param int buffer_size: Size of the blocks written
+        :param int max_pending: Most blocks waiting to be written
+        :returns: Number of bytes written
+        :rtype: int
+        """
+        if isinstance(target, int):
+            fd, owned = target, False
+        else:
+            fd = os.open(target, os.O_WRONLY | os.O_CREAT |
+                         getattr(os, 'O_BINARY', 0), 0o666)
+            owned = True
+        writer = _Writer(fd, workers, max_pending)
+        written = 0
+        try:
+            for part in self:
+                if isinstance(part, MultipartReader):
+                    raise ValueError('nested multipart body in byteranges')
+                written += part._write_into(writer, buffer_size)
+        finally:
+            try:
+                writer.close()
+            finally:
+                if owned:
+                    os.close(fd)
+        return written
@@ -0,0 +1,370 @@
+"""Synthetic multipart corpus generator.
+
+Builds reproducible multipart bodies of any size as a stream of byte
+chunks, so that load tests, benchmarks and fuzzers never hold a whole body
+in memory. The same seed and options always produce the same bytes::
+
+    corpus = Corpus(seed=42, parts=uniform(10, 100), sizes=lognormal(4096),
+                    depth=2, transfer_encodings=(None, 'base64'),
+                    adversarial=0.1)
+    with open('body.bin', 'wb') as fp:
+        corpus.write(fp)
+    reader = MultipartReader(corpus.headers, corpus.stream())
+
+It can also be run as a script, see ``python -m multipart_reader.corpus -h``.
+"""
+import argparse
+import binascii
+import math
+import random
+import string
+import sys
+import zlib
+
+from .multipart import ChunkStream
+
+
+__all__ = ('Corpus', 'fixed', 'uniform', 'lognormal')
+
+
+#: Size of the blocks body contents are sliced from, and of the writes
+#: issued by :meth:`Corpus.write`.
+BLOCK_SIZE = 64 * 1024
+
+BOUNDARY_CHARS = string.ascii_letters + string.digits
+
+WORDS = (b'multipart', b'reader', b'python', b'stream', b'boundary', b'part',
+         b'header', b'body', b'content', b'type', b'disposition', b'chunk')
+
+
+def fixed(value):
+    """Distribution always returning ``value``."""
+    return lambda rnd: value
+
+
+def uniform(low, high):
+    """Distribution of integers uniformly drawn from ``[low, high]``."""
+    return lambda rnd: rnd.randint(low, high)
+
+
+def lognormal(median, sigma=1.0, maximum=None):
+    """Distribution of integers, log-normally spread around ``median``.
+
+    Mimics real world payloads: mostly small parts, and a long tail of
+    large ones, optionally capped at ``maximum``.
+    """
+    mu = math.log(median)
+
+    def draw(rnd):
+        value = int(rnd.lognormvariate(mu, sigma))
+        if maximum is not None:
+            value = min(value, maximum)
+        return value
+    return draw
+
+
+def _distribution(value):
+    if callable(value):
+        return value
+    return fixed(value)
+
+
+class Corpus(object):
+    """Reproducible synthetic multipart body.
+
+    Sizes and counts are either integers or distributions, callables
+    drawing an integer from the :class:`random.Random` instance they are
+    given, such as :func:`fixed`, :func:`uniform` or :func:`lognormal`.
+
+    :param int seed: Seed of the pseudo-random generator
+    :param parts: Number of body parts of every multipart body
+    :param sizes: Size in bytes of every body part content, before any
+                  compression or transfer encoding
+    :param int depth: Maximum nesting level of multipart body parts
+    :param float nesting: Probability for a body part to be a nested
+                          multipart body, while ``depth`` allows it
+    :param str subtype: Multipart subtype of the outer body
+    :param content_types: Leaf content types to pick from, ``text/*`` ones
+                          get line-oriented text content, others binary
+    :param transfer_encodings: ``Content-Transfer-Encoding`` values to pick
+                               from, among ``None``, ``binary``, ``8bit``,
+                               ``base64`` and ``quoted-printable``
+    :param content_encodings: ``Content-Encoding`` values to pick from,
+                              among ``None``, ``identity``, ``gzip`` and
+                              ``deflate``
+    :param float content_length: Probability for a body part sent as is to
+                                 come with a ``Content-Length`` header
+    :param float adversarial: Probability for a body part sent as is to
+                              contain lines looking like, but not being,
+                              its delimiter
+    :param bytes boundary: Boundary of the outer body, random by default
+    """
+
+    def __init__(self, seed=0, parts=10, sizes=1024, depth=0, nesting=0.2,
+                 subtype='mixed', content_types=('application/octet-stream',
+                                                 'text/plain'),
+                 transfer_encodings=(None,), content_encodings=(None,),
+                 content_length=0., adversarial=0., boundary=None):
+        self.seed = seed
+        self.parts = _distribution(parts)
+        self.sizes = _distribution(sizes)
+        self.depth = depth
+        self.nesting = nesting
+        self.subtype = subtype
+        self.content_types = tuple(content_types)
+        self.transfer_encodings = tuple(transfer_encodings)
+        self.content_encodings = tuple(content_encodings)
+        self.content_length = content_length
+        self.adversarial = adversarial
+        if boundary is None:
+            boundary = self._boundary(random.Random(seed))
+        self.boundary = boundary
+
+    @property
+    def headers(self):
+        """Headers of the outer body, to pass to the reader."""
+        return {'Content-Type': self._content_type(self.subtype,
+                                                   self.boundary)}
+
+    def chunks(self):
+        """Yields the body as byte chunks of about :data:`BLOCK_SIZE`."""
+        buf = []
+        size = 0
+        for chunk in self._raw_chunks():
+            buf.append(chunk)
+            size += len(chunk)
+            if size >= BLOCK_SIZE:
+                yield b''.join(buf)
+                buf = []
+                size = 0
+        if buf:
+            yield b''.join(buf)
+
+    def __iter__(self):
+        return self.chunks()
+
+    def stream(self):
+        """Returns the body as a file-like object, see
+        :class:`~multipart_reader.multipart.ChunkStream`."""
+        return ChunkStream(self.chunks())
+
+    def write(self, target):
+        """Writes the body to a file or a socket.
+
+        :param target: Object with either a ``write`` or a ``sendall`` method
+        :returns: Number of bytes written
+        :rtype: int
+        """
+        send = getattr(target, 'sendall', None) or target.write
+        written = 0
+        for chunk in self.chunks():
+            send(chunk)
+            written += len(chunk)
+        return written
+
+    def _raw_chunks(self):
+        rnd = random.Random(self.seed)
+        # the outer boundary is drawn first, whether it is used or not
+        self._boundary(rnd)
+        pools = {
+            False: self._binary_pool(rnd),
+            True: self._text_pool(rnd),
+        }
+        return self._multipart(rnd, pools, self.boundary, 0, True)
+
+    def _boundary(self, rnd):
+        return ''.join(rnd.choice(BOUNDARY_CHARS)
+                       for _ in range(32)).encode()
+
+    def _content_type(self, subtype, boundary):
+        return 'multipart/{}; boundary="{}"'.format(subtype,
+                                                    boundary.decode())
+
+    def _binary_pool(self, rnd):
+        return bytes(bytearray(rnd.getrandbits(8)
+                               for _ in range(2 * BLOCK_SIZE)))
+
+    def _text_pool(self, rnd):
+        lines = []
+        size = 0
+        while size < 2 * BLOCK_SIZE:
+            line = b' '.join(rnd.choice(WORDS)
+                             for _ in range(rnd.randint(1, 12)))
+            lines.append(line)
+            size += len(line) + 2
+        return b'\r\n'.join(lines)[:2 * BLOCK_SIZE]
+
+    def _multipart(self, rnd, pools, boundary, level, closing_crlf):
+        delimiter = b'--' + boundary
+        for index in range(self.parts(rnd)):
+            if level < self.depth and rnd.random() < self.nesting:
+                inner = self._boundary(rnd)
+                headers = [('Content-Type',
+                            self._content_type('mixed', inner))]
+                body = self._multipart(rnd, pools, inner, level + 1, False)
+            else:
+                headers, body = self._part(rnd, pools, delimiter, index)
+            yield self._head(delimiter, headers)
+            for chunk in body:
+                yield chunk
+            yield b'\r\n'
+        yield delimiter + b'--' + (b'\r\n' if closing_crlf else b'')
+
+    def _head(self, delimiter, headers):
+        head = [delimiter]
+        for name, value in headers:
+            head.append('{}: {}'.format(name, value).encode('latin1'))
+        head.append(b'')
+        return b'\r\n'.join(head) + b'\r\n'
+
+    def _part(self, rnd, pools, delimiter, index):
+        content_type = rnd.choice(self.content_types)
+        transfer_encoding = rnd.choice(self.transfer_encodings)
+        content_encoding = rnd.choice(self.content_encodings)
+        size = self.sizes(rnd)
+        text = content_type.startswith('text/')
+
+        headers = [('Content-Type', content_type + (
+            '; charset=utf-8' if text else ''))]
+        headers.append((
+            'Content-Disposition',
+            'form-data; name="part{0}"; filename="part{0}.bin"'.format(index)
+            if not text else 'form-data; name="part{}"'.format(index)))
+
+        body = self._content(rnd, pools[text], size)
+        as_is = True
+        if content_encoding not in (None, 'identity'):
+            headers.append(('Content-Encoding', content_encoding))
+            body = self._compress(body, content_encoding)
+            as_is = False
+        if transfer_encoding is not None:
+            headers.append(('Content-Transfer-Encoding', transfer_encoding))
+            if transfer_encoding == 'base64':
+                body = self._base64(body)
+                as_is = False
+            elif transfer_encoding == 'quoted-printable':
+                body = self._quoted_printable(body)
+                as_is = False
+
+        if as_is:
+            if rnd.random() < self.adversarial:
+                body = self._adversarial(rnd, body, delimiter)
+            if rnd.random() < self.content_length:
+                headers.append(('Content-Length', str(size)))
+        return headers, body
+
+    def _content(self, rnd, pool, size):
+        while size > 0:
+            length = min(size, BLOCK_SIZE)
+            offset = rnd.randint(0, len(pool) - length)
+            yield pool[offset:offset + length]
+            size -= length
+
+    def _adversarial(self, rnd, body, delimiter):
+        """Overwrites a near-delimiter line in every chunk that fits one."""
+        snippets = (
+            # delimiter missing its last character
+            b'\r\n' + delimiter[:-1] + b'\r\n',
+            # delimiter followed by something else than whitespace
+            b'\r\n' + delimiter + b'x\r\n',
+            b'\r\n' + delimiter + b'-\r\n',
+            b'\r\n' + delimiter[1:] + b'\r\n',
+            # delimiter not at the start of a line
+            b'\r\nx' + delimiter + b'--\r\n',
+            # delimiter at the start of the second piece of a long line
+            b'\r\n' + b'x' * 8192 + delimiter + b'\r\n',
+            b'\r\n' + b'-' * 76 + b'\r\n',
+        )
+        for chunk in body:
+            snippet = rnd.choice(snippets)
+            if len(snippet) <= len(chunk):
+                cut = rnd.randint(0, len(chunk) - len(snippet))
+                chunk = chunk[:cut] + snippet + chunk[cut + len(snippet):]
+            yield chunk
+
+    def _compress(self, body, encoding):
+        if encoding == 'gzip':
+            compressor = zlib.compressobj(6, zlib.DEFLATED,
+                                          16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        else:
+            raise ValueError('unknown content encoding %r' % encoding)
+        for chunk in body:
+            chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+        yield compressor.flush()
+
+    def _base64(self, body):
+        """Encodes in lines of 76 characters separated by CRLF."""
+        tail = b''
+        sep = b''
+        for chunk in body:
+            chunk = tail + chunk
+            end = len(chunk) - len(chunk) % 57
+            tail = chunk[end:]
+            if end:
+                yield sep + b'\r\n'.join(
+                    binascii.b2a_base64(chunk[i:i + 57])[:-1]
+                    for i in range(0, end, 57))
+                sep = b'\r\n'
+        if tail:
+            yield sep + binascii.b2a_base64(tail)[:-1]
+
+    def _quoted_printable(self, body):
+        """Encodes chunk by chunk, joined by soft line breaks."""
+        sep = b''
+        for chunk in body:
+            if chunk:
+                chunk = binascii.b2a_qp(chunk, istext=False)
+                yield sep + chunk.replace(b'\n', b'\r\n')
+                sep = b'=\r\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Writes a synthetic multipart body, its Content-Type '
+                    'header going to stderr.')
+    parser.add_argument('-o', '--output', help='output file, stdout if '
+                        'omitted')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--parts', type=int, default=10,
+                        help='body parts per multipart body')
+    parser.add_argument('--size', type=int, default=1024,
+                        help='median body part size in bytes')
+    parser.add_argument('--sigma', type=float, default=0.,
+                        help='log-normal spread of sizes, 0 for fixed sizes')
+    parser.add_argument('--depth', type=int, default=0,
+                        help='maximum nesting level')
+    parser.add_argument('--nesting', type=float, default=0.2)
+    parser.add_argument('--subtype', default='mixed')
+    parser.add_argument('--transfer-encoding', nargs='+', default=[None],
+                        choices=['binary', '8bit', 'base64',
+                                 'quoted-printable'])
+    parser.add_argument('--content-encoding', nargs='+', default=[None],
+                        choices=['identity', 'gzip', 'deflate'])
+    parser.add_argument('--content-length', type=float, default=0.)
+    parser.add_argument('--adversarial', type=float, default=0.)
+    args = parser.parse_args(argv)
+
+    sizes = (lognormal(args.size, args.sigma) if args.sigma
+             else fixed(args.size))
+    corpus = Corpus(args.seed, args.parts, sizes, args.depth, args.nesting,
+                    args.subtype,
+                    transfer_encodings=args.transfer_encoding,
+                    content_encodings=args.content_encoding,
+                    content_length=args.content_length,
+                    adversarial=args.adversarial)
+    sys.stderr.write('Content-Type: {}\n'.format(
+        corpus.headers['Content-Type']))
+    if args.output:
+        with open(args.output, 'wb') as fp:
+            corpus.write(fp)
+    else:
+        corpus.write(getattr(sys.stdout, 'buffer', sys.stdout))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
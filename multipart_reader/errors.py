@@ -39,8 +39,46 @@ class InvalidHeader(BadHttpMessage):
         self.hdr = hdr
 
 
+class BadStatusLine(BadHttpMessage):
+
+    def __init__(self, line=''):
+        if not line:
+            line = repr(line)
+        super(BadStatusLine, self).__init__(
+            'Bad status line: {0}'.format(line))
+        self.line = line
+
+
 class LineTooLong(BadHttpMessage):
 
     def __init__(self, line, limit='Unknown'):
         super(LineTooLong, self).__init__(
             'got more than {0} bytes when reading {1}'.format(limit, line))
+
+
+class PathologicalInput(BadHttpMessage):
+
+    def __init__(self, reason):
+        super(PathologicalInput, self).__init__(
+            'Pathological input: {0}'.format(reason))
+        self.reason = reason
+
+
+class TruncatedBody(BadHttpMessage):
+
+    def __init__(self, expected, received):
+        super(TruncatedBody, self).__init__(
+            'Body ended after {0} of {1} bytes'.format(received, expected))
+        self.expected = expected
+        self.received = received
+
+
+class LimitExceeded(BadHttpMessage):
+
+    code = 413
+
+    def __init__(self, name, limit):
+        super(LimitExceeded, self).__init__(
+            '{0} limit of {1} exceeded'.format(name, limit))
+        self.name = name
+        self.limit = limit
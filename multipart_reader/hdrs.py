@@ -3,6 +3,8 @@
 CONNECTION = 'CONNECTION'
 CONTENT_DISPOSITION = 'CONTENT-DISPOSITION'
 CONTENT_ENCODING = 'CONTENT-ENCODING'
+CONTENT_ID = 'CONTENT-ID'
 CONTENT_LENGTH = 'CONTENT-LENGTH'
+CONTENT_RANGE = 'CONTENT-RANGE'
 CONTENT_TRANSFER_ENCODING = 'CONTENT-TRANSFER-ENCODING'
 CONTENT_TYPE = 'CONTENT-TYPE'
@@ -1,17 +1,133 @@
 """Various helper functions"""
+import functools
+import threading
 
+from collections import namedtuple, OrderedDict
 
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
+
+class FrozenDict(dict):
+    """Read-only dict, used for results shared through caches."""
+
+    def __init__(self, *args, **kwargs):
+        if self:
+            # re-initialising would update a value shared through a cache
+            self._immutable()
+        super(FrozenDict, self).__init__(*args, **kwargs)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('{} is immutable'.format(self.__class__.__name__))
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def copy(self):
+        """Return a mutable copy of itself."""
+        return dict(self)
+
+    def __reduce__(self):
+        # the default protocol fills an empty instance item by item
+        return self.__class__, (dict(self),)
+
+
+class LRUCache(object):
+    """Bounded, thread-safe memoisation of a single argument function.
+
+    Results are shared between callers, so the wrapped function must
+    return immutable values. Arguments longer than ``max_key_length``
+    are never stored: a flood of unique oversized values would only
+    evict the useful entries.
+
+    :param func: Function to memoise
+    :param int maxsize: Maximum number of cached results, ``0`` disables
+                        caching
+    :param int max_key_length: Longest argument worth to be cached
+    """
+
+    def __init__(self, func, maxsize=256, max_key_length=1024):
+        self._func = func
+        self._maxsize = maxsize
+        self._max_key_length = max_key_length
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        functools.update_wrapper(self, func)
+
+    def __call__(self, key):
+        try:
+            cacheable = (self._maxsize and
+                         len(key) <= self._max_key_length and
+                         hash(key) is not None)
+        except TypeError:
+            cacheable = False
+        if not cacheable:
+            return self._func(key)
+        with self._lock:
+            try:
+                value = self._cache.pop(key)
+            except KeyError:
+                self._misses += 1
+            else:
+                self._cache[key] = value
+                self._hits += 1
+                return value
+        value = self._func(key)
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+        return value
+
+    def cache_info(self):
+        """Returns hits, misses, maxsize and current size of the cache.
+
+        :rtype: CacheInfo
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses,
+                             self._maxsize, len(self._cache))
+
+    def cache_clear(self):
+        """Drops all cached results and resets the statistics."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
+
+    def set_maxsize(self, maxsize):
+        """Changes the cache size, evicting the oldest results if needed.
+
+        :param int maxsize: Maximum number of cached results, ``0`` disables
+                            caching
+        """
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._cache) > maxsize:
+                self._cache.popitem(last=False)
+
+
+def lru_cache(maxsize=256, max_key_length=1024):
+    """Decorator form of :class:`LRUCache`."""
+    def wrapper(func):
+        return LRUCache(func, maxsize, max_key_length)
+    return wrapper
+
+
+@lru_cache()
 def parse_mimetype(mimetype):
     """Parses a MIME type into its components.
     :param str mimetype: MIME type
     :returns: 4 element tuple for MIME type, subtype, suffix and parameters
+              as a read-only dict
     :rtype: tuple
     Example:
     >>> parse_mimetype('text/html; charset=utf-8')
     ('text', 'html', '', {'charset': 'utf-8'})
     """
     if not mimetype:
-        return '', '', '', {}
+        return '', '', '', FrozenDict()
 
     parts = mimetype.split(';')
     params = []
@@ -20,7 +136,7 @@ def parse_mimetype(mimetype):
             continue
         key, value = item.split('=', 1) if '=' in item else (item, '')
         params.append((key.lower().strip(), value.strip(' "')))
-    params = dict(params)
+    params = FrozenDict(params)
 
     fulltype = parts[0].strip().lower()
     if fulltype == '*':
@@ -31,3 +147,24 @@ def parse_mimetype(mimetype):
     stype, suffix = stype.split('+', 1) if '+' in stype else (stype, '')
 
     return mtype, stype, suffix, params
+
+
+class reify(object):
+    """Use as a class method decorator. It operates almost exactly like
+    the Python ``@property`` decorator, but it puts the result of the
+    method it decorates into the instance dict after the first call,
+    effectively replacing the function it decorates with an instance
+    variable. It is, in Python parlance, a non-data descriptor.
+    """
+
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+        self.name = wrapped.__name__
+        self.__doc__ = getattr(wrapped, '__doc__', None)
+
+    def __get__(self, inst, owner):
+        if inst is None:
+            return self
+        val = self.wrapped(inst)
+        setattr(inst, self.name, val)
+        return val
@@ -11,6 +11,28 @@ __all__ = ('MultiDict', 'MultiDictProxy', 'CIMultiDict')
 
 _marker = object()
 
+#: Upper-cased copies of the frozensets compared against case-insensitive
+#: key views, so constant header sets are converted only once.
+_CI_KEYS_CACHE = {}
+_CI_KEYS_CACHE_SIZE = 256
+
+_viewkeys = getattr(dict, 'viewkeys', dict.keys)
+
+
+def _upper_keys(keys):
+    if isinstance(keys, frozenset):
+        try:
+            return _CI_KEYS_CACHE[keys]
+        except KeyError:
+            pass
+    upper = frozenset(k if not isinstance(k, str) else k.upper()
+                      for k in keys)
+    if isinstance(keys, frozenset):
+        if len(_CI_KEYS_CACHE) >= _CI_KEYS_CACHE_SIZE:
+            _CI_KEYS_CACHE.clear()
+        _CI_KEYS_CACHE[keys] = upper
+    return upper
+
 
 class _Base(object):
 
@@ -18,18 +40,18 @@ class _Base(object):
 
     def getall(self, key, default=_marker):
         """Return a list of all values matching the key."""
-        res = [v for k, v in self._items if k == key]
-        if res:
-            return res
-        if not res and default is not _marker:
+        if key in self._index:
+            return [v for k, v in self._items if k == key]
+        if default is not _marker:
             return default
         raise KeyError('Key not found: %r' % key)
 
     def getone(self, key, default=_marker):
         """Get first value matching the key."""
-        for k, v in self._items:
-            if k == key:
-                return v
+        if key in self._index:
+            for k, v in self._items:
+                if k == key:
+                    return v
         if default is not _marker:
             return default
         raise KeyError('Key not found: %r' % key)
@@ -54,7 +76,7 @@ class _Base(object):
 
     def keys(self):
         """Return a new view of the dictionary's keys."""
-        return _KeysView(self._items, isCI=self.isCI)
+        return _KeysView(self._items, self._index, isCI=self.isCI)
 
     def items(self):
         """Return a new view of the dictionary's items *(key, value) pairs)."""
@@ -68,6 +90,12 @@ class _Base(object):
         if not isinstance(other, (_Base, dict)):
             return NotImplemented
         if isinstance(other, _Base):
+            if self._items == other._items:
+                return True
+            # the key index counts occurrences, so it rules out most
+            # mismatches before falling back to an order-insensitive check
+            if self._index != other._index:
+                return False
             return sorted(self._items) == sorted(other._items)
         for k, v in self.items():
             nv = other.get(k if not self.isCI else k.upper(), _marker)
@@ -76,10 +104,7 @@ class _Base(object):
         return True
 
     def __contains__(self, key):
-        for k, v in self._items:
-            if k == key:
-                return True
-        return False
+        return key in self._index
 
     def __repr__(self):
         body = ', '.join("'{}': {!r}".format(k, v) for k, v in self.items())
@@ -121,6 +146,7 @@ class MultiDictProxy(_Base):
                     type(arg)))
 
         self._items = arg._items
+        self._index = arg._index
 
     def copy(self):
         """Return a copy of itself."""
@@ -136,6 +162,7 @@ class CIMultiDictProxy(_CIBase, MultiDictProxy):
                 .format(type(arg)))
 
         self._items = arg._items
+        self._index = arg._index
 
     def copy(self):
         """Return a copy of itself."""
@@ -146,12 +173,15 @@ class MultiDict(_Base):
 
     def __init__(self, *args, **kwargs):
         self._items = []
+        # key -> number of occurrences, kept in sync with _items
+        self._index = {}
 
         self._extend(args, kwargs, self.__class__.__name__, self.add)
 
     def add(self, key, value):
         """Add the key and value, not overwriting any previous value."""
         self._items.append((key, value))
+        self._index[key] = self._index.get(key, 0) + 1
 
     def copy(self):
         """Return a copy of itself."""
@@ -193,7 +223,8 @@ class MultiDict(_Base):
 
     def clear(self):
         """Remove all items from MultiDict."""
-        self._items = []
+        del self._items[:]
+        self._index.clear()
 
     # Mapping interface #
 
@@ -201,21 +232,21 @@ class MultiDict(_Base):
         self._replace(key, value)
 
     def __delitem__(self, key):
+        if key not in self._index:
+            raise KeyError(key)
         items = self._items
-        found = False
         for i in range(len(items) - 1, -1, -1):
             if items[i][0] == key:
                 del items[i]
-                found = True
-        if not found:
-            raise KeyError(key)
+        del self._index[key]
 
     def setdefault(self, key, default=None):
         """Return value for key, set value to default if key is not present."""
-        for k, v in self._items:
-            if k == key:
-                return v
-        self._items.append((key, default))
+        if key in self._index:
+            for k, v in self._items:
+                if k == key:
+                    return v
+        self.add(key, default)
         return default
 
     def pop(self, key, default=_marker):
@@ -225,25 +256,29 @@ class MultiDict(_Base):
         KeyError is raised.
 
         """
+        if key not in self._index:
+            if default is _marker:
+                raise KeyError(key)
+            else:
+                return default
         value = None
-        found = False
         for i in range(len(self._items) - 1, -1, -1):
             if self._items[i][0] == key:
                 value = self._items[i][1]
                 del self._items[i]
-                found = True
-        if not found:
-            if default is _marker:
-                raise KeyError(key)
-            else:
-                return default
-        else:
-            return value
+        del self._index[key]
+        return value
 
     def popitem(self):
         """Remove and return an arbitrary (key, value) pair."""
         if self._items:
-            return self._items.pop(0)
+            key, value = self._items.pop(0)
+            count = self._index[key] - 1
+            if count:
+                self._index[key] = count
+            else:
+                del self._index[key]
+            return key, value
         else:
             raise KeyError("empty multidict")
 
@@ -336,15 +371,15 @@ class _ValuesView(_ViewBase):
 
 class _KeysView(_ViewBase):
 
-    def __init__(self, items, isCI=False):
+    def __init__(self, items, index=None, isCI=False):
         super(_KeysView, self).__init__(items)
+        if index is None:
+            index = dict.fromkeys(i[0] for i in items)
+        self._index = index
         self.isCI = isCI
 
     def __contains__(self, key):
-        for item in self._items:
-            if item[0] == key:
-                return True
-        return False
+        return key in self._index
 
     def __iter__(self):
         for item in self._items:
@@ -359,32 +394,58 @@ class _KeysView(_ViewBase):
 
     @property
     def __keys(self):
-        return set([i[0] for i in self._items])
+        # a live, set-like view over the multidict key index: no copy
+        return _viewkeys(self._index)
 
     def __check_other(self, other):
-        if not isinstance(other, (_KeysView, set)):
-            return NotImplemented
         if isinstance(other, _KeysView):
-            other = [o[0] for o in other._items]
+            if self.isCI and not other.isCI:
+                return _upper_keys(other.__keys)
+            return other.__keys
+        if not isinstance(other, (set, frozenset)):
+            return NotImplemented
         if self.isCI:
-            other = [o if not isinstance(o, str) else o.upper()
-                     for o in other]
-        return set(other)
+            return _upper_keys(other)
+        return other
 
     def isdisjoint(self, other):
-        return self.__keys.isdisjoint(self.__check_other(other))
+        other = self.__check_other(other)
+        if other is NotImplemented:
+            raise TypeError('unsupported operand type')
+        return self.__keys.isdisjoint(other)
 
     def __eq__(self, other):
-        return self.__keys == self.__check_other(other)
+        other = self.__check_other(other)
+        if other is NotImplemented:
+            return other
+        return self.__keys == other
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
 
     def __and__(self, other):
-        return self.__keys & self.__check_other(other)
+        other = self.__check_other(other)
+        if other is NotImplemented:
+            return other
+        return self.__keys & other
 
     def __or__(self, other):
-        return self.__keys | self.__check_other(other)
+        other = self.__check_other(other)
+        if other is NotImplemented:
+            return other
+        return self.__keys | other
 
     def __sub__(self, other):
-        return self.__keys - self.__check_other(other)
+        other = self.__check_other(other)
+        if other is NotImplemented:
+            return other
+        return self.__keys - other
 
     def __xor__(self, other):
-        return self.__keys ^ self.__check_other(other)
+        other = self.__check_other(other)
+        if other is NotImplemented:
+            return other
+        return self.__keys ^ other
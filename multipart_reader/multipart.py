@@ -5,19 +5,24 @@ import re
 import warnings
 import zlib
 
-from collections import deque
+from collections import namedtuple
+from timeit import default_timer as timer
 
-from . import hdrs
+from . import errors, hdrs
 
-from .helpers import parse_mimetype
+from .helpers import FrozenDict, lru_cache, parse_mimetype, reify
 from .multidict import CIMultiDict
 from .protocol import HttpParser
 from .compat import parse_qsl, unquote
 
 
-__all__ = ('MultipartReader',
+__all__ = ('MultipartReader', 'PartMeta', 'Diagnostic', 'report', 'Instrument',
+           'Instruments', 'ChunkStream',
+           'ReaderStats', 'ReaderContext', 'PathologicalInputDetector',
+           'PathologicalInputWarning', 'DecompressionBombWarning', 'Limits',
            'BadContentDispositionHeader', 'BadContentDispositionParam',
-           'parse_content_disposition', 'content_disposition_filename')
+           'parse_content_disposition', 'content_disposition_filename',
+           'match_names', 'match_mimetypes', 'match_content_ids')
 
 CHAR = set(chr(i) for i in range(0, 128))
 CTL = set(chr(i) for i in range(0, 32)) | {chr(127), }
@@ -41,88 +46,486 @@ class BadContentDispositionParam(BadEqMixin, RuntimeWarning):
     pass
 
 
-def parse_content_disposition(header):
-    def is_token(string):
-        return string and TOKEN >= set(string)
+class PathologicalInputWarning(RuntimeWarning):
+    pass
 
-    def is_quoted(string):
-        return string[0] == string[-1] == '"'
 
-    def is_rfc5987(string):
-        return is_token(string) and string.count("'") == 2
+class DecompressionBombWarning(RuntimeWarning):
+    pass
 
-    def is_extended_param(string):
-        return string.endswith('*')
 
-    def is_continuous_param(string):
-        pos = string.find('*') + 1
-        if not pos:
-            return False
-        substring = string[pos:-1] if string.endswith('*') else string[pos:]
-        return substring.isdigit()
+class Diagnostic(namedtuple('Diagnostic', 'category header value')):
+    """Problem found while reading a multipart body.
+
+    :param category: Warning class describing the problem, e.g.
+                     :exc:`BadContentDispositionHeader`
+    :param str header: Name of the header at fault, if any
+    :param value: Offending value
+    """
+
+    __slots__ = ()
+
+    def warning(self):
+        """Returns the problem as a warning instance."""
+        return self.category(self.value)
+
+
+def report(diagnostics, diagnostic):
+    """Reports a problem to a diagnostics collector, or as a warning when
+    there is no collector.
+
+    :param diagnostics: ``None``, a list to append the diagnostic to or a
+                        callable to call with it
+    :param Diagnostic diagnostic: Problem to report
+    """
+    if diagnostics is None:
+        warnings.warn(diagnostic.warning())
+    elif callable(diagnostics):
+        diagnostics(diagnostic)
+    else:
+        diagnostics.append(diagnostic)
+
+
+class Instrument(object):
+    """Receives events about the body parts being read.
+
+    Every hook does nothing by default: subclass and override the hooks you
+    need, then pass an instance as ``instrument`` to
+    :class:`MultipartReader`. Readers without instrument skip the events,
+    and their timing, entirely. Durations are in seconds.
+
+    Events are emitted for leaf body parts, the ones skipped by
+    :meth:`MultipartReader.iter_parts` included; nested multipart bodies
+    only pass the instrument on to their own body parts. Several
+    instruments are combined with :class:`Instruments`.
+    """
+
+    def on_part_start(self, headers):
+        """A body part begins, with the given headers."""
+
+    def on_headers_parsed(self, duration):
+        """The headers of the body part just started took ``duration`` to
+        read and parse."""
+
+    def on_data(self, nbytes):
+        """``nbytes`` of body part content were read."""
+
+    def on_false_boundary(self):
+        """A line of the body part started like the delimiter without being
+        one."""
+
+    def on_decode(self, encoding, in_bytes, out_bytes, duration):
+        """``in_bytes`` of data were decoded from ``encoding`` into
+        ``out_bytes``, within ``duration``."""
+
+    def on_part_end(self, total_bytes, duration):
+        """The body part ended after ``total_bytes`` of content, read in
+        ``duration`` since it started."""
+
+
+class Instruments(Instrument):
+    """Instrument passing every event on to several instruments, in turn,
+    e.g. a :class:`PathologicalInputDetector` along with one collecting
+    metrics. Readers given a list or tuple of instruments combine them with
+    it.
+
+    :param instruments: :class:`Instrument` instances
+    """
+
+    def __init__(self, *instruments):
+        self.instruments = instruments
+
+    def on_part_start(self, headers):
+        for instrument in self.instruments:
+            instrument.on_part_start(headers)
+
+    def on_headers_parsed(self, duration):
+        for instrument in self.instruments:
+            instrument.on_headers_parsed(duration)
+
+    def on_data(self, nbytes):
+        for instrument in self.instruments:
+            instrument.on_data(nbytes)
+
+    def on_false_boundary(self):
+        for instrument in self.instruments:
+            instrument.on_false_boundary()
+
+    def on_decode(self, encoding, in_bytes, out_bytes, duration):
+        for instrument in self.instruments:
+            instrument.on_decode(encoding, in_bytes, out_bytes, duration)
+
+    def on_part_end(self, total_bytes, duration):
+        for instrument in self.instruments:
+            instrument.on_part_end(total_bytes, duration)
+
+
+class PathologicalInputDetector(Instrument):
+    """Instrument spotting body parts unusually costly to read, such as
+    millions of tiny lines or lines mimicking the delimiter.
+
+    Each body part is checked on its own, as it is read. On the first
+    threshold crossed, :exc:`~multipart_reader.errors.PathologicalInput` is
+    raised, or if ``raise_error`` is false, a :class:`Diagnostic` of
+    :exc:`PathologicalInputWarning` is reported once per part and check.
+
+    :param float max_line_ratio: Most lines per byte of content, checked
+                                 once a part passed ``min_bytes``
+    :param int min_bytes: Content read before checking the line ratio
+    :param int max_false_boundaries: Most lines per part starting like the
+                                     delimiter without being one
+    :param float max_duration: Most seconds spent since a part started,
+                               ``None`` to leave reading time unchecked
+    :param bool raise_error: Raises instead of reporting
+    :param diagnostics: List or callable collecting reports, see
+                        :func:`report`
+    """
+
+    def __init__(self, max_line_ratio=0.125, min_bytes=64 * 1024,
+                 max_false_boundaries=100, max_duration=None,
+                 raise_error=True, diagnostics=None):
+        self.max_line_ratio = max_line_ratio
+        self.min_bytes = min_bytes
+        self.max_false_boundaries = max_false_boundaries
+        self.max_duration = max_duration
+        self.raise_error = raise_error
+        self.diagnostics = diagnostics
+        self.on_part_start(None)
+
+    def on_part_start(self, headers):
+        self._bytes = 0
+        self._lines = 0
+        self._false_boundaries = 0
+        self._reported = set()
+        if self.max_duration is not None:
+            self._started = timer()
+
+    def on_data(self, nbytes):
+        self._bytes += nbytes
+        self._lines += 1
+        if self._bytes >= self.min_bytes and \
+                self._lines > self._bytes * self.max_line_ratio:
+            self._detected('lines', '{} lines in {} bytes'.format(
+                self._lines, self._bytes))
+        if self.max_duration is not None:
+            duration = timer() - self._started
+            if duration > self.max_duration:
+                self._detected('duration', 'part read for {:.3f}s'.format(
+                    duration))
+
+    def on_false_boundary(self):
+        self._false_boundaries += 1
+        if self._false_boundaries > self.max_false_boundaries:
+            self._detected('false_boundaries', '{} lines alike delimiter'
+                           ''.format(self._false_boundaries))
+
+    def _detected(self, check, reason):
+        if self.raise_error:
+            raise errors.PathologicalInput(reason)
+        if check not in self._reported:
+            self._reported.add(check)
+            report(self.diagnostics,
+                   Diagnostic(PathologicalInputWarning, None, reason))
+
+
+class Limits(object):
+    """Resource limits of a multipart reader, checked as the body is read
+    so that abusive bodies are rejected without being buffered.
+    :exc:`~multipart_reader.errors.LimitExceeded` is raised on the first
+    limit exceeded. ``None`` leaves a resource unlimited.
+
+    :param int max_parts: Most body parts, nested ones included
+    :param int max_part_size: Most content bytes of a body part, before
+                              decoding
+    :param int max_body_size: Most bytes read from the stream
+    :param int max_header_size: Most bytes of the headers of a body part
+    :param int max_headers: Most headers of a body part
+    :param int max_depth: Deepest nesting of multipart bodies, 0 forbidding
+                          any
+    :param int max_decoded_size: Most bytes decompressed from a ``gzip`` or
+                                 ``deflate`` body part
+    :param float max_compression_ratio: Most decompressed bytes per
+                                        compressed byte, checked past
+                                        :data:`RATIO_GRACE_SIZE` decompressed
+                                        bytes
+
+    Decompression limits are also reported as :class:`Diagnostic` of
+    :exc:`DecompressionBombWarning`, to the reader diagnostics.
+    """
+
+    def __init__(self, max_parts=None, max_part_size=None,
+                 max_body_size=None, max_header_size=None, max_headers=None,
+                 max_depth=None, max_decoded_size=None,
+                 max_compression_ratio=None):
+        self.max_parts = max_parts
+        self.max_part_size = max_part_size
+        self.max_body_size = max_body_size
+        self.max_header_size = max_header_size
+        self.max_headers = max_headers
+        self.max_depth = max_depth
+        self.max_decoded_size = max_decoded_size
+        self.max_compression_ratio = max_compression_ratio
+
+    def __repr__(self):
+        return '<{} {}>'.format(type(self).__name__, ' '.join(
+            '{}={!r}'.format(name, value)
+            for name, value in sorted(vars(self).items())
+            if value is not None))
+
+
+#: No limit at all, the default of readers.
+NO_LIMITS = Limits()
+
+#: Decompressed bytes below which the compression ratio is not checked, as
+#: small payloads may legitimately compress very well.
+RATIO_GRACE_SIZE = 1024 * 1024
+
+
+class ReaderStats(object):
+    """Counters of a multipart reader, shared with its body parts and
+    nested readers. Durations are in seconds.
+
+    :ivar int bytes_read: Bytes consumed from the stream: delimiters,
+                          headers and contents
+    :ivar int parts: Body parts emitted, nested multipart bodies included
+    :ivar int parts_released: Body parts skipped unread, or partly read, by
+                              ``release()``
+    :ivar int parts_skipped: Body parts filtered out by
+                             :meth:`MultipartReader.iter_parts`
+    :ivar int bytes_decoded: Bytes produced by decoding body parts
+    :ivar int read_calls: ``read`` calls made on the stream
+    :ivar int readline_calls: ``readline`` calls made on the stream
+    :ivar int max_line_length: Longest line read, in bytes, whether the
+                               reader got it in pieces or not
+    :ivar int max_depth: Deepest nesting level, 0 for the outer body
+    :ivar float header_time: Time spent reading and parsing part headers
+    :ivar float body_time: Time spent reading body part contents
+
+    Times are only measured for stats given to the reader, or readers with
+    an instrument: they stay at 0 otherwise.
+    """
+
+    __slots__ = ('bytes_read', 'parts', 'parts_released', 'parts_skipped',
+                 'bytes_decoded',
+                 'read_calls', 'readline_calls', 'max_line_length',
+                 'max_depth', 'header_time', 'body_time')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+        self.header_time = self.body_time = 0.
+
+    def as_dict(self):
+        """Returns a snapshot of the counters."""
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __repr__(self):
+        return '<{} {}>'.format(type(self).__name__, ' '.join(
+            '{}={!r}'.format(name, getattr(self, name))
+            for name in self.__slots__))
+
+
+class ReaderContext(object):
+    """Settings and counters a multipart reader shares with its body parts
+    and nested readers.
+
+    It is set on every body part and nested reader right after they are
+    built, so that :attr:`MultipartReader.part_reader_cls` and
+    :attr:`MultipartReader.multipart_reader_cls` subclasses need no extra
+    constructor argument.
+
+    :param diagnostics: Optional list or callable collecting problems found
+                        in malformed headers instead of warning about them,
+                        see :func:`report`
+    :param instrument: Optional :class:`Instrument`, or list of them,
+                       receiving events about the body parts
+    :param stats: :class:`ReaderStats` to update, a new one by default
+    :param limits: :class:`Limits` to enforce, none by default
+
+    :ivar bool timed: Whether reads are timed, for given stats or an
+                      instrument only
+    """
+
+    __slots__ = ('diagnostics', 'instrument', 'stats', 'limits', 'timed')
+
+    def __init__(self, diagnostics=None, instrument=None, stats=None,
+                 limits=None):
+        if isinstance(instrument, (list, tuple)):
+            instrument = Instruments(*instrument) if instrument else None
+        self.diagnostics = diagnostics
+        self.instrument = instrument
+        self.timed = stats is not None or instrument is not None
+        self.stats = stats if stats is not None else ReaderStats()
+        self.limits = limits if limits is not None else NO_LIMITS
+
+
+def _bad_header(header):
+    return Diagnostic(BadContentDispositionHeader,
+                      hdrs.CONTENT_DISPOSITION, header)
+
+
+def _bad_param(item):
+    return Diagnostic(BadContentDispositionParam,
+                      hdrs.CONTENT_DISPOSITION, item)
+
+
+_TOKEN_CHARS = ''.join(map(re.escape, sorted(TOKEN)))
+_TOKEN_RE = re.compile('[{}]+\\Z'.format(_TOKEN_CHARS))
+_UNESCAPE_RE = re.compile(r'\\([\x00-\x7f])')
+# One ``;``-separated parameter of Content-Disposition (RFC 6266). A quoted
+# string value may contain ``;`` as long as it spans the whole value;
+# anything else runs to the next ``;``. Quoted and token values, by far the
+# most common ones, are told apart by the match itself.
+_PARAM_RE = re.compile(r'''
+    (?P<key>[^;=]*)
+    (?:
+        =\s*
+        (?P<value>
+            "(?P<quoted>[^"\\]*(?:\\.[^"\\]*)*)"(?=;|\Z)
+          | (?P<token>[{}]+)(?=;|\Z)
+          | [^;]*
+        )
+    )?
+'''.format(_TOKEN_CHARS), re.S | re.X)
+
+
+def _is_token(string):
+    return bool(string) and _TOKEN_RE.match(string) is not None
+
+
+def _is_quoted(string):
+    return len(string) > 1 and string[0] == string[-1] == '"'
+
+
+def _is_rfc5987(string):
+    return _is_token(string) and string.count("'") == 2
 
-    def unescape(text, chars=''.join(map(re.escape, CHAR))):
-        return re.sub('\\\\([{}])'.format(chars), '\\1', text)
 
+def _is_extended_param(string):
+    return string.endswith('*')
+
+
+def _is_continuous_param(string):
+    pos = string.find('*') + 1
+    if not pos:
+        return False
+    substring = string[pos:-1] if string.endswith('*') else string[pos:]
+    return substring.isdigit()
+
+
+def _unescape(text):
+    return _UNESCAPE_RE.sub('\\1', text)
+
+
+def parse_content_disposition(header, diagnostics=None):
+    """Parses ``Content-Disposition`` header value.
+
+    Malformed header or parameters are reported with
+    :exc:`BadContentDispositionHeader` and :exc:`BadContentDispositionParam`
+    warnings, or as :class:`Diagnostic` to ``diagnostics`` if given.
+
+    :param str header: Header value
+    :param diagnostics: Optional list or callable collecting problems,
+                        see :func:`report`
+
+    :returns: disposition type, or ``None`` if the header is missed or
+              malformed, and its parameters as a read-only dict
+    :rtype: tuple
+    """
+    disptype, params, problems = _parse_content_disposition(header)
+    for diagnostic in problems:
+        report(diagnostics, diagnostic)
+    return disptype, params
+
+
+@lru_cache()
+def _parse_content_disposition(header):
+    # Pure and memoised: problems are returned rather than warned about,
+    # so that every call still reports them.
     if not header:
-        return None, {}
+        return None, FrozenDict(), ()
 
-    disptype_parts = header.split(';')
-    disptype, parts = disptype_parts[0], disptype_parts[1:]
+    pos = header.find(';')
+    disptype = header if pos == -1 else header[:pos]
 
-    if not is_token(disptype):
-        warnings.warn(BadContentDispositionHeader(header))
-        return None, {}
+    if not _is_token(disptype):
+        return None, FrozenDict(), (_bad_header(header),)
 
     params = {}
-    for item in parts:
-        if '=' not in item:
-            warnings.warn(BadContentDispositionHeader(header))
-            return None, {}
+    problems = []
+    size = len(header)
+    while pos != -1:
+        match = _PARAM_RE.match(header, pos + 1)
+        pos = match.end()
+        if pos == size:
+            pos = -1
+
+        key, value, quoted, token = match.group(
+            'key', 'value', 'quoted', 'token')
+        if value is None:
+            problems.append(_bad_header(header))
+            return None, FrozenDict(), tuple(problems)
 
-        key, value = item.split('=', 1)
         key = key.lower().strip()
-        value = value.lstrip()
 
         if key in params:
-            warnings.warn(BadContentDispositionHeader(header))
-            return None, {}
+            problems.append(_bad_header(header))
+            return None, FrozenDict(), tuple(problems)
 
-        if not is_token(key):
-            warnings.warn(BadContentDispositionParam(item))
+        if _TOKEN_RE.match(key) is None:
+            problems.append(_bad_param(match.group()))
             continue
 
-        elif is_continuous_param(key):
-            if is_quoted(value):
-                value = unescape(value[1:-1])
-            elif not is_token(value):
-                warnings.warn(BadContentDispositionParam(item))
+        elif '*' not in key:
+            if token is not None:
+                value = token
+            elif quoted is not None:
+                value = quoted.lstrip('\\/')
+                if '\\' in value:
+                    value = _unescape(value)
+            elif _is_quoted(value):
+                value = _unescape(value[1:-1].lstrip('\\/'))
+            else:
+                problems.append(_bad_header(header))
+                return None, FrozenDict(), tuple(problems)
+
+        elif _is_continuous_param(key):
+            if _is_quoted(value):
+                value = _unescape(value[1:-1])
+            elif token is None:
+                problems.append(_bad_param(match.group()))
                 continue
 
-        elif is_extended_param(key):
-            if is_rfc5987(value):
+        elif _is_extended_param(key):
+            if _is_rfc5987(value):
                 encoding, _, value = value.split("'", 2)
                 encoding = encoding or 'utf-8'
             else:
-                warnings.warn(BadContentDispositionParam(item))
+                problems.append(_bad_param(match.group()))
                 continue
 
             try:
                 value = unquote(value, encoding, 'strict')
             except UnicodeDecodeError:
-                warnings.warn(BadContentDispositionParam(item))
+                problems.append(_bad_param(match.group()))
                 continue
 
         else:
-            if is_quoted(value):
-                value = unescape(value[1:-1].lstrip('\\/'))
-            elif not is_token(value):
-                warnings.warn(BadContentDispositionHeader(header))
-                return None, {}
+            if _is_quoted(value):
+                value = _unescape(value[1:-1].lstrip('\\/'))
+            elif token is None:
+                problems.append(_bad_header(header))
+                return None, FrozenDict(), tuple(problems)
 
         params[key] = value
 
-    return disptype.lower(), params
+    return disptype.lower(), FrozenDict(params), tuple(problems)
+
+
+# the cache of the parser is managed like the one of parse_mimetype
+parse_content_disposition.cache_info = _parse_content_disposition.cache_info
+parse_content_disposition.cache_clear = _parse_content_disposition.cache_clear
+parse_content_disposition.set_maxsize = _parse_content_disposition.set_maxsize
 
 
 def content_disposition_filename(params):
@@ -157,20 +560,492 @@ def content_disposition_filename(params):
         return value
 
 
+class PartMeta(object):
+    """Typed view over the headers of a body part.
+
+    Each header is parsed at most once, on first access to one of the
+    attributes it backs, so dispatch code may read them freely.
+
+    :param headers: Body part headers
+    :param diagnostics: Optional list or callable collecting problems found
+                        in malformed headers, see :func:`report`
+    """
+
+    def __init__(self, headers, diagnostics=None):
+        self.headers = headers
+        self.diagnostics = diagnostics
+
+    @reify
+    def _content_type(self):
+        return parse_mimetype(self.headers.get(hdrs.CONTENT_TYPE, ''))
+
+    @reify
+    def _content_disposition(self):
+        return parse_content_disposition(
+            self.headers.get(hdrs.CONTENT_DISPOSITION), self.diagnostics)
+
+    @reify
+    def mtype(self):
+        """Main MIME type, e.g. ``text`` for ``text/plain``."""
+        return self._content_type[0]
+
+    @reify
+    def subtype(self):
+        """MIME subtype, e.g. ``plain`` for ``text/plain``."""
+        return self._content_type[1]
+
+    @reify
+    def suffix(self):
+        """MIME subtype suffix, e.g. ``xml`` for ``application/rss+xml``."""
+        return self._content_type[2]
+
+    @reify
+    def params(self):
+        """``Content-Type`` parameters."""
+        return self._content_type[3]
+
+    @reify
+    def mimetype(self):
+        """MIME type without parameters, e.g. ``text/plain`` or
+        ``application/atom+xml``."""
+        mtype, subtype, suffix = self._content_type[:3]
+        if suffix:
+            return '{}/{}+{}'.format(mtype, subtype, suffix)
+        if not subtype:
+            return mtype
+        return '{}/{}'.format(mtype, subtype)
+
+    @reify
+    def charset(self):
+        """``charset`` parameter of ``Content-Type`` or ``None``."""
+        return self.params.get('charset')
+
+    @reify
+    def disposition(self):
+        """``Content-Disposition`` type or ``None`` if missed or malformed.
+        """
+        return self._content_disposition[0]
+
+    @reify
+    def disposition_params(self):
+        """``Content-Disposition`` parameters."""
+        return self._content_disposition[1]
+
+    @reify
+    def name(self):
+        """``name`` parameter of ``Content-Disposition`` or ``None``."""
+        return self.disposition_params.get('name')
+
+    @reify
+    def filename(self):
+        """Filename specified in ``Content-Disposition`` or ``None``."""
+        return content_disposition_filename(self.disposition_params)
+
+    @reify
+    def transfer_encoding(self):
+        """Lower-cased ``Content-Transfer-Encoding`` or ``None``."""
+        encoding = self.headers.get(hdrs.CONTENT_TRANSFER_ENCODING)
+        return encoding.lower() if encoding is not None else None
+
+    @reify
+    def content_encoding(self):
+        """Lower-cased ``Content-Encoding`` or ``None``."""
+        encoding = self.headers.get(hdrs.CONTENT_ENCODING)
+        return encoding.lower() if encoding is not None else None
+
+    @reify
+    def content_id(self):
+        """``Content-ID`` without its angle brackets or ``None``."""
+        content_id = self.headers.get(hdrs.CONTENT_ID)
+        if content_id is None:
+            return None
+        content_id = content_id.strip()
+        if content_id.startswith('<') and content_id.endswith('>'):
+            content_id = content_id[1:-1]
+        return content_id
+
+
+def match_names(*names):
+    """Returns a :meth:`MultipartReader.iter_parts` predicate selecting the
+    form fields with one of the given names."""
+    names = frozenset(names)
+    return lambda meta: meta.name in names
+
+
+def match_mimetypes(*patterns):
+    """Returns a :meth:`MultipartReader.iter_parts` predicate selecting the
+    body parts of one of the given MIME types, e.g. ``text/plain`` or
+    ``image/*``."""
+    exact = frozenset(pattern.lower() for pattern in patterns
+                      if not pattern.endswith('/*'))
+    mtypes = frozenset(pattern[:-2].lower() for pattern in patterns
+                       if pattern.endswith('/*'))
+    return lambda meta: meta.mimetype in exact or meta.mtype in mtypes
+
+
+def match_content_ids(*content_ids):
+    """Returns a :meth:`MultipartReader.iter_parts` predicate selecting the
+    body parts with one of the given ``Content-ID``, with or without angle
+    brackets."""
+    content_ids = frozenset(content_id.strip('<>')
+                            for content_id in content_ids)
+    return lambda meta: meta.content_id in content_ids
+
+
+class _Decoder(object):
+    """Incremental decoder of a body part encoding."""
+
+    #: Name of the decoded encoding, as reported to instruments
+    encoding = None
+
+    def decode(self, data):
+        """Returns an iterable of the decoded chunks of ``data``."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Returns an iterable of the remaining decoded chunks."""
+        return ()
+
+    def stream(self, chunks, instrument=None):
+        if instrument is not None:
+            return self._stream_instrumented(chunks, instrument)
+        return self._stream(chunks)
+
+    def _stream(self, chunks):
+        for chunk in chunks:
+            for data in self.decode(chunk):
+                yield data
+        for data in self.flush():
+            yield data
+
+    def _stream_instrumented(self, chunks, instrument):
+        # reports once for the whole stream, as decode() does
+        in_bytes = out_bytes = 0
+        duration = 0.
+        for chunk in chunks:
+            in_bytes += len(chunk)
+            start = timer()
+            decoded = list(self.decode(chunk))
+            duration += timer() - start
+            for data in decoded:
+                out_bytes += len(data)
+                yield data
+        start = timer()
+        decoded = list(self.flush())
+        duration += timer() - start
+        for data in decoded:
+            out_bytes += len(data)
+            yield data
+        instrument.on_decode(self.encoding, in_bytes, out_bytes, duration)
+
+
+class _Base64Decoder(_Decoder):
+
+    encoding = 'base64'
+    _junk = re.compile(b'[^A-Za-z0-9+/=]')
+
+    def __init__(self):
+        self._tail = b''
+
+    def decode(self, data):
+        data = self._tail + self._junk.sub(b'', data)
+        cut = len(data) - len(data) % 4
+        self._tail = data[cut:]
+        if not cut:
+            return ()
+        return (binascii.a2b_base64(data[:cut]),)
+
+    def flush(self):
+        tail, self._tail = self._tail, b''
+        if not tail:
+            return ()
+        return (base64.b64decode(tail),)
+
+
+class _QuotedPrintableDecoder(_Decoder):
+
+    encoding = 'quoted-printable'
+
+    def __init__(self):
+        self._tail = b''
+
+    def decode(self, data):
+        data = self._tail + bytes(data)
+        # an escape or a soft line break must not be split
+        cut = data.find(b'=', len(data) - 2)
+        if cut == -1:
+            cut = len(data)
+        self._tail = data[cut:]
+        if not cut:
+            return ()
+        return (binascii.a2b_qp(data[:cut]),)
+
+    def flush(self):
+        tail, self._tail = self._tail, b''
+        if not tail:
+            return ()
+        return (binascii.a2b_qp(tail),)
+
+
+class _ZlibDecoder(_Decoder):
+
+    def __init__(self, encoding, wbits, size, limits=NO_LIMITS,
+                 diagnostics=None):
+        self.encoding = encoding
+        self._decompressor = zlib.decompressobj(wbits)
+        self._size = size
+        self._max_size = limits.max_decoded_size
+        self._max_ratio = limits.max_compression_ratio
+        self._checked = self._max_size is not None or \
+            self._max_ratio is not None
+        self._diagnostics = diagnostics
+        self._in_bytes = 0
+        self._out_bytes = 0
+
+    def decode(self, data):
+        data = bytes(data)
+        self._in_bytes += len(data)
+        while data:
+            chunk = self._decompressor.decompress(data, self._size)
+            data = self._decompressor.unconsumed_tail
+            if self._checked:
+                self._check(len(chunk), len(data))
+            if chunk:
+                yield chunk
+
+    def flush(self):
+        chunk = self._decompressor.flush()
+        if self._checked:
+            self._check(len(chunk), 0)
+        return (chunk,) if chunk else ()
+
+    def _check(self, size, unconsumed):
+        # every chunk is checked before being handed out, so that no more
+        # than a chunk past a limit is ever decompressed
+        self._out_bytes += size
+        if self._max_size is not None and self._out_bytes > self._max_size:
+            self._exceeded('max_decoded_size', self._max_size)
+        if self._max_ratio is not None and \
+                self._out_bytes > RATIO_GRACE_SIZE and \
+                self._out_bytes > self._max_ratio * (
+                    self._in_bytes - unconsumed):
+            self._exceeded('max_compression_ratio', self._max_ratio)
+
+    def _exceeded(self, name, limit):
+        error = errors.LimitExceeded(name, limit)
+        report(self._diagnostics,
+               Diagnostic(DecompressionBombWarning, hdrs.CONTENT_ENCODING,
+                          error.message))
+        raise error
+
+
+class _Source(object):
+    """Stream of a multipart body shared by all its readers, nested ones
+    included: a single cursor over the content, and a single stack of the
+    lines read ahead, as the delimiter ending a body part."""
+
+    __slots__ = ('content', 'unread')
+
+    def __init__(self, content):
+        self.content = content
+        self.unread = []
+
+    @classmethod
+    def of(cls, content):
+        """Returns the shared source of ``content``, a new one for a plain
+        stream."""
+        return content if isinstance(content, cls) else cls(content)
+
+    def peekline(self, readline):
+        """Returns the next line, read with ``readline`` unless already read
+        ahead, leaving it to be read."""
+        unread = self.unread
+        if not unread:
+            unread.append(readline())
+        return unread[-1]
+
+
+class _BufferStream(object):
+    """File-like object over a body held in memory, see
+    :meth:`MultipartReader.from_bytes`. Lines are found with ``find``, and
+    body parts read whole as ``memoryview`` slices of the buffer."""
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.view = memoryview(buf)
+        self.pos = 0
+
+    def read(self, size=-1):
+        start = self.pos
+        end = len(self.buf)
+        if size is not None and 0 <= size < end - start:
+            end = start + size
+        self.pos = end
+        return self.buf[start:end]
+
+    def readline(self, size=-1):
+        start = self.pos
+        end = len(self.buf)
+        if size is not None and 0 <= size < end - start:
+            end = start + size
+        newline = self.buf.find(b'\n', start, end)
+        if newline != -1:
+            end = newline + 1
+        self.pos = end
+        return self.buf[start:end]
+
+
+class ChunkStream(object):
+    """Read-only file-like object over an iterable of byte chunks, see
+    :meth:`MultipartReader.from_iterable`. Chunks are kept as they come and
+    sliced: data is only joined when a line or a read spans several
+    chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = b''
+        self._pos = 0
+
+    def _next_chunk(self):
+        for chunk in self._chunks:
+            if chunk:
+                self._buf = chunk
+                self._pos = 0
+                return True
+        self._buf = b''
+        self._pos = 0
+        return False
+
+    def read(self, size=-1):
+        pieces = []
+        while size is None or size < 0 or size > 0:
+            buf, pos = self._buf, self._pos
+            if pos == len(buf):
+                if not self._next_chunk():
+                    break
+                continue
+            stop = len(buf)
+            if size is not None and 0 <= size < stop - pos:
+                stop = pos + size
+            pieces.append(buf[pos:stop])
+            self._pos = stop
+            if size is not None and size >= 0:
+                size -= stop - pos
+        return pieces[0] if len(pieces) == 1 else b''.join(pieces)
+
+    def readline(self, limit=-1):
+        buf, pos = self._buf, self._pos
+        if limit is not None and limit >= 0:
+            # never look past the limit, chunks may be large and line-free
+            end = buf.find(b'\n', pos, pos + limit)
+        else:
+            end = buf.find(b'\n', pos)
+        if end != -1:
+            # the common case, a line within the current chunk
+            self._pos = end + 1
+            return buf[pos:end + 1]
+        pieces = []
+        while limit is None or limit < 0 or limit > 0:
+            buf, pos = self._buf, self._pos
+            if pos == len(buf):
+                if not self._next_chunk():
+                    break
+                continue
+            stop = len(buf)
+            if limit is not None and 0 <= limit < stop - pos:
+                stop = pos + limit
+            end = buf.find(b'\n', pos, stop)
+            if end != -1:
+                stop = end + 1
+            pieces.append(buf[pos:stop])
+            self._pos = stop
+            if end != -1:
+                break
+            if limit is not None and limit >= 0:
+                limit -= stop - pos
+        return pieces[0] if len(pieces) == 1 else b''.join(pieces)
+
+
+def _find_delimiter(buf, pos, boundary, instrument=None):
+    """Returns the end of the data of the body part starting at ``pos`` in
+    ``buf``, and the start of the delimiter line ending it. Lines looking
+    like the delimiter on the way are reported to ``instrument``."""
+    size = len(buf)
+    at = pos
+    while True:
+        at = buf.find(boundary, at)
+        if at == -1:
+            # the body ended before the boundary, nothing more to read
+            return size, size
+        if at == pos or buf[at - 1:at] == b'\n':
+            stop = buf.find(b'\n', at)
+            rest = buf[at + len(boundary):stop if stop != -1 else size]
+            # ensure that we read exactly the boundary, not something alike
+            if rest.rstrip(b'\r\n') in (b'', b'--'):
+                # the line break ahead of the delimiter belongs to it
+                line = buf.rfind(b'\n', pos, at - 1)
+                line = line + 1 if line != -1 else pos
+                end = at
+                while end > line and buf[end - 1:end] in (b'\r', b'\n'):
+                    end -= 1
+                return end, at
+            if instrument is not None:
+                instrument.on_false_boundary()
+        at += 1
+
+
 class BodyPartReader(object):
-    """Multipart reader for single body part."""
+    """Multipart reader for single body part.
+
+    :param diagnostics: Optional list or callable collecting problems found
+                        in malformed headers instead of warning about them,
+                        see :func:`report`
+    :param instrument: Optional :class:`Instrument` receiving events about
+                       the body part
+    :param stats: :class:`ReaderStats` to update, a new one by default
+    :param limits: :class:`Limits` to enforce, none by default
+    """
 
     chunk_size = 8192
 
-    def __init__(self, boundary, headers, content):
+    def __init__(self, boundary, headers, content, diagnostics=None,
+                 instrument=None, stats=None, limits=None):
         self.headers = headers
         self._boundary = boundary
-        self._content = content
+        self._source = _Source.of(content)
+        self._content = self._source.content
+        # start of the body part held in memory, until it is read from
+        self._view_at = self._content.pos \
+            if type(self._content) is _BufferStream else None
         self._at_eof = False
         length = self.headers.get(hdrs.CONTENT_LENGTH, None)
         self._length = int(length) if length is not None else None
         self._read_bytes = 0
-        self._unread = deque()
+        self._tail = b''
+        self._at_line_start = True
+        self._pending_cr = False
+        self._line_length = 0
+        self._set_context(ReaderContext(diagnostics, instrument, stats,
+                                        limits))
+
+    def _set_context(self, context):
+        #: Settings and counters shared with the reader, see
+        #: :class:`ReaderContext`
+        self.context = context
+        self.diagnostics = context.diagnostics
+        self.instrument = instrument = context.instrument
+        self.stats = context.stats
+        self.limits = context.limits
+        self._timed = context.timed
+        self._max_size = self.limits.max_part_size
+        self._max_body_size = self.limits.max_body_size
+        if self._max_size is not None and self._length is not None and \
+                self._length > self._max_size:
+            raise errors.LimitExceeded('max_part_size', self._max_size)
+        if instrument is not None:
+            self._total_bytes = 0
+            self._started = timer()
+            instrument.on_part_start(self.headers)
 
     def __iter__(self):
         return self
@@ -194,17 +1069,23 @@ class BodyPartReader(object):
                             method from `Content-Encoding` header. If it missed
                             data remains untouched
 
-        :rtype: bytearray
+        :rtype: bytearray, or memoryview for bodies read with
+                :meth:`MultipartReader.from_bytes`
         """
         if self._at_eof:
             return
-        data = bytearray()
-        if self._length is None:
-            while not self._at_eof:
-                data.extend(self.readline())
+        start = timer() if self._timed else None
+        if self._view_at is not None and \
+                self._view_at == self._content.pos:
+            data = self._read_view()
+        elif self._length is None:
+            data = self._read_lines()
         else:
+            data = bytearray()
             while not self._at_eof:
-                data.extend(self.read_chunk(self.chunk_size))
+                data.extend(self._read_chunk(self.chunk_size))
+        if start is not None:
+            self.stats.body_time += timer() - start
         if decode:
             return self.decode(data)
         return data
@@ -221,29 +1102,75 @@ class BodyPartReader(object):
             return
         assert self._length is not None, \
             'Content-Length required for chunked read'
+        if not self._timed:
+            return self._read_chunk(size)
+        start = timer()
+        chunk = self._read_chunk(size)
+        self.stats.body_time += timer() - start
+        return chunk
+
+    def _read_chunk(self, size):
+        stats = self.stats
         chunk_size = min(size, self._length - self._read_bytes)
         chunk = self._content.read(chunk_size)
+        if not chunk and chunk_size:
+            # the stream ended before Content-Length, no more data to wait
+            raise errors.TruncatedBody(self._length, self._read_bytes)
         self._read_bytes += len(chunk)
+        stats.read_calls += 1
+        stats.bytes_read += len(chunk)
         if self._read_bytes == self._length:
             self._at_eof = True
-            assert b'\r\n' == self._content.readline(), \
-                'reader did not read all the data or it is malformed'
+            self._read_closing_crlf()
+        if self._max_body_size is not None and \
+                stats.bytes_read > self._max_body_size:
+            raise errors.LimitExceeded('max_body_size', self._max_body_size)
+        if self.instrument is not None:
+            self._report_data(len(chunk))
         return chunk
 
+    def _read_closing_crlf(self):
+        # the CRLF ending the data of a Content-Length bounded body part
+        assert b'\r\n' == self._content.readline(2), \
+            'reader did not read all the data or it is malformed'
+        self.stats.readline_calls += 1
+        self.stats.bytes_read += 2
+
     def readline(self):
         """Reads body part by line by line.
 
+        Lines longer than :attr:`chunk_size` come in several pieces, so that
+        binary data without line breaks is still read in bounded memory.
+
         :rtype: bytearray
         """
         if self._at_eof:
             return
+        if not self._timed:
+            return self._next_line()
+        start = timer()
+        line = self._next_line()
+        self.stats.body_time += timer() - start
+        return line
 
-        if self._unread:
-            line = self._unread.popleft()
-        else:
-            line = self._content.readline()
-
-        if line.startswith(self._boundary):
+    def _next_line(self):
+        unread = self._source.unread
+        line = unread.pop() if unread else self._readline()
+
+        if self._tail:
+            # line break held by _read_lines(), given to the delimiter or
+            # returned on its own
+            tail, self._tail = self._tail, b''
+            if line.rstrip(b'\r\n') not in (self._boundary,
+                                            self._boundary + b'--'):
+                unread.append(line)
+                if self._max_size is not None:
+                    self._read_bytes += len(tail)
+                if self.instrument is not None:
+                    self._report_data(len(tail))
+                return tail
+
+        if self._at_line_start and line.startswith(self._boundary):
             # the very last boundary may not come with \r\n,
             # so set single rules for everyone
             sline = line.rstrip(b'\r\n')
@@ -252,16 +1179,254 @@ class BodyPartReader(object):
             # ensure that we read exactly the boundary, not something alike
             if sline == boundary or sline == last_boundary:
                 self._at_eof = True
-                self._unread.append(line)
+                unread.append(line)
+                if self.instrument is not None:
+                    self._report_data(0)
                 return ''
-        else:
-            next_line = self._content.readline()
-            if next_line.startswith(self._boundary):
+            if self.instrument is not None:
+                self.instrument.on_false_boundary()
+
+        if not line:
+            # the stream ended before the boundary, nothing more to read
+            self._at_eof = True
+        elif line.endswith(b'\n'):
+            next_line = self._readline()
+            if next_line.rstrip(b'\r\n') in (self._boundary,
+                                             self._boundary + b'--'):
                 line = line.rstrip(b'\r\n')  # strip CRLF but only once
-            self._unread.append(next_line)
+            unread.append(next_line)
+            self._at_line_start = True
+        else:
+            if line.endswith(b'\r') and len(line) > 1:
+                # keep the CR with its LF in case a boundary follows them
+                line = line[:-1]
+                self._pending_cr = True
+            self._at_line_start = False
+
+        if self._max_size is not None:
+            self._read_bytes += len(line)
+            if self._read_bytes > self._max_size:
+                raise errors.LimitExceeded('max_part_size', self._max_size)
+        if self.instrument is not None:
+            self._report_data(len(line))
+        return line
+
+    def _read_view(self):
+        # the whole body part, as a slice of the buffer held in memory
+        content = self._content
+        start = content.pos
+        if self._length is None:
+            end, stop = _find_delimiter(content.buf, start, self._boundary,
+                                        self.instrument)
+        else:
+            end = start + self._length
+            if end > len(content.buf):
+                raise errors.TruncatedBody(self._length,
+                                           len(content.buf) - start)
+            stop = end + 2
+            assert content.buf[end:stop] == b'\r\n', \
+                'reader did not read all the data or it is malformed'
+        size = end - start
+        if self._max_size is not None and size > self._max_size:
+            raise errors.LimitExceeded('max_part_size', self._max_size)
+        stats = self.stats
+        stats.read_calls += 1
+        stats.bytes_read += stop - start
+        if self._max_body_size is not None and \
+                stats.bytes_read > self._max_body_size:
+            raise errors.LimitExceeded('max_body_size', self._max_body_size)
+        content.pos = stop
+        self._read_bytes = size
+        self._at_eof = True
+        if self.instrument is not None:
+            self._report_data(size)
+        return content.view[start:end]
+
+    def _read_lines(self, size=None):
+        # Reads whole lines up to the delimiter, or up to ``size`` bytes.
+        # Instead of looking a line ahead, the line break ending the data is
+        # held in self._tail: it belongs to the delimiter if one follows.
+        boundary = self._boundary
+        unread = self._source.unread
+        readline = self._readline
+        instrument = self.instrument
+        max_size = self._max_size
+        read_bytes = self._read_bytes if max_size is not None else 0
+        at_line_start = self._at_line_start
+        data = bytearray(self._tail)
+        last = self._tail
+        pending = len(last)
+        self._tail = b''
+        while True:
+            line = unread.pop() if unread else readline()
+            if at_line_start and line.startswith(boundary):
+                # the very last boundary may not come with \r\n,
+                # so set single rules for everyone
+                sline = line.rstrip(b'\r\n')
+                # ensure that we read exactly the boundary, not something
+                # alike
+                if sline == boundary or sline == boundary + b'--':
+                    held = len(last) - len(last.rstrip(b'\r\n'))
+                    if held:
+                        del data[-held:]  # strip CRLF but only once
+                    self._at_eof = True
+                    unread.append(line)
+                    if instrument is not None:
+                        self._report_data(pending - held)
+                    break
+                if instrument is not None:
+                    instrument.on_false_boundary()
+            if not line:
+                # the stream ended before the boundary, nothing more to read
+                self._at_eof = True
+                if instrument is not None:
+                    self._report_data(pending)
+                break
+            if instrument is not None and pending:
+                self._report_data(pending)
+            data += line
+            pending = len(line)
+            if line[-1:] == b'\n':
+                at_line_start = True
+            else:
+                if line[-1:] == b'\r' and len(line) > 1:
+                    # keep the CR with its LF in case a boundary follows them
+                    del data[-1:]
+                    pending -= 1
+                    self._pending_cr = True
+                at_line_start = False
+            last = line
+            if max_size is not None and read_bytes + len(data) > max_size:
+                held = len(last) - len(last.rstrip(b'\r\n')) \
+                    if at_line_start else 0
+                if read_bytes + len(data) - held > max_size:
+                    raise errors.LimitExceeded('max_part_size', max_size)
+            if size is not None and len(data) >= size:
+                break
+        self._at_line_start = at_line_start
+        if not self._at_eof:
+            held = len(last) - len(last.rstrip(b'\r\n')) \
+                if at_line_start else 0
+            if held:
+                self._tail = bytes(data[-held:])
+                del data[-held:]
+                pending -= held
+            if instrument is not None:
+                self._report_data(pending)
+        if max_size is not None:
+            self._read_bytes += len(data)
+            if self._read_bytes > max_size:
+                raise errors.LimitExceeded('max_part_size', max_size)
+        return data
+
+    def _report_data(self, size):
+        if size:
+            self._total_bytes += size
+            self.instrument.on_data(size)
+        if self._at_eof:
+            self.instrument.on_part_end(self._total_bytes,
+                                        timer() - self._started)
 
+    def _readline(self):
+        # a boundary line must never be split in pieces
+        limit = max(self.chunk_size, len(self._boundary) + 4)
+        line = self._content.readline(limit)
+        size = len(line)
+        stats = self.stats
+        stats.readline_calls += 1
+        stats.bytes_read += size
+        if line[-1:] == b'\n':
+            size += self._line_length
+            self._line_length = 0
+        else:
+            size = self._line_length = self._line_length + size
+        if size > stats.max_line_length:
+            stats.max_line_length = size
+        if self._max_body_size is not None and \
+                stats.bytes_read > self._max_body_size:
+            raise errors.LimitExceeded('max_body_size', self._max_body_size)
+        if self._pending_cr:
+            self._pending_cr = False
+            line = b'\r' + line
         return line
 
+    def iter_chunks(self, size=chunk_size, decode=False):
+        """Iterates over body part data in chunks of bounded size, whether
+        the body part has ``Content-Length`` header or not.
+
+        :param int size: chunk size, used for chunked reads and decoding
+        :param bool decode: Decodes data following the encodings specified
+                            in `Content-Transfer-Encoding` and
+                            `Content-Encoding` headers, chunk by chunk.
+
+        :raises: :exc:`RuntimeError` - if encoding is unknown.
+
+        :rtype: iterator
+        """
+        chunks = self._iter_raw_chunks(size)
+        if decode:
+            decoders = self._get_decoders(size)
+            for decoder in decoders:
+                chunks = decoder.stream(chunks, self.instrument)
+            if decoders:
+                chunks = self._count_decoded(chunks)
+        return chunks
+
+    def _count_decoded(self, chunks):
+        stats = self.stats
+        for chunk in chunks:
+            stats.bytes_decoded += len(chunk)
+            yield chunk
+
+    def _iter_raw_chunks(self, size):
+        stats = self.stats
+        if self._view_at is not None and \
+                self._view_at == self._content.pos and not self._at_eof:
+            start = timer() if self._timed else None
+            view = self._read_view()
+            if start is not None:
+                stats.body_time += timer() - start
+            for offset in range(0, len(view), size):
+                yield view[offset:offset + size]
+            return
+        timed = self._timed
+        while not self._at_eof:
+            start = timer() if timed else None
+            if self._length is None:
+                chunk = self._read_lines(size)
+            else:
+                chunk = self._read_chunk(size)
+            if start is not None:
+                stats.body_time += timer() - start
+            if chunk:
+                yield chunk
+
+    def _get_decoders(self, size):
+        decoders = []
+        encoding = self.meta.transfer_encoding
+        if encoding is not None:
+            if encoding == 'base64':
+                decoders.append(_Base64Decoder())
+            elif encoding == 'quoted-printable':
+                decoders.append(_QuotedPrintableDecoder())
+            else:
+                raise RuntimeError('unknown content transfer encoding: {}'
+                                   ''.format(encoding))
+        encoding = self.meta.content_encoding
+        if encoding is not None:
+            if encoding in ('deflate', 'gzip'):
+                decoders.append(self._zlib_decoder(encoding, size))
+            elif encoding != 'identity':
+                raise RuntimeError('unknown content encoding: {}'
+                                   ''.format(encoding))
+        return decoders
+
+    def _zlib_decoder(self, encoding, size):
+        wbits = -zlib.MAX_WBITS if encoding == 'deflate' \
+            else 16 + zlib.MAX_WBITS
+        return _ZlibDecoder(encoding, wbits, size, self.limits,
+                            self.diagnostics)
+
     def release(self):
         """Lke :meth:`read`, but reads all the data to the void.
 
@@ -269,12 +1434,19 @@ class BodyPartReader(object):
         """
         if self._at_eof:
             return
-        if self._length is None:
+        start = timer() if self._timed else None
+        if self._view_at is not None and \
+                self._view_at == self._content.pos:
+            self._read_view()
+        elif self._length is None:
             while not self._at_eof:
-                self.readline()
+                self._read_lines(self.chunk_size)
         else:
             while not self._at_eof:
-                self.read_chunk(self.chunk_size)
+                self._read_chunk(self.chunk_size)
+        self.stats.parts_released += 1
+        if start is not None:
+            self.stats.body_time += timer() - start
 
     def text(self, encoding=None):
         """Lke :meth:`read`, but assumes that body part contains text data.
@@ -285,6 +1457,8 @@ class BodyPartReader(object):
         :rtype: str
         """
         data = self.read(decode=True) or b''
+        if isinstance(data, memoryview):
+            data = data.tobytes()
         encoding = encoding or self.get_charset(default='utf-8')
         return data.decode(encoding)
 
@@ -297,6 +1471,8 @@ class BodyPartReader(object):
         data = self.read(decode=True)
         if not data:
             return
+        if isinstance(data, memoryview):
+            data = data.tobytes()
         encoding = encoding or self.get_charset(default='utf-8')
         return json.loads(data.decode(encoding))
 
@@ -310,6 +1486,8 @@ class BodyPartReader(object):
         data = self.read(decode=True)
         if not data:
             return None
+        if isinstance(data, memoryview):
+            data = data.tobytes()
         encoding = encoding or self.get_charset(default='utf-8')
         return parse_qsl(data.rstrip().decode(encoding))
 
@@ -337,16 +1515,36 @@ class BodyPartReader(object):
 
         :rtype: bytes
         """
-        if hdrs.CONTENT_TRANSFER_ENCODING in self.headers:
-            data = self._decode_content_transfer(data)
-        if hdrs.CONTENT_ENCODING in self.headers:
-            return self._decode_content(data)
+        transfer_encoding = self.meta.transfer_encoding
+        content_encoding = self.meta.content_encoding
+        if transfer_encoding is not None:
+            data = self._decode_instrumented(
+                transfer_encoding, self._decode_content_transfer, data)
+        if content_encoding is not None:
+            data = self._decode_instrumented(
+                content_encoding, self._decode_content, data)
+        if transfer_encoding is not None or content_encoding is not None:
+            self.stats.bytes_decoded += len(data)
         return data
 
-    def _decode_content(self, data):
-        encoding = self.headers[hdrs.CONTENT_ENCODING].lower()
+    def _decode_instrumented(self, encoding, decode, data):
+        if self.instrument is None:
+            return decode(data)
+        start = timer()
+        decoded = decode(data)
+        self.instrument.on_decode(encoding, len(data), len(decoded),
+                                  timer() - start)
+        return decoded
 
-        if encoding == 'deflate':
+    def _decode_content(self, data):
+        encoding = self.meta.content_encoding
+
+        if encoding in ('deflate', 'gzip') and (
+                self.limits.max_decoded_size is not None or
+                self.limits.max_compression_ratio is not None):
+            decoder = self._zlib_decoder(encoding, self.chunk_size)
+            return b''.join(decoder.stream([data]))
+        elif encoding == 'deflate':
             return zlib.decompress(bytes(data), -zlib.MAX_WBITS)
         elif encoding == 'gzip':
             return zlib.decompress(bytes(data), 16 + zlib.MAX_WBITS)
@@ -356,7 +1554,7 @@ class BodyPartReader(object):
             raise RuntimeError('unknown content encoding: {}'.format(encoding))
 
     def _decode_content_transfer(self, data):
-        encoding = self.headers[hdrs.CONTENT_TRANSFER_ENCODING].lower()
+        encoding = self.meta.transfer_encoding
 
         if encoding == 'base64':
             return base64.b64decode(data)
@@ -369,35 +1567,99 @@ class BodyPartReader(object):
     def get_charset(self, default=None):
         """Returns charset parameter from ``Content-Type`` header or default.
         """
-        ctype = self.headers.get(hdrs.CONTENT_TYPE, '')
-        _, _, _, params = parse_mimetype(ctype)
-        return params.get('charset', default)
+        charset = self.meta.charset
+        return charset if charset is not None else default
+
+    @reify
+    def meta(self):
+        """Parsed body part headers, see :class:`PartMeta`."""
+        return PartMeta(self.headers, self.diagnostics)
 
     @property
     def filename(self):
         """Returns filename specified in Content-Disposition header or ``None``
         if missed or header is malformed."""
-        _, params = parse_content_disposition(
-            self.headers.get(hdrs.CONTENT_DISPOSITION))
-        return content_disposition_filename(params)
+        return self.meta.filename
 
 
 class MultipartReader(object):
-    """Multipart body reader."""
+    """Multipart body reader.
+
+    :param diagnostics: Optional list or callable collecting problems found
+                        in malformed headers of the body parts, nested ones
+                        included, instead of warning about them, see
+                        :func:`report`
+    :param instrument: Optional :class:`Instrument` receiving events about
+                       the body parts, nested ones included
+    :param stats: :class:`ReaderStats` to update, a new one by default
+    :param limits: :class:`Limits` to enforce, on the nested bodies as well,
+                   none by default
+    """
 
     #: Multipart reader class, used to handle multipart/* body parts.
     #: None points to type(self)
     multipart_reader_cls = None
     #: Body part reader class for non multipart/* content types.
     part_reader_cls = BodyPartReader
-
-    def __init__(self, headers, content):
+    #: Longest delimiter or header line accepted, in bytes
+    max_line_size = 8190
+    #: Size of the reads skipping body parts filtered out by
+    #: :meth:`iter_parts`
+    skip_chunk_size = 64 * 1024
+
+    def __init__(self, headers, content, diagnostics=None,
+                 instrument=None, stats=None, limits=None):
         self.headers = CIMultiDict(headers)
+        self._set_context(ReaderContext(diagnostics, instrument, stats,
+                                        limits))
         self._boundary = ('--' + self._get_boundary()).encode()
-        self._content = content
+        self._source = _Source.of(content)
+        self._content = self._source.content
         self._last_part = None
         self._at_eof = False
-        self._unread = []
+        self._depth = 0
+
+    def _set_context(self, context):
+        #: Settings and counters shared with the body parts and nested
+        #: readers, see :class:`ReaderContext`
+        self.context = context
+        self.diagnostics = context.diagnostics
+        self.instrument = context.instrument
+        #: Counters of this body and its body parts, see :class:`ReaderStats`
+        self.stats = context.stats
+        self.limits = context.limits
+
+    @classmethod
+    def from_bytes(cls, headers, buf, **kwargs):
+        """Returns a reader of a body held in memory.
+
+        The buffer is scanned once with ``find``, instead of copying it line
+        by line out of a stream: :meth:`BodyPartReader.read`,
+        :meth:`~BodyPartReader.iter_chunks` and
+        :meth:`~BodyPartReader.release` return ``memoryview`` slices of
+        ``buf``, which must stay unchanged while they are in use.
+
+        :param headers: Headers of the multipart body
+        :param buf: Whole body, as ``bytes``, ``bytearray`` or ``mmap``
+        :param kwargs: Other arguments of :class:`MultipartReader`
+        """
+        return cls(headers, _BufferStream(buf), **kwargs)
+
+    @classmethod
+    def from_iterable(cls, headers, chunks, **kwargs):
+        """Returns a reader of a body coming as an iterable of byte chunks,
+        e.g. a WSGI ``wsgi.input`` generator or ``requests``
+        ``iter_content()``, with no file-like adapter.
+
+        Chunks are pulled as the body is read and kept as they come: lines
+        and reads are slices of them, joined only when they span several
+        chunks.
+
+        :param headers: Headers of the multipart body
+        :param chunks: Iterable of ``bytes`` or ``bytearray``
+        :param kwargs: Other arguments of :class:`MultipartReader`
+        """
+        return cls(headers, ChunkStream(chunks), **kwargs)
 
     def at_eof(self):
         """Returns ``True`` if the final boundary was reached or
@@ -407,6 +1669,11 @@ class MultipartReader(object):
         """
         return self._at_eof
 
+    @reify
+    def meta(self):
+        """Parsed multipart headers, see :class:`PartMeta`."""
+        return PartMeta(self.headers, self.diagnostics)
+
     def __iter__(self):
         return self
 
@@ -416,43 +1683,252 @@ class MultipartReader(object):
 
     def next(self):
         """Emits the next multipart body part."""
-        if self._at_eof:
+        if not self._next_boundary():
             raise StopIteration()
+        self._last_part = self.fetch_next_part()
+        self.stats.parts += 1
+        return self._last_part
+
+    def iter_parts(self, where=None):
+        """Iterates over the body parts matching a predicate.
+
+        ``where`` is given the :class:`PartMeta` of every body part. Parts it
+        rejects are skipped by only scanning for the next delimiter, or by
+        reading ``Content-Length`` bytes: they get no reader and are never
+        decoded. See :func:`match_names`, :func:`match_mimetypes` and
+        :func:`match_content_ids` for common predicates.
+
+        :param where: Callable selecting body parts, all of them if ``None``
+        """
+        while self._next_boundary():
+            headers, duration = self._fetch_headers()
+            meta = PartMeta(headers, self.diagnostics)
+            self.stats.parts += 1
+            if where is not None and not where(meta):
+                self._skip_part(meta)
+                continue
+            part = self._get_part_reader(headers, meta)
+            if self.instrument is not None and \
+                    not isinstance(part, MultipartReader):
+                self.instrument.on_headers_parsed(duration)
+            self._last_part = part
+            yield part
+
+    def _next_boundary(self):
+        # moves to the next body part, returns False at the final boundary
+        if self._at_eof:
+            return False
         self._maybe_release_last_part()
         self._read_boundary()
         if self._at_eof:  # we just read the last boundary, nothing to do there
-            raise StopIteration()
-        self._last_part = self.fetch_next_part()
-        return self._last_part
+            return False
+        max_parts = self.limits.max_parts
+        if max_parts is not None and self.stats.parts >= max_parts:
+            raise errors.LimitExceeded('max_parts', max_parts)
+        return True
 
     def release(self):
         """Reads all the body parts to the void till the final boundary."""
         for item in self:
             item.release()
 
+    def raw_part(self, reader):
+        """Returns a body part reader of the nested body ``reader``, reading
+        it as is, delimiters included, e.g. to store it whole. It replaces
+        ``reader``, which must not be used any more.
+
+        :param reader: Nested reader, the last part emitted, not read yet
+        :raises ValueError: if ``reader`` is not the last part emitted or
+                            was already read from
+        """
+        if reader is not self._last_part or \
+                reader._last_part is not None or reader._at_eof:
+            raise ValueError('only the last nested body emitted, not read '
+                             'yet, can be read raw')
+        part = BodyPartReader(self._boundary, reader.headers, self._source)
+        part._set_context(self.context)
+        part.meta = reader.meta
+        self._last_part = part
+        return part
+
+    def walk(self):
+        """Iterates depth first over the leaf body parts of this body and
+        of the nested ones, in a single pass and without recursion.
+
+        Yields ``(path, depth, part)`` tuples: ``path`` holds the index of
+        the part within each enclosing body, e.g. ``(1, 2, 0)`` for the
+        first part of the third part of the second part, ``depth`` is the
+        number of nested bodies enclosing the part.
+
+        As with :meth:`next`, a part is only valid until the next one is
+        emitted, its unread data is then released.
+        """
+        readers = [self]
+        path = [-1]
+        while readers:
+            try:
+                item = readers[-1].next()
+            except StopIteration:
+                readers.pop()
+                path.pop()
+                continue
+            path[-1] += 1
+            if isinstance(item, MultipartReader):
+                readers.append(item)
+                path.append(-1)
+            else:
+                yield tuple(path), len(readers) - 1, item
+
     def fetch_next_part(self):
         """Returns the next body part reader."""
+        headers, duration = self._fetch_headers()
+        part = self._get_part_reader(headers)
+        if self.instrument is not None and \
+                not isinstance(part, MultipartReader):
+            self.instrument.on_headers_parsed(duration)
+        return part
+
+    def _fetch_headers(self):
+        if not self.context.timed:
+            return self._read_headers(), 0.
+        start = timer()
         headers = self._read_headers()
-        return self._get_part_reader(headers)
-
-    def _get_part_reader(self, headers):
+        duration = timer() - start
+        self.stats.header_time += duration
+        return headers, duration
+
+    def _skip_part(self, meta):
+        """Reads a body part to the void, with no reader nor decoding."""
+        stats = self.stats
+        start = timer() if self.context.timed else None
+        instrument = self.instrument
+        if instrument is not None:
+            instrument.on_part_start(meta.headers)
+        content = self._content
+        max_size = self.limits.max_part_size
+        max_body_size = self.limits.max_body_size
+        if max_body_size is None:
+            budget = float('inf')
+        else:
+            budget = max_body_size - stats.bytes_read
+        length = meta.headers.get(hdrs.CONTENT_LENGTH)
+        size = 0
+        if length is not None and meta.mtype != 'multipart':
+            length = int(length)
+            if max_size is not None and length > max_size:
+                raise errors.LimitExceeded('max_part_size', max_size)
+            if length + 2 > budget:
+                raise errors.LimitExceeded('max_body_size', max_body_size)
+            if type(content) is _BufferStream:
+                size = min(length, len(content.buf) - content.pos)
+                content.pos += size
+                stats.read_calls += 1
+            while size < length:
+                chunk = content.read(min(self.skip_chunk_size,
+                                         length - size))
+                stats.read_calls += 1
+                if not chunk:
+                    break
+                size += len(chunk)
+            if size < length:
+                stats.bytes_read += size
+                raise errors.TruncatedBody(length, size)
+            data_size = size
+            if instrument is not None:
+                instrument.on_data(size)
+            size += len(content.readline(2))
+            stats.readline_calls += 1
+        else:
+            # content lines plus the CRLF belonging to the delimiter
+            if max_size is not None and max_size + 2 < budget:
+                budget = max_size + 2
+            boundary = self._boundary
+            last_boundary = boundary + b'--'
+            limit = max(self.skip_chunk_size, len(boundary) + 4)
+            if type(content) is _BufferStream:
+                # the delimiter line is left for _read_boundary() to read
+                end, stop = _find_delimiter(content.buf, content.pos,
+                                            boundary, instrument)
+                size = stop - content.pos
+                data_size = end - content.pos
+                if instrument is not None:
+                    instrument.on_data(data_size)
+                line = None
+                if size <= budget:
+                    content.pos = stop
+                    stats.read_calls += 1
+            else:
+                at_line_start = True
+                calls = 0
+                while True:
+                    line = content.readline(limit)
+                    calls += 1
+                    if at_line_start and line.startswith(boundary):
+                        if line.rstrip(b'\r\n') in (boundary, last_boundary):
+                            self._source.unread.append(line)
+                            break
+                        if instrument is not None:
+                            instrument.on_false_boundary()
+                    size += len(line)
+                    if size > budget or not line:
+                        break
+                    if instrument is not None:
+                        instrument.on_data(len(line))
+                    at_line_start = line.endswith(b'\n')
+                stats.readline_calls += calls
+                data_size = size
+            if size > budget:
+                stats.bytes_read += size
+                if max_size is not None and budget == max_size + 2:
+                    raise errors.LimitExceeded('max_part_size', max_size)
+                raise errors.LimitExceeded('max_body_size', max_body_size)
+            if line:
+                size += len(line)
+        stats.bytes_read += size
+        stats.parts_skipped += 1
+        if start is not None:
+            duration = timer() - start
+            stats.body_time += duration
+            if instrument is not None:
+                instrument.on_part_end(data_size, duration)
+
+    def _get_part_reader(self, headers, meta=None):
         """Dispatches the response by the `Content-Type` header, returning
         suitable reader instance.
 
         :param dict headers: Response headers
+        :param PartMeta meta: Parsed headers, if already available
         """
-        ctype = headers.get(hdrs.CONTENT_TYPE, '')
-        mtype, _, _, _ = parse_mimetype(ctype)
-        if mtype == 'multipart':
-            if self.multipart_reader_cls is None:
-                return type(self)(headers, self._content)
-            return self.multipart_reader_cls(headers, self._content)
+        if meta is None:
+            meta = PartMeta(headers, self.diagnostics)
+        if meta.mtype == 'multipart':
+            cls = self.multipart_reader_cls
+            if cls is None:
+                cls = type(self)
+            max_depth = self.limits.max_depth
+            if max_depth is not None and self._depth >= max_depth:
+                raise errors.LimitExceeded('max_depth', max_depth)
+            # meta is set ahead of __init__, which reads the boundary from
+            # it, so that the headers are parsed once
+            reader = cls.__new__(cls)
+            reader.meta = meta
+            reader.__init__(headers, self._source)
+            # set after construction, subclasses need not know about them
+            reader._set_context(self.context)
+            reader._depth = self._depth + 1
+            if reader._depth > self.stats.max_depth:
+                self.stats.max_depth = reader._depth
+            return reader
         else:
-            return self.part_reader_cls(self._boundary, headers, self._content)
+            part = self.part_reader_cls(self._boundary, headers,
+                                        self._source)
+            part._set_context(self.context)
+            part.meta = meta
+            return part
 
     def _get_boundary(self):
 
-        mtype, _, _, params = parse_mimetype(self.headers[hdrs.CONTENT_TYPE])
+        mtype, params = self.meta.mtype, self.meta.params
         assert mtype == 'multipart', 'multipart/* content type expected'
 
         if 'boundary' not in params:
@@ -467,9 +1943,27 @@ class MultipartReader(object):
         return boundary
 
     def _readline(self):
-        if self._unread:
-            return self._unread.pop()
-        return self._content.readline()
+        unread = self._source.unread
+        if unread:
+            return unread.pop()
+        return self._readline_limited('delimiter line')
+
+    def _peekline(self):
+        return self._source.peekline(self._readline)
+
+    def _readline_limited(self, what):
+        line = self._content.readline(self.max_line_size + 2)
+        stats = self.stats
+        stats.readline_calls += 1
+        stats.bytes_read += len(line)
+        if len(line) > stats.max_line_length:
+            stats.max_line_length = len(line)
+        max_body_size = self.limits.max_body_size
+        if max_body_size is not None and stats.bytes_read > max_body_size:
+            raise errors.LimitExceeded('max_body_size', max_body_size)
+        if len(line) > self.max_line_size and not line.endswith(b'\n'):
+            raise errors.LineTooLong(what, self.max_line_size)
+        return line
 
     def _read_boundary(self):
         chunk = self._readline().rstrip()
@@ -482,14 +1976,25 @@ class MultipartReader(object):
                              % (chunk, self._boundary))
 
     def _read_headers(self):
+        max_size = self.limits.max_header_size
+        max_headers = self.limits.max_headers
         lines = ['']
+        size = 0
         while True:
-            chunk = self._content.readline()
+            chunk = self._readline_limited('part headers')
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                raise errors.LimitExceeded('max_header_size', max_size)
             chunk = chunk.decode().strip()
             lines.append(chunk)
             if not chunk:
                 break
-        parser = HttpParser()
+            if max_headers is not None and len(lines) > max_headers + 1:
+                raise errors.LimitExceeded('max_headers', max_headers)
+        if max_headers is not None:
+            parser = HttpParser(max_headers=max_headers)
+        else:
+            parser = HttpParser()
         headers, _, _ = parser.parse_headers(lines)
         return headers
 
@@ -498,5 +2003,4 @@ class MultipartReader(object):
         if self._last_part is not None:
             if not self._last_part.at_eof():
                 self._last_part.release()
-            self._unread.extend(self._last_part._unread)
             self._last_part = None
@@ -34,6 +34,8 @@ class HttpParser(object):
         line = lines[1]
 
         while line:
+            if len(headers) >= self.max_headers:
+                raise errors.LimitExceeded('max_headers', self.max_headers)
             header_length = len(line)
 
             if ':' not in line:
@@ -0,0 +1,129 @@
+"""Reader of ``multipart/x-mixed-replace`` push streams, as MJPEG camera
+feeds or server push, emitting every frame as soon as it is complete."""
+import threading
+
+from collections import namedtuple
+
+from .multipart import BodyPartReader, MultipartReader
+
+
+__all__ = ('Frame', 'FramePart', 'PushStreamReader')
+
+
+class Frame(namedtuple('Frame', 'index headers data')):
+    """Body part of a push stream, read whole.
+
+    :param int index: Position of the frame in the stream, counting the
+                      frames dropped
+    :param headers: Body part headers
+    :param bytes data: Body part data
+    """
+
+    __slots__ = ()
+
+
+class FramePart(BodyPartReader):
+    """Body part of a push stream.
+
+    The CRLF ending a ``Content-Length`` bounded body part is left to the
+    next delimiter lookup, which skips blank lines: the body part is
+    complete after its last data byte, even when the server only sends the
+    CRLF along with the next frame.
+    """
+
+    def _read_closing_crlf(self):
+        pass
+
+
+class PushStreamReader(MultipartReader):
+    """Reader of ``multipart/x-mixed-replace`` push streams.
+
+    Each body part is complete, and emitted by :meth:`frames`, right after
+    its ``Content-Length`` bytes, or else once its delimiter line is read.
+    A stream closed without the final delimiter ends the iteration, as
+    servers seldom send it.
+    """
+
+    part_reader_cls = FramePart
+
+    def __init__(self, *args, **kwargs):
+        super(PushStreamReader, self).__init__(*args, **kwargs)
+        #: Number of frames replaced before :meth:`frames` emitted them
+        self.frames_dropped = 0
+
+    def frames(self, latest_only=False, decode=False):
+        """Iterates over the frames of the stream.
+
+        With ``latest_only``, frames are read ahead by a background thread
+        and a frame not yet taken by the consumer is replaced by the next
+        one, so that a slow consumer always gets the latest frame. Errors of
+        the stream are raised by the iteration.
+
+        :param bool latest_only: Drops the stale frames, see
+                                 :attr:`frames_dropped`
+        :param bool decode: Decodes the frame data, see
+                            :meth:`BodyPartReader.read`
+        :returns: iterator of :class:`Frame`
+        """
+        if latest_only:
+            return self._latest_frames(decode)
+        return self._frames(decode)
+
+    def _read_boundary(self):
+        while self._peekline() in (b'\r\n', b'\n'):
+            self._readline()
+        if not self._peekline():
+            # the server closed the stream, final delimiter or not
+            self._at_eof = True
+            return
+        super(PushStreamReader, self)._read_boundary()
+
+    def _frames(self, decode):
+        index = 0
+        for part in self:
+            if isinstance(part, MultipartReader):
+                part.release()
+            else:
+                yield Frame(index, part.headers,
+                            bytes(part.read(decode=decode) or b''))
+            index += 1
+
+    def _latest_frames(self, decode):
+        condition = threading.Condition()
+        latest = []
+        state = {'done': False, 'error': None, 'closed': False}
+
+        def produce():
+            try:
+                for frame in self._frames(decode):
+                    with condition:
+                        if state['closed']:
+                            return
+                        if latest:
+                            self.frames_dropped += 1
+                        latest[:] = [frame]
+                        condition.notify()
+            except Exception as exc:
+                state['error'] = exc
+            finally:
+                with condition:
+                    state['done'] = True
+                    condition.notify()
+
+        thread = threading.Thread(target=produce, name='push-stream-reader')
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                with condition:
+                    while not latest and not state['done']:
+                        condition.wait()
+                    if not latest:
+                        break
+                    frame = latest.pop()
+                yield frame
+            if state['error'] is not None:
+                raise state['error']
+        finally:
+            with condition:
+                state['closed'] = True
@@ -0,0 +1,240 @@
+"""Reader of ``multipart/related`` bodies (RFC 2387), as found in SOAP with
+attachments, MTOM or MHTML, resolving ``cid:`` references (RFC 2392) of
+their root part."""
+import json
+import tempfile
+
+from .compat import unquote
+from .multipart import MultipartReader
+
+
+__all__ = ('RelatedReader', 'SpooledPart')
+
+
+def _normalize(content_id):
+    content_id = content_id.strip()
+    if content_id[:4].lower() == 'cid:':
+        content_id = unquote(content_id[4:], 'utf-8', 'strict')
+    if content_id.startswith('<') and content_id.endswith('>'):
+        content_id = content_id[1:-1]
+    return content_id
+
+
+class SpooledPart(object):
+    """Body part read ahead and kept, decoded, in a spooled temporary file.
+
+    :ivar headers: Body part headers
+    :ivar meta: Parsed headers, see :class:`~multipart_reader.PartMeta`
+    :ivar file: Spooled temporary file holding the decoded content
+    """
+
+    def __init__(self, headers, meta, file):
+        self.headers = headers
+        self.meta = meta
+        self.file = file
+
+    def read(self):
+        """Returns the whole decoded content.
+
+        :rtype: bytes
+        """
+        self.file.seek(0)
+        return self.file.read()
+
+    def text(self, encoding=None):
+        """Like :meth:`read`, but returns text decoded with ``encoding`` or
+        the part charset, UTF-8 by default."""
+        return self.read().decode(encoding or self.meta.charset or 'utf-8')
+
+    def json(self, encoding=None):
+        """Like :meth:`text`, but returns the loaded JSON document."""
+        return json.loads(self.text(encoding))
+
+    def multipart(self, **kwargs):
+        """Returns a reader of the content, for a spooled nested multipart
+        body.
+
+        :param kwargs: Other arguments of :class:`MultipartReader`
+        """
+        self.file.seek(0)
+        return MultipartReader(self.headers, self.file, **kwargs)
+
+    def close(self):
+        self.file.close()
+
+
+class RelatedReader(object):
+    """Reader of ``multipart/related`` bodies.
+
+    :meth:`root` returns the root part, as a regular body part reader,
+    spooling the parts preceding it. Parts with a ``Content-ID`` are then
+    resolved by :meth:`get`: the ones already met are looked up in a dict,
+    the others by reading the body further, spooling the parts met on the
+    way. Only the data before the part looked up is ever read.
+
+    Spooled parts are decoded and kept in memory up to ``spool_size`` bytes
+    each and ``max_memory`` bytes for all of them, on disk past that. A
+    nested multipart root is spooled as is, see
+    :meth:`SpooledPart.multipart`. Leaf parts without ``Content-ID``, parts
+    repeating a ``Content-ID`` and nested multipart bodies other than the
+    root are released unread.
+
+    :param headers: Headers of the ``multipart/related`` body
+    :param content: Stream of the body
+    :param int spool_size: Most bytes of a part kept in memory
+    :param int max_memory: Most bytes of all the parts kept in memory
+    :param kwargs: Other arguments of :class:`MultipartReader`, e.g.
+                   ``limits`` or ``diagnostics``
+    """
+
+    def __init__(self, headers, content, spool_size=64 * 1024,
+                 max_memory=1024 * 1024, **kwargs):
+        self.reader = MultipartReader(headers, content, **kwargs)
+        self.spool_size = spool_size
+        self.max_memory = max_memory
+        start = self.reader.meta.params.get('start')
+        self._start = _normalize(start) if start else None
+        self._parts = {}
+        self._root = None
+        self._index = 0
+        self._memory = 0
+
+    @property
+    def meta(self):
+        """Parsed headers of the body, see
+        :class:`~multipart_reader.PartMeta`."""
+        return self.reader.meta
+
+    def root(self):
+        """Returns the root part: the one whose ``Content-ID`` is the
+        ``start`` parameter of the body, or the first one.
+
+        The root part is streamed: a later :meth:`get` reading past it
+        first spools what is left of it, which this method then returns.
+        A nested multipart root already read from is released instead.
+
+        :returns: A body part reader, a :class:`SpooledPart` if a lookup
+                  read past the root part, or ``None`` if missing
+        """
+        while self._root is None:
+            index, part = self._next()
+            if part is None:
+                return None
+            if self._is_root(index, part):
+                self._root = part
+            else:
+                self._spool(index, part)
+        return self._root
+
+    def get(self, content_id, default=None):
+        """Returns the part with the given ``Content-ID``, reading the body
+        up to it if need be.
+
+        :param str content_id: ``Content-ID`` with or without angle
+                               brackets, or a ``cid:`` URL
+        :returns: A :class:`SpooledPart`, or ``default`` if missing
+        """
+        content_id = _normalize(content_id)
+        while content_id not in self._parts:
+            index, part = self._next()
+            if part is None:
+                return default
+            self._spool(index, part)
+        return self._parts[content_id]
+
+    def __getitem__(self, content_id):
+        part = self.get(content_id)
+        if part is None:
+            raise KeyError(content_id)
+        return part
+
+    def __contains__(self, content_id):
+        return self.get(content_id) is not None
+
+    def close(self):
+        """Deletes the spooled parts."""
+        for part in self._parts.values():
+            part.close()
+        self._parts.clear()
+        if isinstance(self._root, SpooledPart):
+            self._root.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next(self):
+        if self._root is not None and \
+                not isinstance(self._root, SpooledPart) and \
+                not self._root.at_eof():
+            self._keep_root()
+        for part in self.reader:
+            index = self._index
+            self._index += 1
+            if isinstance(part, MultipartReader) and not (
+                    self._root is None and self._is_root(index, part)):
+                part.release()
+                continue
+            return index, part
+        return None, None
+
+    def _keep_root(self):
+        # the root handed out by root() would be released by the next part,
+        # what is left of it is spooled instead
+        root = self._root
+        if isinstance(root, MultipartReader):
+            try:
+                root = self.reader.raw_part(root)
+            except ValueError:
+                # already read from, released
+                return
+            chunks = root.iter_chunks()
+        else:
+            chunks = root.iter_chunks(decode=True)
+        self._root = self._spool_chunks(root, chunks)
+        content_id = root.meta.content_id
+        if content_id is not None and content_id not in self._parts:
+            self._parts[content_id] = self._root
+
+    def _is_root(self, index, part):
+        if self._start is None:
+            return index == 0
+        return part.meta.content_id == self._start
+
+    def _spool(self, index, part):
+        is_root = self._root is None and self._is_root(index, part)
+        content_id = part.meta.content_id
+        if not is_root and (content_id is None or
+                            content_id in self._parts or
+                            isinstance(part, MultipartReader)):
+            # anonymous, repeating the Content-ID of a previous part, or
+            # nested body other than the root
+            part.release()
+            return
+        if isinstance(part, MultipartReader):
+            # a nested root is spooled raw, delimiters included
+            part = self.reader.raw_part(part)
+            chunks = part.iter_chunks()
+        else:
+            chunks = part.iter_chunks(decode=True)
+        spooled = self._spool_chunks(part, chunks)
+        if is_root:
+            self._root = spooled
+        if content_id is not None and content_id not in self._parts:
+            self._parts[content_id] = spooled
+
+    def _spool_chunks(self, part, chunks):
+        max_size = min(self.spool_size, self.max_memory - self._memory)
+        if max_size > 0:
+            fp = tempfile.SpooledTemporaryFile(max_size=max_size)
+        else:
+            fp = tempfile.TemporaryFile()
+        size = 0
+        for chunk in chunks:
+            fp.write(chunk)
+            size += len(chunk)
+        if size <= max_size:
+            self._memory += size
+        return SpooledPart(part.headers, part.meta, fp)
@@ -0,0 +1,139 @@
+"""Reading of multipart request bodies in WSGI applications (PEP 3333),
+with no web framework: the body is pulled from ``wsgi.input`` with large
+``read()`` calls bounded by ``CONTENT_LENGTH``."""
+from . import errors, hdrs
+from .helpers import parse_mimetype
+from .multidict import MultiDict
+from .multipart import MultipartReader
+
+
+__all__ = ('FormReader', 'reader_from_environ')
+
+
+#: Size of the reads issued to ``wsgi.input``
+CHUNK_SIZE = 64 * 1024
+
+
+def _content_length(environ):
+    value = environ.get('CONTENT_LENGTH')
+    if not value:
+        # without a length, the body may only be read up to EOF when the
+        # server says it ends there, otherwise there is no body
+        return None if environ.get('wsgi.input_terminated') else 0
+    try:
+        length = int(value)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise errors.BadHttpMessage(
+            'Invalid Content-Length: {0!r}'.format(value))
+    return length
+
+
+def _content_type(environ):
+    value = environ.get('CONTENT_TYPE')
+    mtype, _, _, params = parse_mimetype(value)
+    if mtype != 'multipart' or not params.get('boundary'):
+        raise errors.BadHttpMessage(
+            'Invalid multipart Content-Type: {0!r}'.format(value))
+    return value
+
+
+def _input_chunks(stream, length, chunk_size):
+    received = 0
+    while length is None or received < length:
+        size = chunk_size if length is None else \
+            min(chunk_size, length - received)
+        chunk = stream.read(size)
+        if not chunk:
+            if length is not None:
+                # client gone before CONTENT_LENGTH
+                raise errors.TruncatedBody(length, received)
+            break
+        received += len(chunk)
+        yield chunk
+
+
+def reader_from_environ(environ, chunk_size=CHUNK_SIZE,
+                        reader_cls=MultipartReader, **kwargs):
+    """Returns a reader of the request body of a WSGI ``environ``.
+
+    ``wsgi.input`` is never read past ``CONTENT_LENGTH``, so that the
+    reader does not block on a keep-alive connection, nor at all without
+    ``CONTENT_LENGTH`` unless the server sets ``wsgi.input_terminated``. It
+    is read with ``read()`` calls of ``chunk_size`` bytes, never
+    ``readline()``, often slow on server input streams, see
+    :meth:`MultipartReader.from_iterable`.
+
+    :param environ: WSGI environment of the request
+    :param int chunk_size: Size of the reads of ``wsgi.input``
+    :param reader_cls: :class:`MultipartReader` subclass to use
+    :param kwargs: Other arguments of :class:`MultipartReader`
+    :raises errors.BadHttpMessage: on invalid ``CONTENT_LENGTH``, or
+                                   ``CONTENT_TYPE`` other than multipart
+                                   with a boundary
+    :raises errors.TruncatedBody: while reading, if ``wsgi.input`` ends
+                                  before ``CONTENT_LENGTH``
+    :raises errors.LimitExceeded: on ``CONTENT_LENGTH`` larger than the
+                                  ``max_body_size`` of ``limits``, before
+                                  reading anything
+    """
+    content_type = _content_type(environ)
+    length = _content_length(environ)
+    limits = kwargs.get('limits')
+    max_body_size = limits.max_body_size if limits is not None else None
+    if length is not None and max_body_size is not None and \
+            length > max_body_size:
+        raise errors.LimitExceeded('max_body_size', max_body_size)
+    headers = {hdrs.CONTENT_TYPE: content_type}
+    chunks = _input_chunks(environ['wsgi.input'], length, chunk_size)
+    return reader_cls.from_iterable(headers, chunks, **kwargs)
+
+
+class FormReader(object):
+    """Reader of a ``multipart/form-data`` WSGI request body.
+
+    :meth:`files` emits the file uploads, body parts with a filename, as
+    streamed body parts. The other fields met on the way are read whole,
+    decoded, and added to :attr:`fields`, which is complete once
+    :meth:`files` is exhausted::
+
+        form = FormReader(environ)
+        for part in form.files():
+            store(form.fields.get('folder'), part.filename, part)
+        title = form.fields.get('title')
+
+    :param environ: WSGI environment of the request
+    :param kwargs: Other arguments of :func:`reader_from_environ`
+    """
+
+    def __init__(self, environ, **kwargs):
+        #: Reader of the request body, see :func:`reader_from_environ`
+        self.reader = reader_from_environ(environ, **kwargs)
+        #: :class:`~multipart_reader.multidict.MultiDict` of the fields
+        #: read so far, by name
+        self.fields = MultiDict()
+
+    def files(self):
+        """Iterates over the file uploads, nested ``multipart/mixed`` ones
+        included.
+
+        As with :meth:`MultipartReader.next`, a body part is only valid
+        until the next one is emitted, its unread data is then released.
+
+        :returns: iterator of :class:`~multipart_reader.BodyPartReader`
+        """
+        for _, _, part in self.reader.walk():
+            if part.filename is not None:
+                yield part
+            elif part.meta.name is not None:
+                self.fields.add(part.meta.name, part.text())
+            else:
+                part.release()
+
+    def read_fields(self):
+        """Reads the whole body, releasing the file uploads, and returns
+        :attr:`fields`."""
+        for part in self.files():
+            part.release()
+        return self.fields
@@ -0,0 +1,162 @@
+import io
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+from multipart_reader import MultipartReader, errors
+from multipart_reader.batch import BatchReader, BatchRequest, BatchResponse
+
+
+BODY = (b'--batch\r\n'
+        b'Content-Type: application/http\r\n'
+        b'Content-ID: <response-1>\r\n'
+        b'\r\n'
+        b'HTTP/1.1 200 OK\r\n'
+        b'Content-Type: application/json; charset=UTF-8\r\n'
+        b'Content-Length: 11\r\n'
+        b'\r\n'
+        b'{"id": 42}\n'
+        b'\r\n'
+        b'--batch\r\n'
+        b'Content-Type: multipart/mixed; boundary=changeset\r\n'
+        b'\r\n'
+        b'--changeset\r\n'
+        b'Content-Type: application/http\r\n'
+        b'\r\n'
+        b'HTTP/1.1 204 No Content\r\n'
+        b'\r\n'
+        b'\r\n'
+        b'--changeset\r\n'
+        b'Content-Type: text/plain\r\n'
+        b'\r\n'
+        b'not a message\r\n'
+        b'--changeset--\r\n'
+        b'\r\n'
+        b'--batch\r\n'
+        b'Content-Type: application/http\r\n'
+        b'\r\n'
+        b'HTTP/1.0 404\n'
+        b'\n'
+        b'--batch--\r\n')
+
+
+class BatchReaderTestCase(unittest2.TestCase):
+
+    def reader(self, body):
+        return BatchReader(
+            {'Content-Type': 'multipart/mixed; boundary=batch'},
+            io.BytesIO(body))
+
+    def test_responses(self):
+        messages = list(self.reader(BODY).messages())
+        self.assertEqual(3, len(messages))
+        first, second, third = messages
+        self.assertIsInstance(first, BatchResponse)
+        self.assertEqual(((1, 1), 200, 'OK'),
+                         (first.version, first.status, first.reason))
+        self.assertEqual('11', first.headers['Content-Length'])
+        self.assertEqual({'id': 42}, first.json())
+        self.assertEqual('response-1', first.content_id)
+        self.assertEqual((204, 'No Content', b''),
+                         (second.status, second.reason, second.body))
+        self.assertEqual(((1, 0), 404, '', b''),
+                         (third.version, third.status, third.reason,
+                          third.body))
+
+    def test_requests(self):
+        body = (b'--batch\r\n'
+                b'Content-Type: application/http\r\n'
+                b'\r\n'
+                b'GET /service/Customers(1) HTTP/1.1\r\n'
+                b'Accept: application/json\r\n'
+                b'\r\n'
+                b'\r\n'
+                b'--batch\r\n'
+                b'Content-Type: application/http\r\n'
+                b'Content-Length: 62\r\n'
+                b'\r\n'
+                b'post /service/Customers\r\n'
+                b'Content-Type: text/plain\r\n'
+                b'\r\n'
+                b'Alice\r\n\r\n'
+                b'\r\n'
+                b'--batch--\r\n')
+        first, second = self.reader(body).messages()
+        self.assertIsInstance(first, BatchRequest)
+        self.assertEqual(('GET', '/service/Customers(1)', (1, 1), b''),
+                         (first.method, first.path, first.version,
+                          first.body))
+        self.assertEqual('application/json', first.headers['Accept'])
+        self.assertEqual(('POST', '/service/Customers', 'Alice\r\n\r\n'),
+                         (second.method, second.path, second.text()))
+
+    def test_content_length(self):
+        body = (b'--batch\r\n'
+                b'Content-Type: application/http\r\n'
+                b'\r\n'
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: 2\r\n'
+                b'\r\n'
+                b'ok and some trailing garbage\r\n'
+                b'--batch--\r\n')
+        message, = self.reader(body).messages()
+        self.assertEqual(b'ok', message.body)
+        self.assertRaises(errors.BadHttpMessage, list, self.reader(
+            body.replace(b'Length: 2', b'Length: 200')).messages())
+
+    def test_bad_status_line(self):
+        for message in (b'', b'HTTP/1.1 OK\r\n\r\n', b'\x20\r\n\r\n'):
+            body = (b'--batch\r\n'
+                    b'Content-Type: application/http\r\n'
+                    b'\r\n' + message + b'\r\n'
+                    b'--batch--\r\n')
+            with self.assertRaises(errors.BadStatusLine):
+                list(self.reader(body).messages())
+
+    def test_text_charset(self):
+        body = (b'--batch\r\n'
+                b'Content-Type: application/http\r\n'
+                b'\r\n'
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/plain; charset="latin-1"\r\n'
+                b'\r\n'
+                b'\xe9t\xe9\r\n'
+                b'--batch--\r\n')
+        message, = self.reader(body).messages()
+        self.assertEqual(u'\xe9t\xe9', message.text())
+
+    def test_latin1_headers(self):
+        body = (b'--batch\r\n'
+                b'Content-Type: application/http\r\n'
+                b'\r\n'
+                b'HTTP/1.1 200 \xc9t\xe9\r\n'
+                b'X-Name: caf\xe9\r\n'
+                b'\r\n'
+                b'ok\r\n'
+                b'--batch--\r\n')
+        message, = self.reader(body).messages()
+        self.assertEqual((u'\xc9t\xe9', u'caf\xe9', b'ok'),
+                         (message.reason, message.headers['X-Name'],
+                          message.body))
+
+    def test_streamed_body(self):
+        part = self.reader(BODY).next()
+        message = part.message(read_body=False)
+        self.assertIsNone(message.body)
+        self.assertEqual('11', message.headers['Content-Length'])
+        self.assertEqual(b'{"id": 42}\n', bytes(part.readline()))
+
+    def test_epilogue_skipped_by_batch_reader_only(self):
+        reader = MultipartReader(
+            {'Content-Type': 'multipart/mixed; boundary=batch'},
+            io.BytesIO(BODY))
+        with self.assertRaises(ValueError):
+            for _, _, part in reader.walk():
+                part.release()
+
+    def test_parts(self):
+        parts = list(self.reader(BODY))
+        self.assertEqual('HttpPart', type(parts[0]).__name__)
+        self.assertIsInstance(parts[1], BatchReader)
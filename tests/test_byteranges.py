@@ -0,0 +1,135 @@
+import io
+import os
+import tempfile
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+from multipart_reader.byteranges import (
+    ByteRangesReader,
+    ContentRange,
+    parse_content_range
+)
+
+
+DATA = bytes(bytearray(i % 251 for i in range(100000)))
+
+
+def body(ranges, total=len(DATA), content_length=False):
+    chunks = []
+    for start, end in ranges:
+        chunks.append(b'--:\r\nContent-Type: application/octet-stream\r\n')
+        chunks.append('Content-Range: bytes {}-{}/{}\r\n'.format(
+            start, end, total).encode())
+        if content_length:
+            chunks.append('Content-Length: {}\r\n'.format(
+                end - start + 1).encode())
+        chunks.append(b'\r\n' + DATA[start:end + 1] + b'\r\n')
+    chunks.append(b'--:--\r\n')
+    return b''.join(chunks)
+
+
+class ParseContentRangeTestCase(unittest2.TestCase):
+
+    def test_range(self):
+        self.assertEqual(ContentRange('bytes', 0, 499, 1234),
+                         parse_content_range('bytes 0-499/1234'))
+        self.assertEqual(500, parse_content_range('bytes 0-499/1234').length)
+
+    def test_unknown_total(self):
+        self.assertEqual(ContentRange('bytes', 10, 19, None),
+                         parse_content_range('Bytes 10-19/*'))
+
+    def test_unsatisfied(self):
+        self.assertEqual(ContentRange('bytes', None, None, 1234),
+                         parse_content_range('bytes */1234'))
+
+    def test_malformed(self):
+        for header in (None, '', 'bytes', 'bytes 0-499', 'bytes 5-4/10',
+                       'bytes 0-10/10', 'bytes */*', 'bytes a-b/10'):
+            self.assertIsNone(parse_content_range(header), header)
+
+
+class ByteRangesReaderTestCase(unittest2.TestCase):
+
+    ranges = [(0, 9), (50000, 99999), (10, 49999)]
+
+    def reader(self, **kwargs):
+        return ByteRangesReader(
+            {'Content-Type': 'multipart/byteranges; boundary=":"'},
+            io.BytesIO(body(self.ranges, **kwargs)))
+
+    def test_parts(self):
+        result = [(part.start, part.end, part.total, len(part.read()))
+                  for part in self.reader()]
+        self.assertEqual([(0, 9, len(DATA), 10),
+                          (50000, 99999, len(DATA), 50000),
+                          (10, 49999, len(DATA), 49990)], result)
+
+    def assertWritten(self, **kwargs):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            written = self.reader().write_into(path, **kwargs)
+            with open(path, 'rb') as fp:
+                self.assertEqual(DATA, fp.read())
+        finally:
+            os.unlink(path)
+        self.assertEqual(len(DATA), written)
+
+    def test_write_into(self):
+        self.assertWritten(buffer_size=4096, max_pending=2)
+
+    def test_write_into_sync(self):
+        self.assertWritten(workers=1)
+
+    def test_write_into_fd(self):
+        with tempfile.TemporaryFile() as fp:
+            self.reader(content_length=True).write_into(fp.fileno())
+            fp.seek(0)
+            self.assertEqual(DATA, fp.read())
+
+    def test_write_into_short_range(self):
+        reader = ByteRangesReader(
+            {'Content-Type': 'multipart/byteranges; boundary=":"'},
+            io.BytesIO(b'--:\r\nContent-Range: bytes 0-9/10\r\n\r\n'
+                       b'short\r\n--:--'))
+        with tempfile.TemporaryFile() as fp:
+            self.assertRaises(ValueError, reader.write_into, fp.fileno())
+
+    def test_write_into_long_range(self):
+        for workers, buffer_size in ((1, 4), (4, 1024)):
+            reader = ByteRangesReader(
+                {'Content-Type': 'multipart/byteranges; boundary=":"'},
+                io.BytesIO(b'--:\r\nContent-Range: bytes 10-19/20\r\n\r\n'
+                           b'BBBBBBBBBB\r\n'
+                           b'--:\r\nContent-Range: bytes 0-9/20\r\n\r\n'
+                           b'AAAAAAAAAAAAAAA\r\n'
+                           b'--:--'))
+            with tempfile.TemporaryFile() as fp:
+                with self.assertRaises(ValueError):
+                    reader.write_into(fp.fileno(), workers=workers,
+                                      buffer_size=buffer_size)
+                fp.seek(10)
+                self.assertEqual(b'B' * 10, fp.read())
+
+    def test_unsupported_unit(self):
+        reader = ByteRangesReader(
+            {'Content-Type': 'multipart/byteranges; boundary=":"'},
+            io.BytesIO(b'--:\r\nContent-Range: items 0-0/1\r\n\r\nx\r\n'
+                       b'--:--'))
+        part = reader.next()
+        self.assertEqual('items', part.content_range.unit)
+        with self.assertRaises(ValueError):
+            part.start
+
+    def test_invalid_content_range(self):
+        reader = ByteRangesReader(
+            {'Content-Type': 'multipart/byteranges; boundary=":"'},
+            io.BytesIO(b'--:\r\nContent-Range: nope\r\n\r\nx\r\n--:--'))
+        part = reader.next()
+        self.assertIsNone(part.content_range)
+        with self.assertRaises(ValueError):
+            part.start
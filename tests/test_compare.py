@@ -0,0 +1,77 @@
+import os
+import sys
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'benchmarks'))
+
+from compare import compare, format_rows  # noqa: E402
+
+
+def results(scale=1.0, **workloads):
+    return {'meta': {'scale': scale},
+            'results': dict((name, dict(zip(
+                ('mb_per_s', 'parts_per_s', 'peak_memory'), values)))
+                for name, values in workloads.items())}
+
+
+class CompareTestCase(unittest2.TestCase):
+
+    def regressions(self, baseline, current, **kwargs):
+        rows = compare(baseline, current, **kwargs)
+        return [(row[0], row[1]) for row in rows if row[-1]]
+
+    def test_unchanged(self):
+        rows = compare(results(form=(100., 10., 1000000)),
+                       results(form=(100., 10., 1000000)))
+        self.assertEqual([('form', 'mb_per_s', 100., 100., 0., False),
+                          ('form', 'parts_per_s', 10., 10., 0., False),
+                          ('form', 'peak_memory', 1000000, 1000000, 0.,
+                           False)], rows)
+
+    def test_throughput(self):
+        baseline = results(form=(100., 10., None))
+        self.assertEqual([], self.regressions(
+            baseline, results(form=(91., 10., None))))
+        self.assertEqual([('form', 'mb_per_s')], self.regressions(
+            baseline, results(form=(89., 10., None))))
+        self.assertEqual([], self.regressions(
+            baseline, results(form=(89., 10., None)), threshold=0.2))
+
+    def test_peak_memory(self):
+        baseline = results(form=(None, None, 1000000))
+        self.assertEqual([], self.regressions(
+            baseline, results(form=(None, None, 1090000))))
+        self.assertEqual([('form', 'peak_memory')], self.regressions(
+            baseline, results(form=(None, None, 1200000))))
+        # tiny peaks growing past the threshold are within the slack
+        self.assertEqual([], self.regressions(
+            results(form=(None, None, 1000)),
+            results(form=(None, None, 3000))))
+
+    def test_zero_baseline(self):
+        baseline = results(form=(0., 0., 0))
+        rows = compare(baseline, results(form=(0., 0., 1000000)))
+        self.assertEqual(('form', 'peak_memory', 0, 1000000, 1000000, True),
+                         rows[-1])
+        self.assertEqual([], self.regressions(
+            baseline, results(form=(0., 0., 1000))))
+        self.assertEqual([], self.regressions(
+            baseline, results(form=(10., 1., 0))))
+        self.assertIn('+1000000  REGRESSION', format_rows(rows))
+
+    def test_missing_workload(self):
+        rows = compare(results(form=(100., 10., 1000), gzip=(50., 5., 1000)),
+                       results(form=(100., 10., 1000)))
+        self.assertEqual([('gzip', 'missing')],
+                         [(row[0], row[1]) for row in rows if row[-1]])
+        self.assertIn('REGRESSION', format_rows(rows))
+
+    def test_different_scales(self):
+        self.assertRaises(ValueError, compare,
+                          results(scale=1.0, form=(100., 10., 1000)),
+                          results(scale=0.1, form=(100., 10., 1000)))
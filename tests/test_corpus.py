@@ -0,0 +1,105 @@
+import io
+import os
+import sys
+import tempfile
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+from multipart_reader import MultipartReader
+from multipart_reader import corpus
+
+
+def read_tree(reader):
+    """Returns the decoded leaf contents of a multipart body."""
+    contents = []
+    for item in reader:
+        if isinstance(item, MultipartReader):
+            contents.extend(read_tree(item))
+        else:
+            contents.append(item.read(decode=True))
+    return contents
+
+
+class TestCorpus(unittest2.TestCase):
+
+    def test_reproducible(self):
+        options = dict(parts=corpus.uniform(1, 20),
+                       sizes=corpus.lognormal(2048), depth=2, nesting=0.5)
+        first = b''.join(corpus.Corpus(seed=7, **options))
+        self.assertEqual(first, b''.join(corpus.Corpus(seed=7, **options)))
+        self.assertNotEqual(first, b''.join(corpus.Corpus(seed=8, **options)))
+
+    def test_parts_and_sizes(self):
+        body = corpus.Corpus(seed=1, parts=12, sizes=3000)
+        contents = read_tree(MultipartReader(body.headers, body.stream()))
+        self.assertEqual([3000] * 12, [len(data) for data in contents])
+
+    def test_chunks_are_bounded(self):
+        body = corpus.Corpus(seed=2, parts=3, sizes=5 * corpus.BLOCK_SIZE)
+        for chunk in body.chunks():
+            self.assertLess(len(chunk), 2 * corpus.BLOCK_SIZE)
+
+    def test_nesting(self):
+        body = corpus.Corpus(seed=3, parts=4, sizes=10, depth=3, nesting=1.)
+        contents = read_tree(MultipartReader(body.headers, body.stream()))
+        self.assertEqual(4 ** 4, len(contents))
+
+    def test_encodings(self):
+        body = corpus.Corpus(
+            seed=4, parts=20, sizes=corpus.BLOCK_SIZE + 1000,
+            transfer_encodings=(None, 'base64', 'quoted-printable'),
+            content_encodings=(None, 'gzip', 'deflate'))
+        reader = MultipartReader(body.headers, body.stream())
+        seen = set()
+        for part in reader:
+            seen.add((part.headers.get('Content-Transfer-Encoding'),
+                      part.headers.get('Content-Encoding')))
+            self.assertEqual(corpus.BLOCK_SIZE + 1000,
+                             len(part.read(decode=True)))
+        self.assertGreater(len(seen), 4)
+
+    def test_adversarial(self):
+        body = corpus.Corpus(seed=5, parts=10, sizes=20000, adversarial=1.,
+                             content_length=0.5)
+        data = b''.join(body)
+        self.assertGreater(data.count(b'--' + body.boundary), 11)
+        contents = read_tree(MultipartReader(body.headers, io.BytesIO(data)))
+        self.assertEqual([20000] * 10, [len(data) for data in contents])
+
+    def test_write(self):
+        body = corpus.Corpus(seed=6, parts=5, sizes=corpus.lognormal(100000))
+        fp = io.BytesIO()
+        self.assertEqual(len(b''.join(body)), body.write(fp))
+        self.assertEqual(b''.join(body), fp.getvalue())
+
+    def test_write_socket(self):
+        class Socket(object):
+            def __init__(self):
+                self.sent = []
+
+            def sendall(self, data):
+                self.sent.append(data)
+
+        body = corpus.Corpus(seed=6, parts=5)
+        sock = Socket()
+        body.write(sock)
+        self.assertEqual(b''.join(body), b''.join(sock.sent))
+
+    def test_main(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        stderr = sys.stderr
+        sys.stderr = io.StringIO() if sys.version_info[0] > 2 \
+            else io.BytesIO()
+        try:
+            self.assertEqual(0, corpus.main(['-o', path, '--seed', '9',
+                                             '--parts', '3']))
+            with open(path, 'rb') as fp:
+                data = fp.read()
+        finally:
+            sys.stderr = stderr
+            os.unlink(path)
+        self.assertEqual(b''.join(corpus.Corpus(9, 3)), data)
@@ -37,3 +37,119 @@ class TestHelpers(unittest.TestCase):
     def test_parse_mimetype_8(self):
         self.assertEqual(helpers.parse_mimetype('text/plain;base64'),
                          ('text', 'plain', '', {'base64': ''}))
+
+    def test_parse_mimetype_params_are_immutable(self):
+        _, _, _, params = helpers.parse_mimetype('text/plain;charset=utf-8')
+        with self.assertRaises(TypeError):
+            params['charset'] = 'latin1'
+        with self.assertRaises(TypeError):
+            params.pop('charset')
+        with self.assertRaises(TypeError):
+            params |= {'charset': 'latin1'}
+        with self.assertRaises(TypeError):
+            params.__init__(charset='latin1')
+        self.assertEqual({'charset': 'utf-8'}, params.copy())
+        self.assertEqual({'charset': 'utf-8'},
+                         helpers.parse_mimetype('text/plain;charset=utf-8')[3])
+
+    def test_parse_mimetype_is_cached(self):
+        first = helpers.parse_mimetype('text/plain;charset=utf-8')
+        second = helpers.parse_mimetype('text/plain;charset=utf-8')
+        self.assertIs(first, second)
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.cache = helpers.LRUCache(self.func, maxsize=2)
+
+    def func(self, value):
+        """Docstring."""
+        self.calls.append(value)
+        return value.upper()
+
+    def test_wraps(self):
+        self.assertEqual('Docstring.', self.cache.__doc__)
+
+    def test_hits_and_misses(self):
+        self.assertEqual('A', self.cache('a'))
+        self.assertEqual('A', self.cache('a'))
+        self.assertEqual(['a'], self.calls)
+        self.assertEqual(helpers.CacheInfo(1, 1, 2, 1),
+                         self.cache.cache_info())
+
+    def test_evicts_least_recently_used(self):
+        self.cache('a')
+        self.cache('b')
+        self.cache('a')
+        self.cache('c')
+        self.cache('a')
+        self.cache('b')
+        self.assertEqual(['a', 'b', 'c', 'b'], self.calls)
+        self.assertEqual(2, self.cache.cache_info().currsize)
+
+    def test_cache_clear(self):
+        self.cache('a')
+        self.cache.cache_clear()
+        self.assertEqual(helpers.CacheInfo(0, 0, 2, 0),
+                         self.cache.cache_info())
+        self.cache('a')
+        self.assertEqual(['a', 'a'], self.calls)
+
+    def test_set_maxsize(self):
+        self.cache('a')
+        self.cache('b')
+        self.cache.set_maxsize(1)
+        self.assertEqual(1, self.cache.cache_info().currsize)
+        self.cache('b')
+        self.assertEqual(['a', 'b'], self.calls)
+
+    def test_disabled(self):
+        self.cache.set_maxsize(0)
+        self.cache('a')
+        self.cache('a')
+        self.assertEqual(['a', 'a'], self.calls)
+        self.assertEqual(0, self.cache.cache_info().currsize)
+
+    def test_long_keys_are_not_cached(self):
+        cache = helpers.LRUCache(self.func, max_key_length=3)
+        cache('abcd')
+        cache('abcd')
+        self.assertEqual(['abcd', 'abcd'], self.calls)
+        self.assertEqual(0, cache.cache_info().currsize)
+
+    def test_unhashable_keys_are_not_cached(self):
+        cache = helpers.LRUCache(len)
+        self.assertEqual(1, cache([1]))
+        self.assertEqual(0, cache.cache_info().currsize)
+
+
+class TestReify(unittest.TestCase):
+
+    def test_reify(self):
+        class A(object):
+            calls = 0
+
+            @helpers.reify
+            def prop(self):
+                """Docstring."""
+                A.calls += 1
+                return 1
+
+        a = A()
+        self.assertEqual(1, a.prop)
+        self.assertEqual(1, a.prop)
+        self.assertEqual(1, A.calls)
+        self.assertEqual('Docstring.', A.prop.__doc__)
+
+    def test_reify_assignment(self):
+        class A(object):
+
+            @helpers.reify
+            def prop(self):
+                return 1
+
+        a = A()
+        a.prop = 2
+        self.assertEqual(2, a.prop)
@@ -0,0 +1,191 @@
+"""Peak memory of the streaming APIs must not depend on the input size."""
+import base64
+import os
+import zlib
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+from multipart_reader import MultipartReader
+from multipart_reader.multipart import ChunkStream
+from multipart_reader.multipart import match_names
+
+
+MB = 1024 * 1024
+
+#: Size of generated bodies, a few times the budget below; set
+#: MULTIPART_READER_MEMORY_TEST_SIZE (in MB) to stress larger inputs.
+SIZE = int(os.environ.get('MULTIPART_READER_MEMORY_TEST_SIZE', 16)) * MB
+
+#: Peak memory allowed to any workload, whatever SIZE is.
+BUDGET = 4 * MB
+
+BOUNDARY = b'MemoryTestBoundary0123456789'
+HEADERS = {'Content-Type': 'multipart/mixed; boundary="{}"'.format(
+    BOUNDARY.decode())}
+
+
+def repeat(block, size):
+    full, rest = divmod(size, len(block))
+    for _ in range(full):
+        yield block
+    if rest:
+        yield block[:rest]
+
+
+def body(parts):
+    """Yields a multipart body from ``(headers, chunks)`` pairs."""
+    for headers, chunks in parts:
+        yield b'--' + BOUNDARY + b'\r\n' + b''.join(
+            name + b': ' + value + b'\r\n' for name, value in headers)
+        yield b'\r\n'
+        for chunk in chunks:
+            yield chunk
+        yield b'\r\n'
+    yield b'--' + BOUNDARY + b'--\r\n'
+
+
+#: 64 KiB of binary data without any line break.
+BINARY = bytes(bytearray(i % 251 for i in range(64 * 1024))).replace(
+    b'\n', b'\x00')
+
+
+@unittest2.skipIf(tracemalloc is None, 'tracemalloc is required')
+class PeakMemoryTestCase(unittest2.TestCase):
+
+    def assertBoundedPeak(self, parts, consume):
+        reader = MultipartReader(HEADERS, ChunkStream(body(parts)))
+        tracemalloc.start()
+        try:
+            consume(reader)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, BUDGET)
+        self.assertTrue(reader.at_eof())
+
+    def test_newline_free_part_readline(self):
+        def consume(reader):
+            size = 0
+            for part in reader:
+                while not part.at_eof():
+                    size += len(part.readline() or b'')
+            self.assertEqual(SIZE, size)
+
+        self.assertBoundedPeak(
+            [([], repeat(BINARY, SIZE))], consume)
+
+    def test_newline_free_part_release(self):
+        self.assertBoundedPeak(
+            [([], repeat(BINARY, SIZE // 2)), ([], repeat(BINARY, SIZE // 2))],
+            MultipartReader.release)
+
+    def test_content_length_part_read_chunk(self):
+        def consume(reader):
+            size = 0
+            for part in reader:
+                while not part.at_eof():
+                    size += len(part.read_chunk())
+            self.assertEqual(SIZE, size)
+
+        self.assertBoundedPeak(
+            [([(b'Content-Length', str(SIZE).encode())],
+              repeat(BINARY, SIZE))], consume)
+
+    def test_base64_part_iter_chunks(self):
+        encoded = base64.b64encode(BINARY[:48 * 1024])
+        size = SIZE // len(encoded) * len(encoded)
+
+        def consume(reader):
+            decoded = 0
+            for part in reader:
+                for chunk in part.iter_chunks(decode=True):
+                    decoded += len(chunk)
+            self.assertEqual(size // 4 * 3, decoded)
+
+        self.assertBoundedPeak(
+            [([(b'Content-Transfer-Encoding', b'base64')],
+              repeat(encoded, size))], consume)
+
+    def test_gzip_part_iter_chunks(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        def compressed():
+            for chunk in repeat(b'\0' * MB, SIZE):
+                yield compressor.compress(chunk)
+            yield compressor.flush()
+
+        def consume(reader):
+            decoded = 0
+            for part in reader:
+                for chunk in part.iter_chunks(decode=True):
+                    decoded += len(chunk)
+            self.assertEqual(SIZE, decoded)
+
+        self.assertBoundedPeak(
+            [([(b'Content-Encoding', b'gzip')], compressed())], consume)
+
+    def test_many_small_parts(self):
+        count = SIZE // (16 * 1024)
+
+        def consume(reader):
+            parts = 0
+            for part in reader:
+                part.read()
+                parts += 1
+            self.assertEqual(count, parts)
+
+        self.assertBoundedPeak(
+            (([(b'Content-Type', b'application/octet-stream')],
+              [b'x' * 16])
+             for _ in range(count)), consume)
+
+    def test_from_bytes_read(self):
+        data = b''.join(body([([], repeat(BINARY, SIZE // 2)),
+                              ([], repeat(BINARY, SIZE // 2))]))
+        reader = MultipartReader.from_bytes(HEADERS, data)
+        tracemalloc.start()
+        try:
+            sizes = [len(part.read()) for part in reader]
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual([SIZE // 2] * 2, sizes)
+        self.assertLess(peak, 64 * 1024)
+
+    def test_from_iterable_readline(self):
+        reader = MultipartReader.from_iterable(
+            HEADERS, body([([], repeat(BINARY, SIZE))]))
+        tracemalloc.start()
+        try:
+            size = 0
+            for part in reader:
+                while not part.at_eof():
+                    size += len(part.readline() or b'')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(SIZE, size)
+        self.assertLess(peak, BUDGET)
+
+    def test_iter_parts_skip(self):
+        def consume(reader):
+            values = [part.read() for part in reader.iter_parts(
+                match_names('field'))]
+            self.assertEqual([b'value'], values)
+
+        self.assertBoundedPeak(
+            [([(b'Content-Disposition', b'form-data; name="file"')],
+              repeat(BINARY, SIZE // 2)),
+             ([(b'Content-Disposition', b'form-data; name="sized"'),
+               (b'Content-Length', str(SIZE // 2).encode())],
+              repeat(BINARY, SIZE // 2)),
+             ([(b'Content-Disposition', b'form-data; name="field"')],
+              [b'value'])], consume)
@@ -215,6 +215,40 @@ class _BaseTest(_Root):
         d = self.make_dict([('key', 'value1')])
         self.assertFalse(d.keys().isdisjoint({'key'}))
 
+    def test_keys_eq_frozenset(self):
+        d = self.make_dict([('key', 'value1'), ('key2', 'value2')])
+        self.assertEqual(d.keys(), frozenset({'key', 'key2'}))
+        self.assertEqual(d.keys(), frozenset({'key', 'key2'}))
+        self.assertNotEqual(d.keys(), frozenset({'key'}))
+
+    def test_keys_eq_keys(self):
+        d1 = self.make_dict([('key', 'value1'), ('key2', 'value2')])
+        d2 = self.make_dict([('key2', 'other'), ('key', 'value')])
+        self.assertEqual(d1.keys(), d2.keys())
+
+    def test_keys_unsupported_operand(self):
+        d = self.make_dict([('key', 'value1')])
+        self.assertFalse(d.keys() == ['key'])
+        with self.assertRaises(TypeError):
+            d.keys() & ['key']
+        with self.assertRaises(TypeError):
+            d.keys().isdisjoint(['key'])
+
+    def test_eq_different_order(self):
+        d1 = self.make_dict([('key', 'value1'), ('key2', 'value2')])
+        d2 = self.make_dict([('key2', 'value2'), ('key', 'value1')])
+        self.assertEqual(d1, d2)
+
+    def test_eq_same_keys_different_values(self):
+        d1 = self.make_dict([('key', 'value1'), ('key2', 'value2')])
+        d2 = self.make_dict([('key2', 'value1'), ('key', 'value2')])
+        self.assertNotEqual(d1, d2)
+
+    def test_eq_different_key_counts(self):
+        d1 = self.make_dict([('key', 'value1'), ('key', 'value2')])
+        d2 = self.make_dict([('key', 'value1'), ('key2', 'value2')])
+        self.assertNotEqual(d1, d2)
+
     def test_repr_issue_410(self):
         d = self.make_dict()
         try:
@@ -339,6 +373,18 @@ class _CIMultiDictTests(_Root):
         with self.assertRaises(KeyError):
             d.getone('key2')
 
+    def test_keys_eq_frozenset_ignores_case(self):
+        d = self.make_dict([('KEY', 'value1'), ('Key2', 'value2')])
+        expected = frozenset({'key', 'key2'})
+        self.assertEqual(d.keys(), expected)
+        self.assertIs(multidict._upper_keys(expected),
+                      multidict._upper_keys(expected))
+        self.assertTrue(d.keys().isdisjoint(frozenset({'key3'})))
+
+    def test_keys_eq_case_sensitive_keys(self):
+        d = self.make_dict([('KEY', 'value1')])
+        self.assertEqual(d.keys(), MultiDict(key='value').keys())
+
     def test_getall(self):
         d = self.make_dict([('KEY', 'value1')], KEY='value2')
 
@@ -499,6 +545,31 @@ class _BaseMutableMultiDictTests(_BaseTest):
         self.assertEqual(d, {})
         self.assertEqual(list(d.items()), [])
 
+    def test_clear_proxy(self):
+        d = self.make_dict([('key', 'one')], foo='bar')
+        p = self.proxy_cls(d)
+
+        d.clear()
+        self.assertEqual(list(p.items()), [])
+        self.assertNotIn('key', p)
+        self.assertEqual(p.keys(), set())
+
+    def test_keys_follow_mutations(self):
+        d = self.make_dict([('key', 'one'), ('key', 'two')], foo='bar')
+        keys = d.keys()
+        self.assertEqual(keys, {'key', 'foo'})
+
+        d.popitem()
+        self.assertEqual(keys, {'key', 'foo'})
+        d.popitem()
+        self.assertEqual(keys, {'foo'})
+        self.assertNotIn('key', d)
+        d.add('other', 'value')
+        self.assertEqual(keys, {'foo', 'other'})
+        d.pop('foo')
+        self.assertEqual(keys, {'other'})
+        self.assertIsNone(d.get('foo'))
+
     def test_del(self):
         d = self.make_dict([('key', 'one'), ('key', 'two')], foo='bar')
 
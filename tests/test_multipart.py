@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
+import copy
 import io
+import pickle
+import warnings
+import zlib
 
 try:
     import unittest2
 except ImportError:
     import unittest as unittest2
 
+from multipart_reader.errors import (
+    LimitExceeded,
+    LineTooLong,
+    PathologicalInput,
+    TruncatedBody
+)
 from multipart_reader import multipart
+from multipart_reader.helpers import FrozenDict
 from multipart_reader.hdrs import (
     CONTENT_DISPOSITION,
     CONTENT_ENCODING,
@@ -34,8 +45,8 @@ class Stream(object):
     def read(self, size=None):
         return self.content.read(size)
 
-    def readline(self):
-        return self.content.readline()
+    def readline(self, size=-1):
+        return self.content.readline(size)
 
 
 class StreamWithShortenRead(Stream):
@@ -51,6 +62,27 @@ class StreamWithShortenRead(Stream):
         return super(StreamWithShortenRead, self).read(size)
 
 
+class RecordingInstrument(multipart.Instrument):
+
+    def __init__(self):
+        self.events = []
+
+    def on_part_start(self, headers):
+        self.events.append(('part_start', dict(headers)))
+
+    def on_headers_parsed(self, duration):
+        self.events.append(('headers_parsed',))
+
+    def on_data(self, nbytes):
+        self.events.append(('data', nbytes))
+
+    def on_decode(self, encoding, in_bytes, out_bytes, duration):
+        self.events.append(('decode', encoding, in_bytes, out_bytes))
+
+    def on_part_end(self, total_bytes, duration):
+        self.events.append(('part_end', total_bytes))
+
+
 class PartReaderTestCase(TestCase):
 
     def setUp(self):
@@ -116,7 +148,7 @@ class PartReaderTestCase(TestCase):
         result = obj.read()
         self.assertEqual(b'Hello, world!', result)
         self.assertEqual(b'', (stream.read()))
-        self.assertEqual([b'--:'], list(obj._unread))
+        self.assertEqual([b'--:'], obj._source.unread)
 
     def test_multiread(self):
         obj = multipart.BodyPartReader(
@@ -314,6 +346,153 @@ class PartReaderTestCase(TestCase):
         result = obj.form()
         self.assertEqual(None, result)
 
+    def test_readline_long_line_in_pieces(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'.' * 10 + b'\r\n--:--'))
+        obj.chunk_size = 4
+        lines = []
+        while not obj.at_eof():
+            lines.append(obj.readline())
+        self.assertEqual([b'.......', b'...', ''], lines)
+
+    def test_readline_piece_alike_boundary(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'.......--:--\r\n--:--'))
+        obj.chunk_size = 4
+        self.assertEqual(b'.......--:--', obj.read())
+
+    def test_readline_crlf_split_across_pieces(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'......\r\n--:--'))
+        obj.chunk_size = 4
+        self.assertEqual(b'......', obj.read())
+
+    def test_readline_keeps_crlf_before_line_alike_boundary(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'Hello,\r\n--:x\r\nworld!\r\n--:--'))
+        self.assertEqual(b'Hello,\r\n--:x\r\nworld!', obj.read())
+
+    def test_instrument_readline(self):
+        instrument = RecordingInstrument()
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'Hello,\r\nworld!\r\n--:--'),
+            instrument=instrument)
+        obj.read()
+        self.assertEqual([('part_start', {}), ('data', 8), ('data', 6),
+                          ('part_end', 14)], instrument.events)
+
+    def test_instrument_read_chunk(self):
+        instrument = RecordingInstrument()
+        obj = multipart.BodyPartReader(
+            self.boundary, {'CONTENT-LENGTH': 6},
+            Stream(b'Hello!\r\n--:--'), instrument=instrument)
+        obj.read_chunk(4)
+        obj.read_chunk(4)
+        self.assertEqual([('part_start', {'CONTENT-LENGTH': 6}), ('data', 4),
+                          ('data', 2), ('part_end', 6)], instrument.events)
+
+    def test_instrument_decode(self):
+        instrument = RecordingInstrument()
+        obj = multipart.BodyPartReader(
+            self.boundary, {CONTENT_TRANSFER_ENCODING: 'base64'},
+            Stream(b'VGltZSB0byBSZWxheCE=\r\n--:--'),
+            instrument=instrument)
+        self.assertEqual(b'Time to Relax!', obj.read(decode=True))
+        self.assertEqual(('decode', 'base64', 20, 14), instrument.events[-1])
+
+    def test_instrument_iter_chunks_decode(self):
+        instrument = RecordingInstrument()
+        obj = multipart.BodyPartReader(
+            self.boundary, {CONTENT_TRANSFER_ENCODING: 'base64'},
+            Stream(b'VGltZSB0\r\nbyBSZWxheCE=\r\n--:--'),
+            instrument=instrument)
+        self.assertEqual(b'Time to Relax!',
+                         b''.join(obj.iter_chunks(decode=True)))
+        self.assertEqual([('part_end', 22), ('decode', 'base64', 22, 14)],
+                         instrument.events[-2:])
+
+    def test_readline_strips_crlf_after_line_alike_boundary(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'Hello,\r\n--:x\r\n--:--'))
+        self.assertEqual(b'Hello,\r\n--:x', obj.read())
+
+    def test_read_unexpected_end_of_stream(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'Hello,\r\nworld!'))
+        self.assertEqual(b'Hello,\r\nworld!', obj.read())
+        self.assertTrue(obj.at_eof())
+
+    def test_iter_chunks(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'Hello,\r\nworld!\r\n--:--'))
+        self.assertEqual([b'Hello,\r\nworld!'], list(obj.iter_chunks()))
+        self.assertTrue(obj.at_eof())
+
+    def test_iter_chunks_holds_line_break(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'Hello,\r\nworld!\r\n--:--'))
+        self.assertEqual([b'Hello,', b'\r\nworld!'], list(obj.iter_chunks(4)))
+        self.assertEqual([b'--:--'], obj._source.unread)
+
+    def test_readline_after_iter_chunks(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {}, Stream(b'Hello,\r\nworld!\r\n--:--'))
+        self.assertEqual(b'Hello,', next(obj.iter_chunks(4)))
+        self.assertEqual(b'\r\n', obj.readline())
+        self.assertEqual(b'world!', obj.readline())
+        self.assertEqual('', obj.readline())
+        self.assertTrue(obj.at_eof())
+
+    def test_iter_chunks_respects_content_length(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {'CONTENT-LENGTH': 10},
+            Stream(b'.' * 10 + b'\r\n--:--'))
+        self.assertEqual([b'....', b'....', b'..'],
+                         list(obj.iter_chunks(4)))
+
+    def test_iter_chunks_decode_base64(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {CONTENT_TRANSFER_ENCODING: 'base64'},
+            Stream(b'VGltZSB0\r\nbyBSZWxh\r\neCE=\r\n--:--'))
+        obj.chunk_size = 3
+        self.assertEqual(b'Time to Relax!',
+                         b''.join(obj.iter_chunks(decode=True)))
+
+    def test_iter_chunks_decode_quoted_printable(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {CONTENT_TRANSFER_ENCODING: 'quoted-printable'},
+            Stream(b'=D0=9F=D1=80=D0=B8=D0=B2=D0=B5=D1=82,=\r\n'
+                   b' =D0=BC=D0=B8=D1=80!\r\n--:--'))
+        obj.chunk_size = 5
+        self.assertEqual(b'\xd0\x9f\xd1\x80\xd0\xb8\xd0\xb2\xd0\xb5\xd1\x82,'
+                         b' \xd0\xbc\xd0\xb8\xd1\x80!',
+                         b''.join(obj.iter_chunks(decode=True)))
+
+    def test_iter_chunks_decode_gzip(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {CONTENT_ENCODING: 'gzip'},
+            Stream(b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\x03\x0b\xc9\xccMU'
+                   b'(\xc9W\x08J\xcdI\xacP\x04\x00$\xfb\x9eV\x0e\x00\x00\x00'
+                   b'\r\n--:--'))
+        chunks = list(obj.iter_chunks(4, decode=True))
+        self.assertEqual(b'Time to Relax!', b''.join(chunks))
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+
+    def test_iter_chunks_decode_base64_deflate(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {CONTENT_TRANSFER_ENCODING: 'base64',
+                            CONTENT_ENCODING: 'deflate'},
+            Stream(b'C8nMTVUoyVcISs1JrFAEAA==\r\n--:--'))
+        self.assertEqual(b'Time to Relax!',
+                         b''.join(obj.iter_chunks(decode=True)))
+
+    def test_iter_chunks_decode_unknown(self):
+        obj = multipart.BodyPartReader(
+            self.boundary, {CONTENT_ENCODING: 'snappy'},
+            Stream(b'\x0e4Time to Relax!\r\n--:--'))
+        with self.assertRaises(RuntimeError):
+            obj.iter_chunks(decode=True)
+
     def test_release(self):
         stream = Stream(b'Hello,\r\n--:\r\n\r\nworld!\r\n--:--')
         obj = multipart.BodyPartReader(
@@ -321,7 +500,7 @@ class PartReaderTestCase(TestCase):
         obj.release()
         self.assertTrue(obj.at_eof())
         self.assertEqual(b'\r\nworld!\r\n--:--', stream.content.read())
-        self.assertEqual([b'--:\r\n'], list(obj._unread))
+        self.assertEqual([b'--:\r\n'], obj._source.unread)
 
     def test_release_respects_content_length(self):
         obj = multipart.BodyPartReader(
@@ -338,7 +517,7 @@ class PartReaderTestCase(TestCase):
         obj.release()
         obj.release()
         self.assertEqual(b'\r\nworld!\r\n--:--', stream.content.read())
-        self.assertEqual([b'--:\r\n'], list(obj._unread))
+        self.assertEqual([b'--:\r\n'], obj._source.unread)
 
     def test_filename(self):
         part = multipart.BodyPartReader(
@@ -348,6 +527,87 @@ class PartReaderTestCase(TestCase):
         self.assertEqual('foo.html', part.filename)
 
 
+class PartMetaTestCase(TestCase):
+
+    def test_content_type(self):
+        meta = multipart.PartMeta(
+            {CONTENT_TYPE: 'Application/Atom+XML; charset=UTF-8'})
+        self.assertEqual('application', meta.mtype)
+        self.assertEqual('atom', meta.subtype)
+        self.assertEqual('xml', meta.suffix)
+        self.assertEqual('application/atom+xml', meta.mimetype)
+        self.assertTrue(
+            multipart.match_mimetypes('application/atom+xml')(meta))
+        self.assertEqual({'charset': 'UTF-8'}, meta.params)
+        self.assertEqual('UTF-8', meta.charset)
+
+    def test_content_disposition(self):
+        meta = multipart.PartMeta(
+            {CONTENT_DISPOSITION: 'form-data; name="file"; filename=a.txt'})
+        self.assertEqual('form-data', meta.disposition)
+        self.assertEqual({'name': 'file', 'filename': 'a.txt'},
+                         meta.disposition_params)
+        self.assertEqual('file', meta.name)
+        self.assertEqual('a.txt', meta.filename)
+
+    def test_encodings(self):
+        meta = multipart.PartMeta({CONTENT_ENCODING: 'GZIP',
+                                   CONTENT_TRANSFER_ENCODING: 'Base64'})
+        self.assertEqual('gzip', meta.content_encoding)
+        self.assertEqual('base64', meta.transfer_encoding)
+
+    def test_missed_headers(self):
+        meta = multipart.PartMeta({})
+        self.assertEqual('', meta.mtype)
+        self.assertEqual('', meta.mimetype)
+        self.assertIsNone(meta.charset)
+        self.assertIsNone(meta.disposition)
+        self.assertIsNone(meta.name)
+        self.assertIsNone(meta.filename)
+        self.assertIsNone(meta.content_encoding)
+        self.assertIsNone(meta.transfer_encoding)
+
+    def test_headers_are_parsed_once(self):
+        calls = []
+        parse_mimetype = multipart.parse_mimetype
+
+        def counting_parse_mimetype(value):
+            calls.append(value)
+            return parse_mimetype(value)
+
+        multipart.parse_mimetype = counting_parse_mimetype
+        try:
+            meta = multipart.PartMeta({CONTENT_TYPE: 'text/plain'})
+            meta.mtype, meta.subtype, meta.charset, meta.mimetype
+        finally:
+            multipart.parse_mimetype = parse_mimetype
+        self.assertEqual(['text/plain'], calls)
+
+    def test_nested_headers_are_parsed_once(self):
+        calls = []
+        parse_mimetype = multipart.parse_mimetype
+
+        def counting_parse_mimetype(value):
+            calls.append(value)
+            return parse_mimetype(value)
+
+        multipart.parse_mimetype = counting_parse_mimetype
+        try:
+            reader = multipart.MultipartReader(
+                {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+                Stream(b'--:\r\n'
+                       b'Content-Type: multipart/related;boundary="::"\r\n'
+                       b'\r\n'
+                       b'--::\r\n\r\nhi\r\n--::--\r\n'
+                       b'--:--'))
+            nested = reader.next()
+            self.assertEqual(b'hi', nested.next().read())
+            nested.meta.mimetype, nested.meta.params
+        finally:
+            multipart.parse_mimetype = parse_mimetype
+        self.assertEqual(1, calls.count('multipart/related;boundary="::"'))
+
+
 class MultipartReaderTestCase(TestCase):
 
     def test_dispatch(self):
@@ -379,6 +639,29 @@ class MultipartReaderTestCase(TestCase):
             {CONTENT_TYPE: 'multipart/related;boundary=--:--'})
         self.assertIsInstance(res, reader.__class__)
 
+    def test_nested_readers_share_source(self):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n'
+                   b'Content-Type: multipart/related;boundary=--:--\r\n'
+                   b'\r\n'
+                   b'----:--\r\n'
+                   b'\r\n'
+                   b'nested\r\n'
+                   b'----:----\r\n'
+                   b'--:\r\n'
+                   b'\r\n'
+                   b'last\r\n'
+                   b'--:--'))
+        nested = reader.next()
+        part = nested.next()
+        self.assertIs(reader._source, nested._source)
+        self.assertIs(reader._source, part._source)
+        self.assertEqual(b'nested', part.read())
+        self.assertEqual([b'----:----\r\n'], reader._source.unread)
+        self.assertEqual(b'last', reader.next().read())
+        self.assertEqual([b'--:--'], reader._source.unread)
+
     def test_dispatch_custom_multipart_reader(self):
         class CustomReader(multipart.MultipartReader):
             pass
@@ -397,6 +680,196 @@ class MultipartReaderTestCase(TestCase):
             {CONTENT_TYPE: 'multipart/related;boundary=--:--'})
         self.assertIsInstance(res, CustomReader)
 
+    def test_diagnostics(self):
+        diagnostics = []
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n'
+                   b'Content-Disposition: "attachment"\r\n'
+                   b'\r\n'
+                   b'test\r\n'
+                   b'--:\r\n'
+                   b'Content-Type: multipart/related;boundary=--:--\r\n'
+                   b'\r\n'
+                   b'----:--\r\n'
+                   b'Content-Disposition: inline; a*=foo\r\n'
+                   b'\r\n'
+                   b'passed\r\n'
+                   b'----:----\r\n'
+                   b'--:--'),
+            diagnostics=diagnostics)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            first = reader.next()
+            self.assertIsNone(first.filename)
+            nested = reader.next()
+            self.assertEqual('inline', nested.next().meta.disposition)
+        self.assertEqual(
+            [multipart.Diagnostic(multipart.BadContentDispositionHeader,
+                                  CONTENT_DISPOSITION, '"attachment"'),
+             multipart.Diagnostic(multipart.BadContentDispositionParam,
+                                  CONTENT_DISPOSITION, ' a*=foo')],
+            diagnostics)
+
+    def test_diagnostics_callback(self):
+        diagnostics = []
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n'
+                   b'Content-Disposition: "attachment"\r\n'
+                   b'\r\n'
+                   b'test\r\n'
+                   b'--:--'),
+            diagnostics=diagnostics.append)
+        reader.next().meta.disposition
+        self.assertEqual(1, len(diagnostics))
+        self.assertIsInstance(diagnostics[0].warning(),
+                              multipart.BadContentDispositionHeader)
+
+    def test_instrument(self):
+        instrument = RecordingInstrument()
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n'
+                   b'\r\n'
+                   b'test\r\n'
+                   b'--:\r\n'
+                   b'Content-Type: multipart/related;boundary=--:--\r\n'
+                   b'\r\n'
+                   b'----:--\r\n'
+                   b'Content-Type: text/plain\r\n'
+                   b'\r\n'
+                   b'passed\r\n'
+                   b'----:----\r\n'
+                   b'--:--'),
+            instrument=instrument)
+        reader.release()
+        self.assertEqual(
+            [('part_start', {}), ('headers_parsed',), ('data', 4),
+             ('part_end', 4),
+             ('part_start', {CONTENT_TYPE: 'text/plain'}),
+             ('headers_parsed',), ('data', 6), ('part_end', 6)],
+            instrument.events)
+
+    def test_stats(self):
+        body = (b'--:\r\n'
+                b'\r\n'
+                b'test\r\n'
+                b'--:\r\n'
+                b'Content-Type: multipart/related;boundary=--:--\r\n'
+                b'\r\n'
+                b'----:--\r\n'
+                b'Content-Transfer-Encoding: base64\r\n'
+                b'\r\n'
+                b'cGFzc2Vk\r\n'
+                b'----:--\r\n'
+                b'Content-Length: 4\r\n'
+                b'\r\n'
+                b'skip\r\n'
+                b'----:----\r\n'
+                b'--:--')
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}, Stream(body),
+            stats=multipart.ReaderStats())
+        self.assertEqual(b'test', reader.next().read())
+        nested = reader.next()
+        self.assertEqual(b'passed', nested.next().read(decode=True))
+        nested.next()
+        self.assertRaises(StopIteration, reader.next)
+        stats = reader.stats
+        self.assertIs(stats, nested.stats)
+        self.assertEqual(len(body), stats.bytes_read)
+        self.assertEqual(4, stats.parts)
+        self.assertEqual(1, stats.parts_released)
+        self.assertEqual(6, stats.bytes_decoded)
+        self.assertEqual(1, stats.read_calls)
+        self.assertEqual(len(b'Content-Type: multipart/related;'
+                             b'boundary=--:--\r\n'), stats.max_line_length)
+        self.assertEqual(1, stats.max_depth)
+        self.assertGreater(stats.header_time, 0)
+        self.assertGreater(stats.body_time, 0)
+        self.assertEqual(stats.parts, stats.as_dict()['parts'])
+
+    def test_stats_untimed_by_default(self):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n\r\nline\r\nline\r\n--:--'))
+        part = reader.next()
+        self.assertEqual(b'line\r\n', part.readline())
+        part.read()
+        reader.release()
+        self.assertEqual(0, reader.stats.header_time)
+        self.assertEqual(0, reader.stats.body_time)
+        self.assertEqual(1, reader.stats.parts)
+
+    def test_stats_line_length_in_pieces(self):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n\r\n' + b'.' * 20000 + b'\r\n--:--'))
+        reader.release()
+        self.assertEqual(20002, reader.stats.max_line_length)
+        self.assertEqual(1, reader.stats.parts_released)
+
+    def test_walk(self):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n'
+                   b'\r\n'
+                   b'first\r\n'
+                   b'--:\r\n'
+                   b'Content-Type: multipart/related;boundary=--:--\r\n'
+                   b'\r\n'
+                   b'----:--\r\n'
+                   b'\r\n'
+                   b'second\r\n'
+                   b'----:--\r\n'
+                   b'Content-Type: multipart/mixed;boundary=-\r\n'
+                   b'\r\n'
+                   b'---\r\n'
+                   b'\r\n'
+                   b'skipped\r\n'
+                   b'---\r\n'
+                   b'\r\n'
+                   b'third\r\n'
+                   b'-----\r\n'
+                   b'----:----\r\n'
+                   b'--:\r\n'
+                   b'\r\n'
+                   b'fourth\r\n'
+                   b'--:--'))
+        result = []
+        for path, depth, part in reader.walk():
+            if path != (1, 1, 0):
+                result.append((path, depth, part.read()))
+        self.assertEqual([((0,), 0, b'first'),
+                          ((1, 0), 1, b'second'),
+                          ((1, 1, 1), 2, b'third'),
+                          ((2,), 0, b'fourth')], result)
+        self.assertTrue(reader.at_eof())
+
+    def test_walk_deep(self):
+        depth = 2000
+        body = b''.join(
+            '--{0}\r\nContent-Type: multipart/mixed;boundary={1}\r\n'
+            '\r\n'.format(i, i + 1).encode() for i in range(depth))
+        body += '--{}\r\n\r\nleaf\r\n'.format(depth).encode()
+        body += b'\r\n'.join('--{}--'.format(i).encode()
+                             for i in reversed(range(depth + 1)))
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=0'}, Stream(body))
+        result = [(path, level, part.read())
+                  for path, level, part in reader.walk()]
+        self.assertEqual([((0,) * (depth + 1), depth, b'leaf')], result)
+
+    def test_dispatch_shares_meta(self):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/related;boundary=":"'},
+            Stream(b'--:\r\n\r\necho\r\n--:--'))
+        headers = {CONTENT_TYPE: 'text/plain; charset=cp1251'}
+        res = reader._get_part_reader(headers)
+        self.assertIs(headers, res.meta.headers)
+        self.assertEqual('cp1251', res.get_charset())
+
     def test_emit_next(self):
         reader = multipart.MultipartReader(
             {CONTENT_TYPE: 'multipart/related;boundary=":"'},
@@ -404,6 +877,37 @@ class MultipartReaderTestCase(TestCase):
         res = reader.next()
         self.assertIsInstance(res, reader.part_reader_cls)
 
+    def test_subclasses_without_context_arguments(self):
+        class Part(multipart.BodyPartReader):
+            def __init__(self, boundary, headers, content):
+                super(Part, self).__init__(boundary, headers, content)
+
+        class Reader(multipart.MultipartReader):
+            part_reader_cls = Part
+
+            def __init__(self, headers, content):
+                super(Reader, self).__init__(headers, content)
+
+        reader = Reader(
+            {CONTENT_TYPE: 'multipart/related;boundary=":"'},
+            Stream(b'--:\r\n'
+                   b'Content-Type: multipart/mixed;boundary="::"\r\n'
+                   b'\r\n'
+                   b'--::\r\n'
+                   b'Content-Length: 4\r\n'
+                   b'\r\n'
+                   b'echo\r\n'
+                   b'--::--\r\n'
+                   b'--:--'))
+        reader._set_context(multipart.ReaderContext(
+            limits=multipart.Limits(max_part_size=3)))
+        nested = reader.next()
+        self.assertIsInstance(nested, Reader)
+        self.assertIs(reader.context, nested.context)
+        with self.assertRaises(LimitExceeded):
+            nested.next()
+        self.assertEqual(1, reader.stats.parts)
+
     def test_invalid_boundary(self):
         reader = multipart.MultipartReader(
             {CONTENT_TYPE: 'multipart/related;boundary=":"'},
@@ -411,6 +915,20 @@ class MultipartReaderTestCase(TestCase):
         with self.assertRaises(ValueError):
             reader.next()
 
+    def test_delimiter_line_too_long(self):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/related;boundary=":"'},
+            Stream(b'x' * 10000 + b'\r\n--:--'))
+        with self.assertRaises(LineTooLong):
+            reader.next()
+
+    def test_header_line_too_long(self):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/related;boundary=":"'},
+            Stream(b'--:\r\nX-Long: ' + b'x' * 10000 + b'\r\n\r\n--:--'))
+        with self.assertRaises(LineTooLong):
+            reader.next()
+
     def test_release(self):
         reader = multipart.MultipartReader(
             {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
@@ -428,6 +946,31 @@ class MultipartReaderTestCase(TestCase):
         reader.release()
         self.assertTrue(reader.at_eof())
 
+    def test_raw_part(self):
+        nested = (b'----:--\r\n'
+                  b'\r\n'
+                  b'test\r\n'
+                  b'----:----')
+        body = (b'--:\r\n'
+                b'Content-Type: multipart/related;boundary=--:--\r\n'
+                b'\r\n' + nested + b'\r\n'
+                b'--:\r\n'
+                b'\r\n'
+                b'next\r\n'
+                b'--:--')
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}, Stream(body))
+        part = reader.raw_part(reader.next())
+        self.assertEqual('multipart/related', part.meta.mimetype)
+        self.assertEqual(nested, bytes(part.read()))
+        self.assertEqual(b'next', reader.next().read())
+
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}, Stream(body))
+        nested_reader = reader.next()
+        nested_reader.next()
+        self.assertRaises(ValueError, reader.raw_part, nested_reader)
+
     def test_release_release(self):
         reader = multipart.MultipartReader(
             {CONTENT_TYPE: 'multipart/related;boundary=":"'},
@@ -496,6 +1039,480 @@ class MultipartReaderTestCase(TestCase):
                 part.read_chunk(3)
 
 
+class FromBytesTestCase(TestCase):
+
+    body = (b'--:\r\n'
+            b'Content-Type: text/plain; charset=utf-8\r\n'
+            b'\r\n'
+            b'Hello,\r\n--:x\r\nworld!\r\n'
+            b'--:\r\n'
+            b'Content-Type: multipart/related;boundary=--:--\r\n'
+            b'\r\n'
+            b'----:--\r\n'
+            b'Content-Length: 4\r\n'
+            b'\r\n'
+            b'\r\n\r\n\r\n'
+            b'----:--\r\n'
+            b'Content-Transfer-Encoding: base64\r\n'
+            b'\r\n'
+            b'cGFzc2Vk\r\n'
+            b'----:----\r\n'
+            b'--:\r\n'
+            b'Content-Type: application/json\r\n'
+            b'\r\n'
+            b'{"last": true}\r\n'
+            b'--:--\r\n')
+
+    def reader(self, **kwargs):
+        return multipart.MultipartReader.from_bytes(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}, self.body,
+            **kwargs)
+
+    def test_read(self):
+        reader = self.reader()
+        part = reader.next()
+        data = part.read()
+        self.assertIsInstance(data, memoryview)
+        self.assertEqual(b'Hello,\r\n--:x\r\nworld!', data.tobytes())
+        nested = reader.next()
+        self.assertEqual(b'\r\n\r\n', nested.next().read().tobytes())
+        self.assertEqual(b'passed', nested.next().read(decode=True))
+        self.assertEqual({'last': True}, reader.next().json())
+        self.assertRaises(StopIteration, reader.next)
+        self.assertTrue(reader.at_eof())
+
+    def test_same_as_stream(self):
+        def leaves(reader):
+            return [(path, bytes(part.read()))
+                    for path, _, part in reader.walk()]
+
+        self.assertEqual(
+            leaves(multipart.MultipartReader(
+                {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+                Stream(self.body))),
+            leaves(self.reader()))
+
+    def test_iter_chunks(self):
+        part = self.reader().next()
+        self.assertEqual([b'Hell', b'o,\r\n', b'--:x', b'\r\nwo', b'rld!'],
+                         [chunk.tobytes() for chunk in part.iter_chunks(4)])
+
+    def test_readline_then_read(self):
+        part = self.reader().next()
+        self.assertEqual(b'Hello,\r\n', part.readline())
+        self.assertEqual(b'--:x\r\nworld!', bytes(part.read()))
+
+    def test_release_and_skip(self):
+        reader = self.reader()
+        reader.release()
+        self.assertTrue(reader.at_eof())
+        self.assertEqual(len(self.body), reader.stats.bytes_read)
+        reader = self.reader()
+        self.assertEqual([{'last': True}], [
+            part.json() for part in reader.iter_parts(
+                multipart.match_mimetypes('application/*'))])
+        self.assertEqual(2, reader.stats.parts_skipped)
+
+    def test_limits(self):
+        reader = self.reader(limits=multipart.Limits(max_part_size=10))
+        with self.assertRaises(LimitExceeded):
+            reader.next().read()
+        reader = self.reader(limits=multipart.Limits(max_part_size=10))
+        with self.assertRaises(LimitExceeded):
+            list(reader.iter_parts(multipart.match_names('none')))
+        reader = self.reader(limits=multipart.Limits(max_body_size=50))
+        with self.assertRaises(LimitExceeded):
+            list(reader.iter_parts(multipart.match_names('none')))
+
+
+class FromIterableTestCase(TestCase):
+
+    body = FromBytesTestCase.body
+
+    def leaves(self, reader):
+        return [(path, bytes(part.read()))
+                for path, _, part in reader.walk()]
+
+    def reader(self, chunks):
+        return multipart.MultipartReader.from_iterable(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}, chunks)
+
+    def test_same_as_stream(self):
+        expected = self.leaves(multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(self.body)))
+        for pos in range(len(self.body) + 1):
+            chunks = [self.body[:pos], b'', self.body[pos:]]
+            self.assertEqual(expected, self.leaves(self.reader(chunks)))
+        bytewise = (self.body[pos:pos + 1] for pos in range(len(self.body)))
+        self.assertEqual(expected, self.leaves(self.reader(bytewise)))
+
+    def test_chunks_not_joined(self):
+        chunks = [b'--:\r\n\r\n', b'Hello,\r\n', b'world!', b'\r\n--:--\r\n']
+        part = self.reader(iter(chunks)).next()
+        self.assertIs(chunks[1], part.readline())
+        self.assertEqual(b'world!', part.readline())
+
+    def test_readline_limit(self):
+        stream = multipart.ChunkStream([b'abc', b'def\nghi'])
+        self.assertEqual(b'abcd', stream.readline(4))
+        self.assertEqual(b'ef\n', stream.readline(4))
+        self.assertEqual(b'ghi', stream.readline())
+        self.assertEqual(b'', stream.readline())
+
+    def test_read(self):
+        stream = multipart.ChunkStream([b'abc', b'', b'def', b'ghi'])
+        self.assertEqual(b'ab', stream.read(2))
+        self.assertEqual(b'cdefg', stream.read(5))
+        self.assertEqual(b'hi', stream.read())
+        self.assertEqual(b'', stream.read(1))
+
+    def test_read_and_readline(self):
+        stream = multipart.ChunkStream([b'ab\r', b'\ncd', b'', b'ef\n', b'g'])
+        self.assertEqual(b'a', stream.read(1))
+        self.assertEqual(b'b\r\n', stream.readline())
+        self.assertEqual(b'cd', stream.readline(2))
+        self.assertEqual(b'ef\n', stream.readline())
+        self.assertEqual(b'g', stream.read())
+        self.assertEqual(b'', stream.read())
+
+
+class IterPartsTestCase(TestCase):
+
+    body = (b'--:\r\n'
+            b'Content-Disposition: form-data; name="a"\r\n'
+            b'\r\n'
+            b'A\r\n'
+            b'--:\r\n'
+            b'Content-Disposition: form-data; name="file"\r\n'
+            b'Content-Type: application/octet-stream\r\n'
+            b'Content-Transfer-Encoding: base64\r\n'
+            b'\r\n'
+            b'not base64\r\n'
+            b'--:x\r\n'
+            b'--:\r\n'
+            b'Content-Disposition: form-data; name="sized"\r\n'
+            b'Content-Type: text/plain\r\n'
+            b'Content-Length: 10\r\n'
+            b'\r\n'
+            b'--:--\r\n---\r\n'
+            b'--:\r\n'
+            b'Content-Type: multipart/related;boundary=--:--\r\n'
+            b'Content-ID: <nested@example.com>\r\n'
+            b'\r\n'
+            b'----:--\r\n'
+            b'\r\n'
+            b'nested\r\n'
+            b'----:----\r\n'
+            b'--:\r\n'
+            b'Content-Disposition: form-data; name="b"\r\n'
+            b'Content-Type: text/plain\r\n'
+            b'\r\n'
+            b'B\r\n'
+            b'--:--\r\n')
+
+    def reader(self, **kwargs):
+        return multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/form-data;boundary=":"'},
+            Stream(self.body), **kwargs)
+
+    def test_all(self):
+        reader = self.reader()
+        self.assertEqual(['a', 'file', 'sized', None, 'b'],
+                         [part.meta.name for part in reader.iter_parts()])
+        self.assertEqual(0, reader.stats.parts_skipped)
+
+    def test_match_names(self):
+        reader = self.reader()
+        self.assertEqual(
+            [b'A', b'B'],
+            [part.read() for part in reader.iter_parts(
+                multipart.match_names('a', 'b'))])
+        self.assertTrue(reader.at_eof())
+        self.assertEqual(5, reader.stats.parts)
+        self.assertEqual(3, reader.stats.parts_skipped)
+        self.assertEqual(len(self.body), reader.stats.bytes_read)
+
+    def test_match_mimetypes(self):
+        reader = self.reader()
+        self.assertEqual(
+            ['file', 'sized', 'b'],
+            [part.meta.name for part in reader.iter_parts(
+                multipart.match_mimetypes('text/*',
+                                          'Application/Octet-Stream'))])
+
+    def test_match_content_ids(self):
+        reader = self.reader()
+        [nested] = reader.iter_parts(
+            multipart.match_content_ids('nested@example.com'))
+        self.assertIsInstance(nested, multipart.MultipartReader)
+
+    def test_skipped_parts_are_not_read(self):
+        instrument = RecordingInstrument()
+        reader = self.reader(instrument=instrument)
+        [part] = reader.iter_parts(lambda meta: meta.name == 'b')
+        events = instrument.events
+        # skipped parts are scanned, never parsed nor decoded
+        starts = [index for index, event in enumerate(events)
+                  if event[0] == 'part_start']
+        self.assertEqual(5, len(starts))
+        self.assertEqual([('headers_parsed',)],
+                         [event for event in events
+                          if event[0] in ('headers_parsed', 'decode')])
+        self.assertEqual(('part_start', {CONTENT_DISPOSITION:
+                                         'form-data; name="b"',
+                                         CONTENT_TYPE: 'text/plain'}),
+                         events[starts[-1]])
+        self.assertEqual(('headers_parsed',), events[starts[-1] + 1])
+        self.assertEqual(('part_end', 10), events[starts[2] + 2])
+
+    def test_skip_limits(self):
+        reader = self.reader(limits=multipart.Limits(max_part_size=9))
+        with self.assertRaises(LimitExceeded) as ctx:
+            list(reader.iter_parts(multipart.match_names('b')))
+        self.assertEqual('max_part_size', ctx.exception.name)
+        reader = self.reader(limits=multipart.Limits(max_body_size=100))
+        with self.assertRaises(LimitExceeded) as ctx:
+            list(reader.iter_parts(multipart.match_names('b')))
+        self.assertEqual('max_body_size', ctx.exception.name)
+
+
+class PathologicalInputDetectorTestCase(TestCase):
+
+    def read(self, body, detector):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(b'--:\r\n\r\n' + body + b'\r\n--:--'),
+            instrument=detector)
+        return [part.read() for part in reader]
+
+    def test_regular_input(self):
+        detector = multipart.PathologicalInputDetector(min_bytes=1024)
+        body = b'\r\n'.join([b'a regular line of text'] * 1000)
+        self.assertEqual([body], self.read(body, detector))
+
+    def test_short_lines(self):
+        detector = multipart.PathologicalInputDetector(min_bytes=1024)
+        with self.assertRaises(PathologicalInput) as ctx:
+            self.read(b'\r\n' * 1000, detector)
+        self.assertEqual('512 lines in 1024 bytes', ctx.exception.reason)
+
+    def test_short_lines_ratio_checked_past_min_bytes(self):
+        detector = multipart.PathologicalInputDetector()
+        self.assertEqual([b'\r\n' * 1000],
+                         self.read(b'\r\n' * 1000, detector))
+
+    def test_false_boundaries(self):
+        detector = multipart.PathologicalInputDetector(max_false_boundaries=9)
+        body = b'\r\n'.join([b'--:x'] * 9)
+        self.assertEqual([body], self.read(body, detector))
+        with self.assertRaises(PathologicalInput) as ctx:
+            self.read(body + b'\r\n--:-', detector)
+        self.assertEqual('10 lines alike delimiter', ctx.exception.reason)
+
+    def test_false_boundaries_in_memory(self):
+        detector = multipart.PathologicalInputDetector(max_false_boundaries=2)
+        reader = multipart.MultipartReader.from_bytes(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            b'--:\r\n\r\n' + b'--:x\r\n' * 3 + b'--:--',
+            instrument=detector)
+        with self.assertRaises(PathologicalInput):
+            reader.next().read()
+
+    def test_false_boundaries_skipped(self):
+        body = (b'--:\r\n\r\n' + b'--:x\r\n' * 3 + b'--:\r\n'
+                b'Content-Disposition: form-data; name="b"\r\n\r\nB\r\n'
+                b'--:--\r\n')
+        headers = {CONTENT_TYPE: 'multipart/form-data;boundary=":"'}
+        for reader_from in (lambda **kwargs: multipart.MultipartReader(
+                                headers, Stream(body), **kwargs),
+                            lambda **kwargs: multipart.MultipartReader.
+                            from_bytes(headers, body, **kwargs)):
+            detector = multipart.PathologicalInputDetector(
+                max_false_boundaries=2)
+            reader = reader_from(instrument=detector)
+            with self.assertRaises(PathologicalInput):
+                list(reader.iter_parts(multipart.match_names('b')))
+
+    def test_along_other_instruments(self):
+        instrument = RecordingInstrument()
+        detector = multipart.PathologicalInputDetector(max_false_boundaries=9)
+        body = b'\r\n'.join([b'--:x'] * 10)
+        with self.assertRaises(PathologicalInput):
+            self.read(body, [instrument, detector])
+        self.assertEqual([('part_start', {}), ('headers_parsed',)],
+                         instrument.events[:2])
+
+    def test_duration(self):
+        detector = multipart.PathologicalInputDetector(max_duration=0)
+        self.assertRaises(PathologicalInput, self.read, b'slow', detector)
+
+    def test_report(self):
+        diagnostics = []
+        detector = multipart.PathologicalInputDetector(
+            max_false_boundaries=0, raise_error=False,
+            diagnostics=diagnostics)
+        body = b'\r\n'.join([b'--:x'] * 3)
+        self.assertEqual([body], self.read(body, detector))
+        self.assertEqual(
+            [multipart.Diagnostic(multipart.PathologicalInputWarning, None,
+                                  '1 lines alike delimiter')],
+            diagnostics)
+
+
+class LimitsTestCase(TestCase):
+
+    body = (b'--:\r\n'
+            b'Content-Type: text/plain\r\n'
+            b'\r\n'
+            b'first\r\n'
+            b'--:\r\n'
+            b'Content-Type: multipart/related;boundary=--:--\r\n'
+            b'\r\n'
+            b'----:--\r\n'
+            b'Content-Length: 6\r\n'
+            b'\r\n'
+            b'second\r\n'
+            b'----:----\r\n'
+            b'--:--')
+
+    def read(self, **limits):
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}, Stream(self.body),
+            limits=multipart.Limits(**limits))
+        reader.release()
+        return reader
+
+    def assertLimitExceeded(self, name, **limits):
+        with self.assertRaises(LimitExceeded) as ctx:
+            self.read(**limits)
+        self.assertEqual(name, ctx.exception.name)
+        self.assertEqual(limits[name], ctx.exception.limit)
+
+    def test_within_limits(self):
+        reader = self.read(max_parts=3, max_part_size=6,
+                           max_body_size=len(self.body), max_header_size=50,
+                           max_headers=1, max_depth=1)
+        self.assertTrue(reader.at_eof())
+        self.assertEqual(3, reader.stats.parts)
+
+    def test_max_parts(self):
+        self.assertLimitExceeded('max_parts', max_parts=2)
+
+    def test_max_part_size(self):
+        self.assertLimitExceeded('max_part_size', max_part_size=4)
+
+    def test_max_part_size_content_length(self):
+        self.assertLimitExceeded('max_part_size', max_part_size=5)
+
+    def test_max_body_size(self):
+        self.assertLimitExceeded('max_body_size',
+                                 max_body_size=len(self.body) - 1)
+
+    def test_max_header_size(self):
+        self.assertLimitExceeded('max_header_size', max_header_size=49)
+
+    def test_max_headers(self):
+        self.assertLimitExceeded('max_headers', max_headers=0)
+
+    def test_max_depth(self):
+        self.assertLimitExceeded('max_depth', max_depth=0)
+
+    def test_rejects_early(self):
+        stream = Stream(b'--:\r\n\r\n' + b'.' * 1000000 + b'\r\n--:--')
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}, stream,
+            limits=multipart.Limits(max_part_size=10000))
+        part = reader.next()
+        self.assertRaises(LimitExceeded, part.read)
+        self.assertLess(stream.content.tell(), 10000 + 2 * part.chunk_size)
+
+    def test_truncated_content_length(self):
+        head = b'--:\r\nContent-Length: 1000\r\n\r\n'
+        body = head + b'x' * 10
+        headers = {CONTENT_TYPE: 'multipart/mixed;boundary=":"'}
+        limits = multipart.Limits(max_part_size=1000, max_body_size=2000,
+                                  max_parts=1)
+        readers = (
+            lambda: multipart.MultipartReader(headers, Stream(body),
+                                              limits=limits),
+            lambda: multipart.MultipartReader.from_bytes(headers, body,
+                                                         limits=limits),
+            lambda: multipart.MultipartReader.from_iterable(
+                headers, iter([head, b'x' * 10]), limits=limits))
+        reads = (lambda part: part.read(),
+                 lambda part: list(part.iter_chunks()),
+                 lambda part: part.release())
+        for reader in readers:
+            for read in reads:
+                with self.assertRaises(TruncatedBody) as ctx:
+                    read(reader().next())
+                self.assertEqual((1000, 10), (ctx.exception.expected,
+                                              ctx.exception.received))
+            with self.assertRaises(TruncatedBody):
+                list(reader().iter_parts(multipart.match_names('none')))
+
+    def test_content_length_checked_before_reading(self):
+        head = b'--:\r\nContent-Length: 1000\r\n\r\n'
+        reader = multipart.MultipartReader(
+            {CONTENT_TYPE: 'multipart/mixed;boundary=":"'},
+            Stream(head + b'x' * 10),
+            limits=multipart.Limits(max_part_size=100))
+        self.assertRaises(LimitExceeded, reader.next)
+        self.assertEqual(len(head), reader.stats.bytes_read)
+
+
+class DecompressionLimitsTestCase(TestCase):
+
+    def part(self, data, diagnostics=None, **limits):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compressed = compressor.compress(data) + compressor.flush()
+        return multipart.BodyPartReader(
+            b'--:', {CONTENT_ENCODING: 'gzip'},
+            Stream(compressed + b'\r\n--:--'), diagnostics=diagnostics,
+            limits=multipart.Limits(**limits))
+
+    def test_within_limits(self):
+        data = b'\0' * (2 * 1024 * 1024)
+        self.assertEqual(data, self.part(
+            data, max_decoded_size=len(data),
+            max_compression_ratio=2000).read(decode=True))
+
+    def test_max_decoded_size(self):
+        diagnostics = []
+        with self.assertRaises(LimitExceeded) as ctx:
+            self.part(b'\0' * 100000, diagnostics,
+                      max_decoded_size=99999).read(decode=True)
+        self.assertEqual('max_decoded_size', ctx.exception.name)
+        self.assertEqual(
+            [multipart.Diagnostic(
+                multipart.DecompressionBombWarning, CONTENT_ENCODING,
+                'max_decoded_size limit of 99999 exceeded')],
+            diagnostics)
+
+    def test_max_decoded_size_iter_chunks(self):
+        part = self.part(b'\0' * (64 * 1024 * 1024), [],
+                         max_decoded_size=1024 * 1024)
+        decoded = []
+        with self.assertRaises(LimitExceeded):
+            for chunk in part.iter_chunks(decode=True):
+                decoded.append(len(chunk))
+        self.assertLessEqual(sum(decoded), 1024 * 1024)
+
+    def test_max_compression_ratio(self):
+        diagnostics = []
+        with self.assertRaises(LimitExceeded) as ctx:
+            self.part(b'\0' * (4 * 1024 * 1024), diagnostics,
+                      max_compression_ratio=100).read(decode=True)
+        self.assertEqual('max_compression_ratio', ctx.exception.name)
+        self.assertEqual(1, len(diagnostics))
+
+    def test_compression_ratio_grace_size(self):
+        data = b'\0' * (1024 * 1024)
+        self.assertEqual(data, self.part(
+            data, max_compression_ratio=2).read(decode=True))
+
+
 class ParseContentDispositionTestCase(unittest2.TestCase):
     # http://greenbytes.de/tech/tc2231/
 
@@ -515,6 +1532,58 @@ class ParseContentDispositionTestCase(unittest2.TestCase):
         self.assertEqual(None, disptype)
         self.assertEqual({}, params)
 
+    def test_cached_header_warns_again(self):
+        for _ in range(2):
+            with self.assertWarns(multipart.BadContentDispositionHeader):
+                disptype, params = multipart.parse_content_disposition(
+                    'attachment; filename=foo bar.html')
+            self.assertEqual(None, disptype)
+            self.assertEqual({}, params)
+
+    def test_params_are_immutable(self):
+        _, params = multipart.parse_content_disposition(
+            'attachment; filename=foo.html')
+        with self.assertRaises(TypeError):
+            params['filename'] = 'bar.html'
+
+    def test_cache_info(self):
+        header = 'attachment; filename=cache_info.html'
+        before = multipart.parse_content_disposition.cache_info()
+        for _ in range(3):
+            multipart.parse_content_disposition(header)
+        after = multipart.parse_content_disposition.cache_info()
+        self.assertEqual((2, 1), (after.hits - before.hits,
+                                  after.misses - before.misses))
+        multipart.parse_content_disposition.cache_clear()
+        self.assertEqual(0, multipart.parse_content_disposition
+                         .cache_info().currsize)
+
+    def test_cached_params_copy_and_pickle(self):
+        header = 'attachment; filename=foo.html'
+        multipart.parse_content_disposition(header)
+        _, params = multipart.parse_content_disposition(header)
+        for copied in (copy.copy(params), copy.deepcopy(params),
+                       pickle.loads(pickle.dumps(params)),
+                       pickle.loads(pickle.dumps(params, 0))):
+            self.assertEqual({'filename': 'foo.html'}, copied)
+            self.assertIsInstance(copied, FrozenDict)
+            with self.assertRaises(TypeError):
+                copied['filename'] = 'bar.html'
+        self.assertIs(params, multipart.parse_content_disposition(header)[1])
+
+    def test_diagnostics(self):
+        diagnostics = []
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            disptype, params = multipart.parse_content_disposition(
+                'attachment; filename=foo bar.html', diagnostics)
+        self.assertEqual(None, disptype)
+        self.assertEqual({}, params)
+        self.assertEqual(
+            [(multipart.BadContentDispositionHeader, CONTENT_DISPOSITION,
+              'attachment; filename=foo bar.html')],
+            diagnostics)
+
     def test_inlwithasciifilename(self):
         disptype, params = multipart.parse_content_disposition(
             'inline; filename="foo.html"')
@@ -581,13 +1650,31 @@ class ParseContentDispositionTestCase(unittest2.TestCase):
         self.assertEqual('attachment', disptype)
         self.assertEqual({'filename': '"quoting" tested.html'}, params)
 
-    @unittest2.skip('need more smart parser which respects quoted text')
     def test_attwithquotedsemicolon(self):
         disptype, params = multipart.parse_content_disposition(
             'attachment; filename="Here\'s a semicolon;.html"')
         self.assertEqual('attachment', disptype)
         self.assertEqual({'filename': 'Here\'s a semicolon;.html'}, params)
 
+    def test_attwithquotedsemicolonandparam(self):
+        disptype, params = multipart.parse_content_disposition(
+            'attachment; filename="a;b.html"; name="c;d"')
+        self.assertEqual('attachment', disptype)
+        self.assertEqual({'filename': 'a;b.html', 'name': 'c;d'}, params)
+
+    def test_attwithquotedsemicolonescapedquote(self):
+        disptype, params = multipart.parse_content_disposition(
+            r'attachment; filename="a\";b.html"')
+        self.assertEqual('attachment', disptype)
+        self.assertEqual({'filename': 'a";b.html'}, params)
+
+    def test_attwithemptyvalue(self):
+        with self.assertWarns(multipart.BadContentDispositionHeader):
+            disptype, params = multipart.parse_content_disposition(
+                'attachment; filename=')
+        self.assertEqual(None, disptype)
+        self.assertEqual({}, params)
+
     def test_attwithfilenameandextparam(self):
         disptype, params = multipart.parse_content_disposition(
             'attachment; foo="bar"; filename="foo.html"')
@@ -89,3 +89,12 @@ class TestParseHeaders(unittest.TestCase):
                 errors.InvalidHeader,
                 "(400, message='Invalid HTTP Header: TEST..)"):
             self.parser.parse_headers(['', 'test[]: line\r\n', '\r\n'])
+
+    def test_max_headers(self):
+        parser = protocol.HttpParser(8190, 2, 8190)
+        headers, _, _ = parser.parse_headers(['', 'a: 1', 'b: 2', ''])
+        self.assertEqual(2, len(headers))
+        with self.assertRaises(errors.LimitExceeded) as cm:
+            parser.parse_headers(['', 'a: 1', 'b: 2', 'c: 3', ''])
+        self.assertEqual(413, cm.exception.code)
+        self.assertEqual('max_headers', cm.exception.name)
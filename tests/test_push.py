@@ -0,0 +1,93 @@
+import io
+import time
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+from multipart_reader.push import Frame, PushStreamReader
+
+
+def frame(data, content_length=True):
+    headers = b'--frame\r\nContent-Type: image/jpeg\r\n'
+    if content_length:
+        headers += 'Content-Length: {}\r\n'.format(len(data)).encode()
+    return headers + b'\r\n' + data + b'\r\n'
+
+
+class Stream(io.BytesIO):
+    """Stream that fails reading past ``limit`` bytes, as a socket would
+    block waiting for data not sent yet."""
+
+    limit = None
+
+    def _check(self, size):
+        if self.limit is not None and self.tell() + size > self.limit:
+            raise AssertionError('read past {}'.format(self.limit))
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.getvalue()) - self.tell()
+        self._check(size)
+        return super(Stream, self).read(size)
+
+    def readline(self, size=-1):
+        line = super(Stream, self).readline(size)
+        self.seek(-len(line), io.SEEK_CUR)
+        self._check(len(line))
+        return super(Stream, self).readline(size)
+
+
+class PushStreamReaderTestCase(unittest2.TestCase):
+
+    def reader(self, content):
+        return PushStreamReader(
+            {'Content-Type': 'multipart/x-mixed-replace; boundary=frame'},
+            content)
+
+    def test_frames(self):
+        data = frame(b'\xff\xd8\r\n\xff\xd9') + \
+            frame(b'second\r\nframe', content_length=False) + \
+            b'--frame--\r\n'
+        frames = list(self.reader(io.BytesIO(data)).frames())
+        self.assertEqual([Frame(0, frames[0].headers, b'\xff\xd8\r\n\xff\xd9'),
+                          Frame(1, frames[1].headers, b'second\r\nframe')],
+                         frames)
+        self.assertEqual('image/jpeg', frames[0].headers['Content-Type'])
+
+    def test_emitted_before_next_frame(self):
+        first = frame(b'\xff\xd8' * 100)[:-2]  # CRLF sent with next frame
+        stream = Stream(first + b'\r\n' + frame(b'next') + b'--frame--\r\n')
+        stream.limit = len(first)
+        frames = self.reader(stream).frames()
+        self.assertEqual(b'\xff\xd8' * 100, next(frames).data)
+        stream.limit = None
+        self.assertEqual(b'next', next(frames).data)
+        self.assertRaises(StopIteration, next, frames)
+
+    def test_stream_closed(self):
+        data = frame(b'one') + frame(b'two')
+        frames = list(self.reader(io.BytesIO(data)).frames())
+        self.assertEqual([b'one', b'two'], [item.data for item in frames])
+        self.assertEqual([], list(self.reader(io.BytesIO()).frames()))
+
+    def test_latest_only(self):
+        data = b''.join(frame(str(i).encode()) for i in range(50))
+        reader = self.reader(io.BytesIO(data))
+        frames = reader.frames(latest_only=True)
+        received = [next(frames)]
+        deadline = time.time() + 5
+        while not reader.at_eof() and time.time() < deadline:
+            time.sleep(0.01)
+        received.extend(frames)
+        self.assertEqual(49, received[-1].index)
+        self.assertEqual(b'49', received[-1].data)
+        self.assertEqual(50, len(received) + reader.frames_dropped)
+        self.assertLessEqual(len(received), 2)
+
+    def test_latest_only_error(self):
+        data = frame(b'one') + b'--garbage\r\n'
+        frames = self.reader(io.BytesIO(data)).frames(latest_only=True)
+        with self.assertRaises(ValueError):
+            list(frames)
@@ -0,0 +1,181 @@
+import io
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+from multipart_reader.related import RelatedReader, SpooledPart
+
+
+BODY = (b'--:\r\n'
+        b'Content-Type: text/plain\r\n'
+        b'Content-ID: <first@example.com>\r\n'
+        b'\r\n'
+        b'first\r\n'
+        b'--:\r\n'
+        b'Content-Type: application/xop+xml; charset=utf-8\r\n'
+        b'Content-ID: <root@example.com>\r\n'
+        b'\r\n'
+        b'<Include href="cid:image%40example.com"/>\r\n'
+        b'--:\r\n'
+        b'Content-Type: text/plain\r\n'
+        b'\r\n'
+        b'anonymous\r\n'
+        b'--:\r\n'
+        b'Content-Type: image/png\r\n'
+        b'Content-ID: <image@example.com>\r\n'
+        b'Content-Transfer-Encoding: base64\r\n'
+        b'\r\n'
+        b'iVBORw0K\r\n'
+        b'--:\r\n'
+        b'Content-Type: text/plain\r\n'
+        b'Content-ID: <last@example.com>\r\n'
+        b'\r\n'
+        b'last\r\n'
+        b'--:--\r\n')
+
+
+class RelatedReaderTestCase(unittest2.TestCase):
+
+    def reader(self, start='<root@example.com>', **kwargs):
+        content_type = 'multipart/related; boundary=":"'
+        if start is not None:
+            content_type += '; start="{}"'.format(start)
+        self.stream = io.BytesIO(BODY)
+        return RelatedReader({'Content-Type': content_type}, self.stream,
+                             **kwargs)
+
+    def test_root_start(self):
+        with self.reader() as reader:
+            root = reader.root()
+            self.assertEqual('root@example.com', root.meta.content_id)
+            self.assertEqual(b'<Include href="cid:image%40example.com"/>',
+                             root.read())
+            self.assertEqual(b'first', reader.get('first@example.com').read())
+
+    def test_root_first_part(self):
+        with self.reader(start=None) as reader:
+            self.assertEqual(b'first', reader.root().read())
+
+    def test_lazy_lookup(self):
+        with self.reader() as reader:
+            reader.root().read()
+            position = self.stream.tell()
+            image = reader.get('cid:image%40example.com')
+            self.assertIsInstance(image, SpooledPart)
+            self.assertEqual(b'\x89PNG\r\n', image.read())
+            self.assertLess(self.stream.tell(), BODY.index(b'last\r\n'))
+            self.assertGreater(self.stream.tell(), position)
+            self.assertIs(image, reader['<image@example.com>'])
+            self.assertEqual('last', reader['last@example.com'].text())
+
+    def test_missing(self):
+        with self.reader() as reader:
+            self.assertIsNone(reader.get('missing@example.com'))
+            self.assertRaises(KeyError, reader.__getitem__, 'missing')
+            self.assertFalse('missing' in reader)
+            self.assertTrue('first@example.com' in reader)
+
+    def test_root_after_lookup(self):
+        with self.reader() as reader:
+            reader.get('last@example.com')
+            root = reader.root()
+            self.assertIsInstance(root, SpooledPart)
+            self.assertEqual(b'<Include href="cid:image%40example.com"/>',
+                             root.read())
+
+    def test_root_kept_by_lookup(self):
+        with self.reader() as reader:
+            reader.root()
+            self.assertEqual(b'last', reader['last@example.com'].read())
+            root = reader.root()
+            self.assertIsInstance(root, SpooledPart)
+            self.assertEqual(b'<Include href="cid:image%40example.com"/>',
+                             root.read())
+            self.assertIs(root, reader['root@example.com'])
+
+    def test_memory_budget(self):
+        with self.reader(spool_size=5, max_memory=8) as reader:
+            reader.get('last@example.com')
+            self.assertEqual(5, reader._memory)
+            self.assertEqual(b'last', reader['last@example.com'].read())
+
+    def nested(self, start):
+        body = (b'--:\r\n'
+                b'Content-Type: text/plain\r\n'
+                b'Content-ID: <first@example.com>\r\n'
+                b'\r\n'
+                b'first\r\n'
+                b'--:\r\n'
+                b'Content-Type: multipart/alternative; boundary="::"\r\n'
+                b'Content-ID: <nested@example.com>\r\n'
+                b'\r\n'
+                b'--::\r\n'
+                b'\r\n'
+                b'plain\r\n'
+                b'--::\r\n'
+                b'\r\n'
+                b'<p>html</p>\r\n'
+                b'--::--\r\n'
+                b'--:\r\n'
+                b'Content-Type: text/plain\r\n'
+                b'Content-ID: <first@example.com>\r\n'
+                b'\r\n'
+                b'duplicate\r\n'
+                b'--:\r\n'
+                b'Content-Type: text/plain\r\n'
+                b'Content-ID: <last@example.com>\r\n'
+                b'\r\n'
+                b'last\r\n'
+                b'--:--\r\n')
+        content_type = 'multipart/related; boundary=":"'
+        if start is not None:
+            content_type += '; start="{}"'.format(start)
+        return RelatedReader({'Content-Type': content_type},
+                             io.BytesIO(body))
+
+    def test_nested_root_after_lookup(self):
+        with self.nested('<nested@example.com>') as reader:
+            self.assertEqual(b'last', reader['last@example.com'].read())
+            root = reader.root()
+            self.assertIsInstance(root, SpooledPart)
+            self.assertEqual([b'plain', b'<p>html</p>'],
+                             [part.read() for part in root.multipart()])
+
+    def test_nested_root(self):
+        with self.nested('<nested@example.com>') as reader:
+            root = reader.root()
+            self.assertEqual([b'plain', b'<p>html</p>'],
+                             [part.read() for part in root])
+            self.assertEqual(b'last', reader['last@example.com'].read())
+
+    def test_nested_root_kept_by_lookup(self):
+        with self.nested('<nested@example.com>') as reader:
+            reader.root()
+            self.assertEqual(b'last', reader['last@example.com'].read())
+            self.assertEqual([b'plain', b'<p>html</p>'],
+                             [part.read() for part in reader.root()
+                              .multipart()])
+
+    def test_nested_root_read_from_released(self):
+        with self.nested('<nested@example.com>') as reader:
+            root = reader.root()
+            self.assertEqual(b'plain', root.next().read())
+            self.assertEqual(b'last', reader['last@example.com'].read())
+            self.assertIs(root, reader.root())
+            self.assertTrue(root.at_eof())
+
+    def test_nested_not_root(self):
+        with self.nested(None) as reader:
+            self.assertEqual(b'last', reader['last@example.com'].read())
+            self.assertEqual(b'first', reader.root().read())
+            self.assertNotIn('nested@example.com', reader)
+
+    def test_duplicate_content_id(self):
+        with self.nested(None) as reader:
+            reader.get('last@example.com')
+            self.assertEqual(b'first', reader['first@example.com'].read())
+            self.assertEqual(['first@example.com', 'last@example.com'],
+                             sorted(reader._parts))
+            self.assertEqual(len(b'firstlast'), reader._memory)
@@ -0,0 +1,152 @@
+import io
+
+try:
+    import unittest2
+except ImportError:
+    import unittest as unittest2
+
+from multipart_reader.errors import (
+    BadHttpMessage,
+    LimitExceeded,
+    TruncatedBody
+)
+from multipart_reader.multipart import Limits
+from multipart_reader.wsgi import FormReader, reader_from_environ
+
+
+BODY = (b'--:\r\n'
+        b'Content-Disposition: form-data; name="title"\r\n'
+        b'\r\n'
+        b'Holiday\r\n'
+        b'--:\r\n'
+        b'Content-Disposition: form-data; name="photo"; filename="a.jpg"\r\n'
+        b'Content-Type: image/jpeg\r\n'
+        b'\r\n'
+        b'\xff\xd8\r\n--:x\xff\xd9\r\n'
+        b'--:\r\n'
+        b'Content-Disposition: form-data; name="tag"\r\n'
+        b'Content-Type: text/plain; charset=latin-1\r\n'
+        b'\r\n'
+        b'\xe9t\xe9\r\n'
+        b'--:\r\n'
+        b'Content-Disposition: form-data; name="tag"\r\n'
+        b'\r\n'
+        b'sea\r\n'
+        b'--:--\r\n')
+
+
+class Input(io.BytesIO):
+    """``wsgi.input`` failing reads past ``limit`` bytes, as a keep-alive
+    socket would block, and readline calls."""
+
+    def __init__(self, data, limit):
+        super(Input, self).__init__(data)
+        self.limit = limit
+        self.reads = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0 or self.tell() + size > self.limit:
+            raise AssertionError('read past {}'.format(self.limit))
+        self.reads += 1
+        return super(Input, self).read(size)
+
+    def readline(self, size=-1):
+        raise AssertionError('readline called')
+
+
+def environ(body=BODY, extra=b'GET / HTTP/1.1\r\n\r\n', **kwargs):
+    env = {'CONTENT_TYPE': 'multipart/form-data; boundary=":"',
+           'CONTENT_LENGTH': str(len(body)),
+           'wsgi.input': Input(body + extra, len(body))}
+    env.update(kwargs)
+    return env
+
+
+class ReaderFromEnvironTestCase(unittest2.TestCase):
+
+    def test_bounded_reads(self):
+        env = environ()
+        reader = reader_from_environ(env, chunk_size=16)
+        self.assertEqual(4, len([part.read() for part in reader]))
+        self.assertTrue(reader.at_eof())
+        self.assertEqual(len(BODY), env['wsgi.input'].tell())
+        self.assertEqual(-(-len(BODY) // 16), env['wsgi.input'].reads)
+
+    def test_no_content_length(self):
+        env = environ(CONTENT_LENGTH='')
+        env['wsgi.input'].limit = 0
+        reader = reader_from_environ(env)
+        self.assertRaises(ValueError, reader.next)
+
+    def test_input_terminated(self):
+        env = environ(extra=b'', CONTENT_LENGTH='')
+        env['wsgi.input_terminated'] = True
+        env['wsgi.input'].limit = float('inf')
+        reader = reader_from_environ(env)
+        self.assertEqual(4, len([part.read() for part in reader]))
+
+    def test_invalid_content_length(self):
+        for value in ('abc', '-1'):
+            self.assertRaises(BadHttpMessage, reader_from_environ,
+                              environ(CONTENT_LENGTH=value))
+
+    def test_invalid_content_type(self):
+        for value in (None, 'text/plain', 'multipart/form-data',
+                      'multipart/form-data; boundary=""'):
+            env = environ()
+            if value is None:
+                del env['CONTENT_TYPE']
+            else:
+                env['CONTENT_TYPE'] = value
+            self.assertRaises(BadHttpMessage, reader_from_environ, env)
+            self.assertEqual(0, env['wsgi.input'].reads)
+
+    def test_content_length_over_limit(self):
+        env = environ()
+        with self.assertRaises(LimitExceeded):
+            reader_from_environ(env, limits=Limits(max_body_size=100))
+        self.assertEqual(0, env['wsgi.input'].reads)
+
+    def test_truncated_body(self):
+        env = environ(body=BODY[:-30], extra=b'',
+                      CONTENT_LENGTH=str(len(BODY)))
+        env['wsgi.input'].limit = len(BODY)
+        reader = reader_from_environ(env)
+        with self.assertRaises(TruncatedBody) as ctx:
+            list(part.read() for part in reader)
+        self.assertEqual((len(BODY), len(BODY) - 30),
+                         (ctx.exception.expected, ctx.exception.received))
+
+    def test_truncated_content_length_part(self):
+        body = (b'--:\r\n'
+                b'Content-Disposition: form-data; name="a"; filename="a"\r\n'
+                b'Content-Length: 1000\r\n'
+                b'\r\n'
+                b'only ten b')
+        for limits in (None, Limits(max_part_size=1000)):
+            env = environ(body=body, extra=b'')
+            form = FormReader(env, limits=limits)
+            with self.assertRaises(TruncatedBody):
+                for part in form.files():
+                    part.read()
+            env = environ(body=body, extra=b'')
+            with self.assertRaises(TruncatedBody):
+                FormReader(env, limits=limits).read_fields()
+
+
+class FormReaderTestCase(unittest2.TestCase):
+
+    def test_files_and_fields(self):
+        form = FormReader(environ(), chunk_size=7)
+        files = []
+        for part in form.files():
+            files.append((part.filename, part.read()))
+            self.assertEqual(['Holiday'], form.fields.getall('title'))
+        self.assertEqual([('a.jpg', b'\xff\xd8\r\n--:x\xff\xd9')], files)
+        self.assertEqual([('title', 'Holiday'), ('tag', u'\xe9t\xe9'),
+                          ('tag', 'sea')], list(form.fields.items()))
+
+    def test_read_fields(self):
+        fields = FormReader(environ()).read_fields()
+        self.assertEqual(['Holiday'], fields.getall('title'))
+        self.assertEqual([u'\xe9t\xe9', 'sea'], fields.getall('tag'))